@@ -5,7 +5,7 @@ description: Implementation of the Co-Bandit algorithm
 import numpy as np
 from math import exp
 from sys import float_info
-from utility_method import getListIndex, combineObservation
+from utility_method import RandomStream, getListIndex, combineObservation
 from multiprocessing import Lock
 
 lock = Lock()
@@ -27,7 +27,7 @@ class CoBandit:
         self.maxTimeUnheardOfAcceptable = maxTimeUnheardOfAcceptable    # maximum number of time slots a network can be unheard of
         self.exploreActionUnheardOf = False             # depending on whether the algorithm has explored an action unheard of in the current time slot
         self.numAgentPerAction = [-1] * self.numAction  # last value I know of
-        # np.random.seed(seed)
+        self.randomStream = RandomStream(seed)             # random numbers of the device (see utility_method.getStreamSeed)
         # end __init__
 
     ''' ################################################################################################################################################################### '''
@@ -48,8 +48,8 @@ class CoBandit:
         return:      index of the chosen action (index according to the list of weight/probability)
         '''
         actionUnheardOfList, actionUnheardOfProbability = CoBandit.mustExploreActionUnheardOf(self, currentTimeSlot, numAgent)
-        if self.exploreActionUnheardOf == True: return np.random.choice(actionUnheardOfList, p=actionUnheardOfProbability)
-        else: return np.random.choice(list(range(self.numAction)), p=self.probability)
+        if self.exploreActionUnheardOf == True: return self.randomStream.choice(actionUnheardOfList, p=actionUnheardOfProbability)
+        else: return self.randomStream.choice(list(range(self.numAction)), p=self.probability)
         # end chooseAction
 
     ''' ################################################################################################################################################################### '''
@@ -84,7 +84,7 @@ class CoBandit:
         return:      True of False depending on whether need to transmit or not
         '''
         if self.exploreActionUnheardOf == True: return True
-        return np.random.choice([False, True], p=[1 - self.transmitProbability, self.transmitProbability])  # select and return an action
+        return self.randomStream.choice([False, True], p=[1 - self.transmitProbability, self.transmitProbability])  # select and return an action
         # end mustTransmit
 
     ''' ################################################################################################################################################################### '''
@@ -110,7 +110,7 @@ class CoBandit:
         return:      True of False depending on whether need to listen or not
         '''
         if transmit == True: return False
-        return np.random.choice([False, True], p=[1 - self.listenProbability, self.listenProbability])  # select and return an action
+        return self.randomStream.choice([False, True], p=[1 - self.listenProbability, self.listenProbability])  # select and return an action
         # end mustTransmit
 
     ''' ################################################################################################################################################################### '''
@@ -143,7 +143,7 @@ class CoBandit:
 
             # any one of the unheard of network will be selected with equal probability
             exploreProbability = len(actionUnheardOfList)/numAgent
-            self.exploreActionUnheardOf = np.random.choice([False, True], p=[1 - exploreProbability, exploreProbability])
+            self.exploreActionUnheardOf = self.randomStream.choice([False, True], p=[1 - exploreProbability, exploreProbability])
             actionUnheardOfProbability = [1 / len(actionUnheardOfList)] * len(actionUnheardOfList)
             print("exploring? ", self.exploreActionUnheardOf)
         return actionUnheardOfList, actionUnheardOfProbability
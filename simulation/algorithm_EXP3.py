@@ -5,19 +5,23 @@ description: Implementation of the EXP3 algorithm
 import numpy as np
 from math import exp
 from sys import float_info
+from utility_method import RandomStream, getCumulativeProbability, normalizeLogWeight, adjustLogWeightToAvailability, computeProbabilityFromLogWeight
 from copy import deepcopy
 
 class EXP3:
-    def __init__(self, numAction, seed = 0):
+    def __init__(self, numAction, seed = 0, logWeight = False):
         ''' initializes all attributes '''
         self.numAction = numAction
         self.gamma = 1
         self.weight = [1] * numAction
+        self.isLogWeight = logWeight                        # whether the weights are kept in log space (self.logWeight) instead of self.weight
+        self.logWeight = np.zeros(numAction)
         self.probability = [0] * numAction
+        self.cumulativeProbability = [0] * numAction
 
         # to handle changes in action availability
         self.actionAvailabilityStatus = [1] * self.numAction
-        # np.random.seed(seed)
+        self.randomStream = RandomStream(seed)             # random numbers of the device (see utility_method.getStreamSeed)
         # end __init__
 
     ''' ################################################################################################################################################################### '''
@@ -27,6 +31,7 @@ class EXP3:
         args:        self
         return:      None
         '''
+        if self.isLogWeight: EXP3.updateProbabilityDistributionLogWeight(self, t, changeInActionAvailability, currentActionAvailabilityStatus); return
         if changeInActionAvailability:
             if t == 1: self.weight = currentActionAvailabilityStatus
             else:
@@ -38,9 +43,25 @@ class EXP3:
             self.actionAvailabilityStatus = deepcopy(currentActionAvailabilityStatus)
         # self.probability = list(((1 - self.gamma) * (weight/sum(self.weight))) + (self.gamma/self.numAction) for weight in self.weight)
         self.probability = list(((1 - self.gamma) * (weight / sum(self.weight))) + (self.gamma / sum(self.actionAvailabilityStatus)) if weight != 0 else 0 for weight in self.weight)
+        self.cumulativeProbability = getCumulativeProbability(self.probability)     # used to draw actions (see RandomStream.sampleIndex)
         # if sum(self.probability) != 1.0: print("gamma:", self.gamma, ", weight:", self.weight, ", prob:", self.probability, ", sum:", sum(self.probability)); input()
         # end updateProbabilityDistribution
 
+    ''' ################################################################################################################################################################### '''
+    def updateProbabilityDistributionLogWeight(self, t, changeInActionAvailability, currentActionAvailabilityStatus):
+        '''
+        description: updates the probability distribution over available actions when the weights are kept in log space
+        args:        self, current time slot, whether or not there is a change in action availability, availability status of each action
+        return:      None
+        '''
+        if changeInActionAvailability:
+            if t == 1: self.logWeight = np.where(np.array(currentActionAvailabilityStatus) == 1, 0., -np.inf)
+            else: self.logWeight = adjustLogWeightToAvailability(self.logWeight, np.array(currentActionAvailabilityStatus))
+            self.actionAvailabilityStatus = deepcopy(currentActionAvailabilityStatus)
+        self.probability = computeProbabilityFromLogWeight(self.logWeight, self.gamma, np.array(self.actionAvailabilityStatus)).tolist()
+        self.cumulativeProbability = getCumulativeProbability(self.probability)     # used to draw actions (see RandomStream.sampleIndex)
+        # end updateProbabilityDistributionLogWeight
+
     ''' ################################################################################################################################################################### '''
     def chooseAction(self, currentTimeSlot, numAgent, currentActionIndex, deviceID):
         '''
@@ -49,7 +70,7 @@ class EXP3:
         return:      index of the chosen action (index according to the list of weight/probability)
         '''
         try:
-            return np.random.choice(list(range(self.numAction)), p=self.probability)
+            return self.randomStream.sampleIndex(self.cumulativeProbability)
         except: print("t=", currentTimeSlot, ", sum:", sum(self.probability), ", prob:", self.probability)
         # end chooseAction
 
@@ -64,6 +85,9 @@ class EXP3:
         scaledGain, estimatedGain = EXP3.computeEstimatedGain(self, gain, maxGain, chosenActionIndex)   # compute scaled gain and estimated gain
         # self.weight[chosenActionIndex] *= exp((self.gamma * estimatedGain)/self.numAction)              # update weight of chosen action
         # self.weight = [w/max(self.weight) if w / max(self.weight) > 0 else (float_info.min * float_info.epsilon) for w in self.weight] # normalize the weights
+        if self.isLogWeight:
+            self.logWeight[chosenActionIndex] += (self.gamma * estimatedGain) / sum(self.actionAvailabilityStatus)      # update log weight of chosen action
+            self.logWeight = normalizeLogWeight(self.logWeight); return
         self.weight[chosenActionIndex] *= exp((self.gamma * estimatedGain) / sum(self.actionAvailabilityStatus))    # update weight of chosen action
         for i in range(len(self.weight)):
             if self.weight[i] > 0: self.weight[i] = self.weight[i] / max(self.weight) if self.weight[i] / max(self.weight) > 0 else (float_info.min * float_info.epsilon)
@@ -111,6 +135,6 @@ class EXP3:
         args:        self
         return:      list of attribute values
         '''
-        return [self.gamma] + self.weight + self.probability
+        return [self.gamma] + (np.exp(self.logWeight).tolist() if self.isLogWeight else self.weight) + self.probability
         # end getAttributeValue
     # end class EXP3
\ No newline at end of file
@@ -5,6 +5,7 @@ description: Implementation of the Exponentially Weighted Average (EWA) algorith
 import numpy as np
 from math import exp
 from sys import float_info
+from utility_method import RandomStream, getCumulativeProbability
 
 class FullInformation:
     def __init__(self, numAction, eta, seed = 0):
@@ -13,7 +14,8 @@ class FullInformation:
         self.eta = eta
         self.weight = [1] * numAction
         self.probability = [0] * numAction
-        # np.random.seed(seed)
+        self.cumulativeProbability = [0] * numAction
+        self.randomStream = RandomStream(seed)             # random numbers of the device (see utility_method.getStreamSeed)
         # end __init__
 
     ''' ################################################################################################################################################################### '''
@@ -24,6 +26,7 @@ class FullInformation:
         return:      None
         '''
         self.probability = list((weight/sum(self.weight)) for weight in self.weight)
+        self.cumulativeProbability = getCumulativeProbability(self.probability)     # used to draw actions (see RandomStream.sampleIndex)
         # end updateProbabilityDistribution
 
     ''' ################################################################################################################################################################### '''
@@ -33,7 +36,7 @@ class FullInformation:
         args:        self, current time slot, number of agents
         return:      index of the chosen action (index according to the list of weight/probability)
         '''
-        return np.random.choice(list(range(self.numAction)), p=self.probability)
+        return self.randomStream.sampleIndex(self.cumulativeProbability)
         # end chooseAction
 
     ''' ################################################################################################################################################################### '''
@@ -6,13 +6,14 @@ description: Implementation of an optimal random algorithm that assumes prior kn
 import numpy as np
 from math import exp
 from sys import float_info
+from utility_method import RandomStream
 
 class FullInformation:
     def __init__(self, numAction, eta, seed = 0):
         ''' initializes all attributes '''
         self.numAction = numAction
         self.probability = [0] * numAction
-        # np.random.seed(seed)
+        self.randomStream = RandomStream(seed)             # random numbers of the device (see utility_method.getStreamSeed)
         # end __init__
 
     ''' ################################################################################################################################################################### '''
@@ -32,7 +33,7 @@ class FullInformation:
         args:        self, current time slot, number of agents
         return:      index of the chosen action (index according to the list of weight/probability)
         '''
-        return np.random.choice(list(range(self.numAction)), p=self.probability)
+        return self.randomStream.choice(list(range(self.numAction)), p=self.probability)
         # end chooseAction
 
     ''' ################################################################################################################################################################### '''
@@ -5,20 +5,23 @@ description: Implementation of the SmartEXP3 algorithm
 import numpy as np
 from math import exp
 from sys import float_info
+from utility_method import RandomStream, getCumulativeProbability, normalizeLogWeight, adjustLogWeightToAvailability, computeProbabilityFromLogWeight
 from math import ceil
 from copy import deepcopy
-import random
-import pandas
+from collections import deque
 
 class SmartEXP3:
     def __init__(self, numAction, beta = 0.1, maxTimeSlotConsideredPreviousBlock = 8, convergedProbability = 0.75, numConsecutiveSlotForReset = 4,
-                 rollingAverageWindowSize = 12, percentageDeclineForReset = 15, minBlockLengthForReset = 40, seed = 0):
+                 rollingAverageWindowSize = 12, percentageDeclineForReset = 15, minBlockLengthForReset = 40, seed = 0, logWeight = False):
         ''' initializes all attributes '''
         self.numAction = numAction
         self.beta = beta
         self.gamma = 1
         self.weight = [1] * numAction
+        self.isLogWeight = logWeight                        # whether the weights are kept in log space (self.logWeight) instead of self.weight
+        self.logWeight = np.zeros(numAction)
         self.probability = [0] * numAction
+        self.cumulativeProbability = [0] * numAction
 
         # for block concept
         self.blockIndex = 1
@@ -43,7 +46,10 @@ class SmartEXP3:
 
         # for periodic reset
         self.numConsecutiveSlotPreferredActionChosen = 0
-        self.preferredActionGainList = []
+        self.numPreferredActionGain = 0                                                 # number of gains observed from the preferred action
+        self.firstPreferredActionGainSum = 0                                            # sum of the first rollingAverageWindowSize gains of the preferred action
+        self.lastPreferredActionGain = deque(maxlen=rollingAverageWindowSize)          # last rollingAverageWindowSize gains of the preferred action
+        self.lastPreferredActionGainSum = 0                                             # running sum of lastPreferredActionGain
         self.preferredActionIndex = -1
         self.convergedProbability = convergedProbability
         self.numConsecutiveSlotForReset = numConsecutiveSlotForReset
@@ -55,8 +61,7 @@ class SmartEXP3:
         self.actionAvailabilityStatus = [1] * self.numAction
         self.actionSelectedPreviousBlockAvailability = True
 
-        # np.random.seed(seed)
-        # random.seed(seed)
+        self.randomStream = RandomStream(seed)             # random numbers of the device (see utility_method.getStreamSeed)
         # end __init__
 
     ''' ################################################################################################################################################################### '''
@@ -73,7 +78,9 @@ class SmartEXP3:
 
         # compute probability distribution
         gamma = self.gamma if self.blockLength == 0 else SmartEXP3.computeGamma(self, self.blockIndex + 1)
-        self.probability = list(((1 - gamma) * (weight/sum(self.weight))) + (gamma/sum(self.actionAvailabilityStatus)) if weight != 0 else 0 for weight in self.weight)
+        if self.isLogWeight: self.probability = computeProbabilityFromLogWeight(self.logWeight, gamma, np.array(self.actionAvailabilityStatus)).tolist()
+        else: self.probability = list(((1 - gamma) * (weight/sum(self.weight))) + (gamma/sum(self.actionAvailabilityStatus)) if weight != 0 else 0 for weight in self.weight)
+        self.cumulativeProbability = getCumulativeProbability(self.probability)     # used to draw actions (see RandomStream.sampleIndex)
 
         # update the value of self.blockLengthForHybrid if the distribution is not close to uniform as from this time slot
         if SmartEXP3.isProbabilityCloseToUniform(self) == False and self.blockLengthForHybrid == 0:
@@ -95,7 +102,7 @@ class SmartEXP3:
             if self.actionToExplore != []:
                 ''' exploration '''
                 self.actionSelectedPreviousBlock = currentActionIndex
-                currentActionIndex = random.choice(self.actionToExplore)
+                currentActionIndex = self.randomStream.choice(self.actionToExplore)
                 self.actionToExplore.remove(currentActionIndex)
                 exploration = True
             elif self.switchBack:
@@ -108,12 +115,12 @@ class SmartEXP3:
                 self.actionSelectedPreviousBlock = currentActionIndex
                 if (0 not in [self.numBlockActionSelected[i] for i in range(self.numAction) if self.actionAvailabilityStatus[i] == 1]) \
                         and (SmartEXP3.isProbabilityCloseToUniform(self) or self.blockLengthPerAction[self.probability.index(max(self.probability))] <= self.blockLengthForHybrid):
-                    coinFlip = random.randint(1, 2); coinFlipped = True
+                    coinFlip = self.randomStream.randint(1, 2); coinFlipped = True
                     if coinFlip == 1:
                         numMaxAvgerageGainAction, greedySameAction, currentActionIndex = SmartEXP3.chooseActionGreedy(self, currentActionIndex)
                         chooseGreedily = 1
-                    else: currentActionIndex = np.random.choice(list(range(self.numAction)), p=self.probability)
-                else: currentActionIndex = np.random.choice(list(range(self.numAction)), p=self.probability)
+                    else: currentActionIndex = self.randomStream.sampleIndex(self.cumulativeProbability)
+                else: currentActionIndex = self.randomStream.sampleIndex(self.cumulativeProbability)
 
             self.blockLengthPerAction[currentActionIndex] = self.blockLength = SmartEXP3.updateBlockLength(self, self.numBlockActionSelected[currentActionIndex])
             self.numBlockActionSelected[currentActionIndex] += 1
@@ -144,7 +151,7 @@ class SmartEXP3:
         else: # several actions with the same highest average gain; choose one at random
             indices = [i for i, x in enumerate(averageGainPerAction) if x == maxAvgerageGain]
             if currentActionIndex in indices: return numMaxAvgerageGainAction, True, currentActionIndex
-            else: return numMaxAvgerageGainAction, False, random.choice(indices)
+            else: return numMaxAvgerageGainAction, False, self.randomStream.choice(indices)
         # end chooseActionGreedy
 
     ''' ################################################################################################################################################################### '''
@@ -163,10 +170,14 @@ class SmartEXP3:
         SmartEXP3.mustSwitchBack(self, chosenActionIndex, previousActionIndex, scaledGain)
 
         # try: self.weight[chosenActionIndex] *= exp((gamma * estimatedGain) / self.numAction)    # update weight of chosen action
-        try: self.weight[chosenActionIndex] *= exp((gamma * estimatedGain) / sum(self.actionAvailabilityStatus))    # update weight of chosen action
-        except OverflowError: self.weight[chosenActionIndex] = 1                        # in case of overflow, set to 1
-        # self.weight = [w / max(self.weight) if w / max(self.weight) > 0 else (float_info.min * float_info.epsilon) for w in self.weight]  # normalize the weights
-        self.weight = [self.weight[i] / max(self.weight) if self.weight[i] / max(self.weight) > 0 else (float_info.min * float_info.epsilon) if self.weight[i] > 0 else 0 for i in range(len(self.weight))]  # normalize the weights
+        if self.isLogWeight:
+            self.logWeight[chosenActionIndex] += (gamma * estimatedGain) / sum(self.actionAvailabilityStatus)          # update log weight of chosen action; cannot overflow
+            self.logWeight = normalizeLogWeight(self.logWeight)
+        else:
+            try: self.weight[chosenActionIndex] *= exp((gamma * estimatedGain) / sum(self.actionAvailabilityStatus))    # update weight of chosen action
+            except OverflowError: self.weight[chosenActionIndex] = 1                        # in case of overflow, set to 1
+            # self.weight = [w / max(self.weight) if w / max(self.weight) > 0 else (float_info.min * float_info.epsilon) for w in self.weight]  # normalize the weights
+            self.weight = [self.weight[i] / max(self.weight) if self.weight[i] / max(self.weight) > 0 else (float_info.min * float_info.epsilon) if self.weight[i] > 0 else 0 for i in range(len(self.weight))]  # normalize the weights
 
         if self.blockLength == 1:
             self.blockIndex += 1; self.gamma = SmartEXP3.computeGamma(self, self.blockIndex); self.gainPerTimeSlotPreviousBlock = deepcopy(self.gainPerTimeSlotCurrentBlock)
@@ -268,7 +279,7 @@ class SmartEXP3:
         return:      None
         '''
         if (max(self.probability) >= self.convergedProbability and (self.blockLengthPerAction[self.probability.index(max(self.probability))] >= self.minBlockLengthForReset)) \
-            or (self.numConsecutiveSlotPreferredActionChosen > self.numConsecutiveSlotForReset and len(self.preferredActionGainList) >= (self.rollingAverageWindowSize + 1)
+            or (self.numConsecutiveSlotPreferredActionChosen > self.numConsecutiveSlotForReset and self.numPreferredActionGain >= (self.rollingAverageWindowSize + 1)
                 and SmartEXP3.actionQualityDecline(self)):
             if self.blockLength != 0:
                 self.blockIndex += 1
@@ -282,16 +293,14 @@ class SmartEXP3:
     ''' ################################################################################################################################################################### '''
     def actionQualityDecline(self):
         '''
-        decsription: determines whether there is a substantial decline in quality of the preferred action (the one selected during the highest number of time slots)
+        decsription: determines whether there is a substantial decline in quality of the preferred action (the one selected during the highest number of time slots); the
+                     change in rolling average over the gains of the preferred action telescopes to the last rolling average minus the first one
         args:        self
         return:      True or False depending on whether there is a substantial decline in quality of the preferred action
         '''
-        # gainList = pandas.rolling_mean(np.array(self.preferredActionGainList), self.rollingAverageWindowSize) # rolling average of gain
-        gainList = pandas.Series.rolling(pandas.Series(self.preferredActionGainList), self.rollingAverageWindowSize).mean()  # rolling average of gain
-        gainList = list(gainList[~np.isnan(gainList)])  # remove nan from list
-
-        changeInGain = SmartEXP3.computeActionQualityChange(self, gainList)
-        return True if ((changeInGain < 0) and (abs(changeInGain) >= (self.percentageDeclineForReset * gainList[0]) / 100)) else False
+        firstRollingAverage = self.firstPreferredActionGainSum / self.rollingAverageWindowSize
+        changeInGain = self.lastPreferredActionGainSum / self.rollingAverageWindowSize - firstRollingAverage
+        return True if ((changeInGain < 0) and (abs(changeInGain) >= (self.percentageDeclineForReset * firstRollingAverage) / 100)) else False
         # end actionQualityDecline
 
     ''' ################################################################################################################################################################### '''
@@ -310,22 +319,32 @@ class SmartEXP3:
 
         self.preferredActionIndex = -1
         self.numConsecutiveSlotPreferredActionChosen = 0
-        self.preferredActionGainList = []
+        SmartEXP3.resetPreferredActionGain(self)
         # end resetActionBlockLength
 
     ''' ################################################################################################################################################################### '''
-    def computeActionQualityChange(self, gainList):
+    def resetPreferredActionGain(self):
         '''
-        description: computes the change in quality of a particular action given a list of (scaled) gains observed from that action
-        args:        self, list of (scaled) gains observed from an action
-        return:      change in gain
+        description: forgets the gains observed from the preferred action
+        args:        self
+        return:      None
         '''
-        changeInGain = 0
+        self.numPreferredActionGain = 0; self.firstPreferredActionGainSum = 0
+        self.lastPreferredActionGain.clear(); self.lastPreferredActionGainSum = 0
+        # end resetPreferredActionGain
 
-        prevGain = gainList[0]
-        for gain in gainList[1:]: changeInGain += (gain - prevGain); prevGain = gain
-        return changeInGain
-        # end computeActionQualityChange
+    ''' ################################################################################################################################################################### '''
+    def appendPreferredActionGain(self, gain):
+        '''
+        description: records a gain observed from the preferred action, keeping only what the rolling averages compared by actionQualityDecline need
+        args:        self, (scaled) gain observed
+        return:      None
+        '''
+        if self.numPreferredActionGain < self.rollingAverageWindowSize: self.firstPreferredActionGainSum += gain
+        if len(self.lastPreferredActionGain) == self.rollingAverageWindowSize: self.lastPreferredActionGainSum -= self.lastPreferredActionGain[0]
+        self.lastPreferredActionGain.append(gain); self.lastPreferredActionGainSum += gain
+        self.numPreferredActionGain += 1
+        # end appendPreferredActionGain
 
     ''' ################################################################################################################################################################### '''
     def updatePreferredActionDetail(self, currentGain, currentActionIndex):
@@ -340,14 +359,14 @@ class SmartEXP3:
         if self.numTimeSlotActionSelected.count(highestCountTimeSlot) > 1:  # no preferred action - multiple actions have same highest count of time slots
             self.preferredActionIndex = -1
             self.numConsecutiveSlotPreferredActionChosen = 0
-            self.preferredActionGainList = []
+            SmartEXP3.resetPreferredActionGain(self)
         elif self.preferredActionIndex != currentPreferredActionIndex:      # single network with highest count of time slots - change in preference
             self.preferredActionIndex = currentPreferredActionIndex
             self.numConsecutiveSlotPreferredActionChosen = 1
-            self.preferredActionGainList = [currentGain]
+            SmartEXP3.resetPreferredActionGain(self); SmartEXP3.appendPreferredActionGain(self, currentGain)
         elif currentActionIndex == self.preferredActionIndex:               # no change in preferred action
             self.numConsecutiveSlotPreferredActionChosen += 1
-            self.preferredActionGainList.append(currentGain)
+            SmartEXP3.appendPreferredActionGain(self, currentGain)
         else: self.numConsecutiveSlotPreferredActionChosen = 0
         # end updatePreferredNetworkDetail
 
@@ -357,7 +376,10 @@ class SmartEXP3:
 
         highestProbability = max(self.probability); actionWithHighestProbability = self.probability.index(highestProbability)
 
-        if t == 1: self.weight = currentActionAvailabilityStatus
+        if self.isLogWeight:
+            if t == 1: self.logWeight = np.where(np.array(currentActionAvailabilityStatus) == 1, 0., -np.inf)
+            else: self.logWeight = adjustLogWeightToAvailability(self.logWeight, np.array(currentActionAvailabilityStatus))
+        elif t == 1: self.weight = currentActionAvailabilityStatus
         else:
             self.weight = [x * y for x, y in zip(self.weight, currentActionAvailabilityStatus)]   # set weight of actions no longer available to zero
             # set weight of newly discovered actions to maxWeight
@@ -411,6 +433,6 @@ class SmartEXP3:
         args:        self
         return:      list of attribute values
         '''
-        return [self.gamma, self.blockIndex, self.blockLength, [deepcopy(self.numBlockActionSelected)]] + self.weight + self.probability
+        return [self.gamma, self.blockIndex, self.blockLength, [deepcopy(self.numBlockActionSelected)]] + (np.exp(self.logWeight).tolist() if self.isLogWeight else self.weight) + self.probability
         # end getAttributeValue
     # end class EXP3
\ No newline at end of file
@@ -11,12 +11,12 @@ description: Implementation of the Smart Periodic EXP4 algorithm (optimizations
 import numpy as np
 from math import exp
 from sys import float_info
+from utility_method import RandomStream, getCumulativeProbability, getLabelTable
 from math import ceil, factorial
 import problem_instance
 import traceback
 from termcolor import colored
 from copy import deepcopy
-import random
 import pandas
 
 class SmartPeriodicEXP4:
@@ -28,8 +28,11 @@ class SmartPeriodicEXP4:
         self.numTimeSlotPerRepetition = numTimeSlot // numRepeat
         self.partitionFunctionList = problem_instance.PERIOD_OPTIONS[periodOption]
         self.label = {}  # store list of first time slots in each period for each partition function; used to get label for a time slot; only for the first repetition
-        self.b = []; SmartPeriodicEXP4.initializeB(self, problemInstance, numAction, deviceID, optimization, numTimeSlot, numRepeat) #, numTimeSlot, numRepeat, problemInstance, periodOption, optimization)
+        self.b = None; self.available = None; self.numLabel = None; SmartPeriodicEXP4.initializeB(self, problemInstance, numAction, deviceID, optimization, numTimeSlot, numRepeat) #, numTimeSlot, numRepeat, problemInstance, periodOption, optimization)
+        self.labelTable = {numPeriod: getLabelTable(labelStartList, self.numTimeSlotPerRepetition) for numPeriod, labelStartList in self.label.items()}    # label per time slot
+        self.maxBPerLabel = None; self.sumMaxBPerLabel = None; SmartPeriodicEXP4.initializeMaxB(self)
         self.probability = [0] * numAction
+        self.cumulativeProbability = [0] * numAction
 
         # initial exploration in random order
         self.actionToExplore = []                               # the indices of the actions
@@ -66,21 +69,21 @@ class SmartPeriodicEXP4:
         self.qualityDrop = False
         # print(" rollingAverageWindowSize:", self.rollingAverageWindowSize, ", percentageDeclineForReset:", self.percentageDeclineForReset, ", maxTimeSlotConsideredPreferredNetwork:", self.maxTimeSlotConsideredPreferredNetwork)
         self.log = []
-        # np.random.seed(seed)
-        # random.seed(seed)
+        self.randomStream = RandomStream(seed)             # random numbers of the device (see utility_method.getStreamSeed)
         # end __init__
 
     ''' ################################################################################################################################################################### '''
     def initializeB(self, problemInstance, numAction, deviceID, optimization, numTimeSlot, numRepeat):
         '''
-        description: initilizes the 3d list b to store the "weight" of by playing arm i during time slots assigned label l by partition function f (for each f, l anf i)
-                     b is initialized to zero if the network is available at that time slot (with given label), else -1
+        description: initilizes the 3d array b to store the "weight" of by playing arm i during time slots assigned label l by partition function f (for each f, l anf i);
+                     partition functions with fewer labels are padded up to the largest number of labels, and the boolean array available (same shape) tells which
+                     entries hold an action available at that label (padding entries are never available)
+                     b is initialized to zero; unavailable actions are marked in available instead of by -1
         args:        problem instance chosen, ID of the device running the algorithm, whether or not the optimized version of the algorithm is being considered
-        return:      the 3d list b
+        return:      None
         '''
-        # initialize the 3D list b, and compute the first time slot in each period for each partition function
+        # compute the first time slot in each period for each partition function
         for numPeriod in self.partitionFunctionList:
-            self.b.append([[0 for col in range(numPeriod)] for row in range(numAction)]) # b[f][i][l] - 3D list; for each partition, 2D list - row refers to an action, col refers to label
             self.label.update({numPeriod: [1 + (x * self.numTimeSlotPerRepetition // numPeriod) for x in range(numPeriod)]})
 
         if optimization == True:
@@ -91,20 +94,37 @@ class SmartPeriodicEXP4:
 
             for partitionFunctionIndex, numPeriod in enumerate(self.partitionFunctionList):      # for each partition
                 # if any time of change in action availability not in the list of first time slot in each partition,
-                # (1) add it to the list, and (2) add a new element to the 2D b list for that partition
+                # add it to the list, so that it starts a new label for that partition
                 additionalTimeOfChange = list(set(timeOfChangeInActionAvailability) - set(self.label.get(numPeriod)))
-                if additionalTimeOfChange != []:
-                    self.label.update({numPeriod: sorted(self.label.get(numPeriod) + additionalTimeOfChange)})
-                    for i in range(len(self.b[partitionFunctionIndex])): self.b[partitionFunctionIndex][i] += ([0] * len(additionalTimeOfChange))
+                if additionalTimeOfChange != []: self.label.update({numPeriod: sorted(self.label.get(numPeriod) + additionalTimeOfChange)})
+
+        # initialize the 3D array b - b[f][i][l] - and the availability of each entry
+        self.numLabel = np.array([len(self.label.get(numPeriod)) for numPeriod in self.partitionFunctionList])
+        self.b = np.zeros((len(self.partitionFunctionList), numAction, self.numLabel.max()))
+        self.available = np.broadcast_to(np.arange(self.b.shape[2]) < self.numLabel[:, np.newaxis, np.newaxis], self.b.shape).copy()
 
-            # set the value of self.b to zero instead of one for action i when it is not available
+        if optimization == True:
+            # mark action i as unavailable for the labels during which it cannot be accessed
             for partitionFunctionIndex, numPeriod in enumerate(self.partitionFunctionList):  # for each partition
                 for labelIndex, time in enumerate(sorted(self.label.get(numPeriod))):
                     for actionID in range(1, numAction + 1):
                         if not problem_instance.isNetworkAccessible(problemInstance, time, actionID, deviceID):
-                            self.b[partitionFunctionIndex][actionID - 1][labelIndex] = -1
+                            self.available[partitionFunctionIndex, actionID - 1, labelIndex] = False
         # end initializeB
 
+    ''' ################################################################################################################################################################### '''
+    def initializeMaxB(self):
+        '''
+        description: computes, for each partition function, the maximum "weight" b of any action for each label and the sum of these maximums; both are then kept up to
+                     date by updateWeight, so that the probability update does not go through b for every action and label
+        args:        self
+        return:      None
+        '''
+        isLabelDefined = np.arange(self.b.shape[2]) < self.numLabel[:, np.newaxis]     # False for padding labels, which do not count in the sum
+        self.maxBPerLabel = np.where(isLabelDefined, np.where(self.available, self.b, -1).max(axis=1), 0)    # -1 for a label with no available action
+        self.sumMaxBPerLabel = self.maxBPerLabel.sum(axis=1)
+        # end initializeMaxB
+
     ''' ################################################################################################################################################################### '''
     def updateProbabilityDistribution(self, t, changeInActionAvailability, currentActionAvailabilityStatus, currentActionIndex, deviceID):
         '''
@@ -114,21 +134,16 @@ class SmartPeriodicEXP4:
         return:      None
         '''
         # compute r
-        r = [0] * self.numAction
-        for i in range(self.numAction):
-            for partitionFunctionIndex, partitionFunction in enumerate(self.partitionFunctionList):
-                currentLabel = SmartPeriodicEXP4.getLabel(self, t, partitionFunction)  # probability update is done at the beginning of time slot; label might have changed
-                if self.b[partitionFunctionIndex][i][currentLabel - 1] != -1:
-                    tmpSumBLabels = 0
-                    for label in range(1, len(self.b[partitionFunctionIndex][0]) + 1): #partitionFunction + 1): # b[f][i][l]
-                        if label != currentLabel: tmpSumBLabels += max([self.b[partitionFunctionIndex][actionIndex][label - 1] for actionIndex in range(self.numAction)])
-                    tmpR = self.b[partitionFunctionIndex][i][currentLabel - 1] + tmpSumBLabels
-                    if tmpR > r[i]: r[i] = tmpR
-                else: r[i] = "-"
+        # probability update is done at the beginning of time slot; label might have changed
+        partitionFunctionIndex, labelIndex = SmartPeriodicEXP4.getCurrentLabelIndex(self, t)
+        tmpSumBLabels = self.sumMaxBPerLabel - self.maxBPerLabel[partitionFunctionIndex, labelIndex]     # for each partition function, sum over the other labels of max b
+        tmpR = self.b[partitionFunctionIndex, :, labelIndex] + tmpSumBLabels[:, np.newaxis]            # tmpR[f][i]
+        r = [max(0, x) if isAvailable else "-" for x, isAvailable in zip(tmpR.max(axis=0).tolist(), self.available[partitionFunctionIndex, :, labelIndex].all(axis=0))]
         r = [x - max([y for y in r if y != "-"]) if x != "-" else "-" for x in r]; r = [exp(x) if x != "-" else 0 for x in r]
 
         # compute probability
         self.probability = list(x/sum(r) for x in r)
+        self.cumulativeProbability = getCumulativeProbability(self.probability)     # used to draw actions (see RandomStream.sampleIndex)
 
         # set the value of blockLengthForHybrid if the probability distribution is not close to uniform from this time slot
         if SmartPeriodicEXP4.isProbabilityCloseToUniform(self) == False and self.blockLengthForHybrid == 0:
@@ -248,7 +263,7 @@ class SmartPeriodicEXP4:
         if self.blockLength == 0:
             if self.actionToExplore != []:
                 ''' exploration '''
-                self.actionSelectedPreviousBlock = currentActionIndex; currentActionIndex = random.choice(self.actionToExplore); self.actionToExplore.remove(currentActionIndex)
+                self.actionSelectedPreviousBlock = currentActionIndex; currentActionIndex = self.randomStream.choice(self.actionToExplore); self.actionToExplore.remove(currentActionIndex)
                 exploration = True
             elif self.switchBack and self.actionSelectedPreviousBlockAvailability:
                 ''' switch back '''
@@ -259,12 +274,12 @@ class SmartPeriodicEXP4:
                 if (0 not in [self.numBlockActionSelected[i] for i in range(self.numAction) if self.actionAvailabilityStatus[i] == 1]) \
                         and (SmartPeriodicEXP4.isProbabilityCloseToUniform(self) or self.blockLengthPerAction[self.probability.index(max(self.probability))] <= self.blockLengthForHybrid):
                     # if (SmartPeriodicEXP4.isProbabilityCloseToUniform(self) == False) and (self.blockLengthPerAction[self.probability.index(max(self.probability))] <= self.blockLengthForHybrid): print("@t =", currentTimeSlot, ", device", deviceID, ", hybrid because block length < blockLengthForHybrid", self.blockLengthForHybrid);
-                    coinFlip = random.randint(1, 2); coinFlipped = True
+                    coinFlip = self.randomStream.randint(1, 2); coinFlipped = True
                     if coinFlip == 1:
                         numMaxAvgerageGainAction, greedySameAction, currentActionIndex = SmartPeriodicEXP4.chooseActionGreedy(self, currentActionIndex); chooseGreedily = 1
-                    else: currentActionIndex = np.random.choice(list(range(self.numAction)), p=self.probability)
+                    else: currentActionIndex = self.randomStream.sampleIndex(self.cumulativeProbability)
 
-                else: currentActionIndex = np.random.choice(list(range(self.numAction)), p=self.probability)
+                else: currentActionIndex = self.randomStream.sampleIndex(self.cumulativeProbability)
 
             self.blockLengthPerAction[currentActionIndex] = self.blockLength = SmartPeriodicEXP4.updateBlockLength(self, self.numBlockActionSelected[currentActionIndex])
             self.numBlockActionSelected[currentActionIndex] += 1
@@ -303,7 +318,7 @@ class SmartPeriodicEXP4:
         else:  # several actions with the same highest average gain; choose one at random
             indices = [i for i, x in enumerate(averageGainPerAction) if x == maxAvgerageGain]
             if currentActionIndex in indices: return numMaxAvgerageGainAction, True, currentActionIndex
-            else: return numMaxAvgerageGainAction, False, random.choice(indices)
+            else: return numMaxAvgerageGainAction, False, self.randomStream.choice(indices)
         # end chooseActionGreedy
 
     ''' ################################################################################################################################################################### '''
@@ -322,9 +337,11 @@ class SmartPeriodicEXP4:
         SmartPeriodicEXP4.mustSwitchBack(self, chosenActionIndex, previousActionIndex, scaledGain)
 
         # update b
-        for partitionFunctionIndex, partitionFunction in enumerate(self.partitionFunctionList):
-            currentLabel = SmartPeriodicEXP4.getLabel(self, t, partitionFunction)
-            self.b[partitionFunctionIndex][chosenActionIndex][currentLabel - 1] += ((self.gamma * estimatedGain) / self.numAction)
+        partitionFunctionIndex, labelIndex = SmartPeriodicEXP4.getCurrentLabelIndex(self, t)
+        self.b[partitionFunctionIndex, chosenActionIndex, labelIndex] += ((self.gamma * estimatedGain) / self.numAction)
+        newB = self.b[partitionFunctionIndex, chosenActionIndex, labelIndex]; maxB = self.maxBPerLabel[partitionFunctionIndex, labelIndex]
+        self.sumMaxBPerLabel += np.where(newB > maxB, newB - maxB, 0)     # b only increases
+        self.maxBPerLabel[partitionFunctionIndex, labelIndex] = np.maximum(newB, maxB)
 
         if self.blockLength == 1:
             self.blockIndex += 1; self.gamma = SmartPeriodicEXP4.computeGamma(self, self.blockIndex)
@@ -359,6 +376,17 @@ class SmartPeriodicEXP4:
         if len(self.preferredActionGainList) > self.maxTimeSlotConsideredPreferredNetwork: self.preferredActionGainList = self.preferredActionGainList[len(self.preferredActionGainList) - self.maxTimeSlotConsideredPreferredNetwork:]
         # end updatePreferredNetworkDetail
 
+    ''' ################################################################################################################################################################### '''
+    def getCurrentLabelIndex(self, t):
+        '''
+        description: determines the label assigned to the current time slot by each partition function, as indices into b
+        args:        self, current time step t
+        returns:     array of partition function indices and array of the corresponding label indices (label - 1)
+        '''
+        labelIndex = np.array([SmartPeriodicEXP4.getLabel(self, t, partitionFunction) - 1 for partitionFunction in self.partitionFunctionList])
+        return np.arange(len(self.partitionFunctionList)), labelIndex
+        # end getCurrentLabelIndex
+
     ''' ################################################################################################################################################################### '''
     def getLabel(self, t, numPartition):
         '''
@@ -366,9 +394,7 @@ class SmartPeriodicEXP4:
         args:        self, current time step t, number of partitions used by the partition function
         returns:     the label assigned to the current time slot by the partition function (which divides the time equally into period time slots)
         '''
-        equivalentTimeSlotInFirstRepetition = self.numTimeSlotPerRepetition if t % self.numTimeSlotPerRepetition == 0 else t % self.numTimeSlotPerRepetition
-        if equivalentTimeSlotInFirstRepetition >= sorted(self.label.get(numPartition))[-1]: return len(self.label.get(numPartition))
-        else: return sorted(self.label.get(numPartition)).index(max(i for i in sorted(self.label.get(numPartition)) if i <= equivalentTimeSlotInFirstRepetition)) + 1
+        return int(self.labelTable[numPartition][(t - 1) % self.numTimeSlotPerRepetition])     # looked up in the table computed by getLabelTable
         # end getLabel
 
     ''' ################################################################################################################################################################### '''
@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+'''
+@description:   Measures the throughput of the simulation over a matrix of device counts, network counts, horizons and algorithms; each configuration is simulated by
+                wns.py, one run at a time, and the number of time slots simulated per second, the peak memory used and the time spent in each phase of the run are saved
+                to a json file, which can be compared with the results of an earlier benchmark (-baseline)
+@assumptions:   each network count is simulated with a problem instance having that number of networks, whose device lists and Nash equilibrium states are defined
+                for the number of devices simulated (see getProblemInstancePerConfiguration); most problem instances are defined for 20 devices only, so configurations
+                without such a problem instance are left out; runs are executed one at a time so that they do not compete for the processor; a run that lasts longer
+                than the timeout is stopped and recorded as failed; peak memory is the maximum resident set size reported by the operating system for wns.py
+'''
+
+import argparse
+import os
+import sys
+import csv
+import json
+import time
+import platform
+import subprocess
+from itertools import product
+import numpy as np
+import global_setting
+import problem_instance
+from utility_method import saveToCSVfile
+
+''' ______________________________________________________________________________ constants ______________________________________________________________________________ '''
+# set from values passed as arguments when the program is executed
+parser = argparse.ArgumentParser(description='Benchmarks the wireless network selection simulation over a matrix of configurations.')
+parser.add_argument('-n', dest="num_device", default=[10, 20, 50], type=int, nargs='+', help='numbers of active devices in the service area')
+parser.add_argument('-k', dest="num_network", default=[3, 5, 9], type=int, nargs='+', help='numbers of wireless networks in the service area')
+parser.add_argument('-t', dest="num_time_slot", default=[1000, 10000], type=int, nargs='+', help='numbers of time slots in each simulation run')
+parser.add_argument('-a', dest="algorithm_name", default=["EXP3", "SmartEXP3", "PeriodicEXP4", "SmartPeriodicEXP4", "FullInformation"], nargs='+',
+                    help='names of selection algorithms used by the devices')
+parser.add_argument('-engine', dest='engine', default=['process'], nargs='+', choices=['process', 'population'], help='simulation engines used by wns.py')
+parser.add_argument('-dir', dest="directory", default="benchmark/", help='directory in which the output of each run and the results of the benchmark are saved')
+parser.add_argument('-repeat', dest='num_repeat_measure', default=1, type=int, help='number of times each configuration is run; the fastest run is reported')
+parser.add_argument('-baseline', dest='baseline', default=None, help='results of an earlier benchmark (json file) to compare with')
+parser.add_argument('-seed', dest='seed', default=0, type=int, help='seed of the runs')
+parser.add_argument('-timeout', dest='timeout', default=3600, type=float, help='time (in seconds) after which a run is stopped and recorded as failed; 0 for no limit')
+
+WNS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wns.py")
+RESULT_FILE = "benchmark_results.json"
+TIME_TAKEN_FILE = "timeTaken.csv"       # time spent in each phase, saved by wns.py
+PHASE_NAME = ["setup", "simulation", "post-processing"]
+POLL_INTERVAL = 0.1                     # time (in seconds) between two checks of whether a run with a timeout has ended
+
+''' _________________________________________________________________ problem instance per configuration __________________________________________________________________ '''
+def getProblemInstancePerConfiguration(numNetworkList, numDeviceList, numTimeSlot):
+    '''
+    description: chooses, for each number of networks and number of devices, the problem instance with that number of networks whose environment changes the least often,
+                 among those whose device lists and Nash equilibrium states are defined for that number of devices (the distance to Nash equilibrium is meaningless
+                 otherwise, and never ends with more devices than in the Nash equilibrium states); noisy problem instances are not considered, as they depend on data files
+    args:        list of numbers of networks, list of numbers of devices, number of time slots (needed to define the problem instances)
+    return:      dictionary mapping each (number of networks, number of devices) to the name of a problem instance, or to None if there is no such problem instance
+    '''
+    problemInstancePerConfiguration = {}
+    for numDevice in numDeviceList:
+        global_setting.constants.update({'num_mobile_device': numDevice, 'num_time_slot': numTimeSlot, 'num_repeat': 1})
+        problem_instance.initialize()
+        for numNetwork in numNetworkList:
+            candidateList = [name for name, definition in problem_instance.PROBLEM_INSTANCES.items() if not name.startswith('noisy')
+                             and len(definition[min(definition)]['data_rate']) == numNetwork
+                             and all(set().union(*phase['device_list']) == set(range(1, numDevice + 1)) and all(sum(NEstate) == numDevice for NEstate in phase['NEstate_list'])
+                                     for phase in definition.values())]
+            problemInstancePerConfiguration.update({(numNetwork, numDevice): min(candidateList, key=lambda name: len(problem_instance.PROBLEM_INSTANCES[name]))
+                                                    if candidateList != [] else None})
+    return problemInstancePerConfiguration
+    # end getProblemInstancePerConfiguration
+
+''' _________________________________________________________________________ run a configuration _________________________________________________________________________ '''
+def runConfiguration(engine, algorithmName, problemInstance, numDevice, numTimeSlot, outputDir, seed, timeout):
+    '''
+    description: simulates one configuration with wns.py; the output of wns.py is saved to a log file in the output directory of the run; wns.py is killed if it has
+                 not ended after the timeout
+    args:        simulation engine, name of the selection algorithm, problem instance, number of devices, number of time slots, output directory, seed, timeout (in
+                 seconds, 0 for no limit)
+    return:      dictionary with the exit status of wns.py, whether it timed out, wall time, time spent in each phase and time slots simulated per second (in seconds),
+                 and peak memory (in MB)
+    '''
+    if not os.path.exists(outputDir): os.makedirs(outputDir)
+    if os.path.exists(outputDir + TIME_TAKEN_FILE): os.remove(outputDir + TIME_TAKEN_FILE)
+    command = [sys.executable, WNS_SCRIPT, '-n', str(numDevice), '-t', str(numTimeSlot), '-r', '1', '-a', algorithmName, '-dir', outputDir, '-st', '1', '-d', '0',
+               '-l', '0.1', '-pt', '0.1', '-pl', '0.1', '-max', '10', '-f', '100', '-sd', '15', '-p', problemInstance, '-rep', '1', '-opt', 'true', '-period', '5',
+               '-roll', '10', '-engine', engine, '-seed', str(seed)]
+    startTime = time.time()
+    with open(outputDir + "wns.log", "w") as logFile:
+        process = subprocess.Popen(command, stdout=logFile, stderr=subprocess.STDOUT, cwd=os.path.dirname(WNS_SCRIPT))
+        # resource usage of this run only; with a timeout, wait4 does not block until the run ends or is killed
+        timedOut = False
+        while True:
+            pid, status, resourceUsage = os.wait4(process.pid, os.WNOHANG if timeout > 0 and not timedOut else 0)
+            if pid != 0: break
+            if time.time() - startTime >= timeout: process.kill(); timedOut = True
+            else: time.sleep(POLL_INTERVAL)
+    wallTime = time.time() - startTime
+    returnCode = os.waitstatus_to_exitcode(status)
+
+    result = {'status': "completed" if returnCode == 0 and not timedOut else "failed", 'timed_out': timedOut, 'wall_time': wallTime,
+              'peak_rss_mb': resourceUsage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)}     # bytes on macOS, kilobytes on Linux
+    if result['status'] == "completed":
+        with open(outputDir + TIME_TAKEN_FILE, newline='') as timeFile: timePerPhase = {row[0]: row[1] for row in list(csv.reader(timeFile, quoting=csv.QUOTE_NONNUMERIC))[1:]}
+        result.update({phase.replace("-", "_") + "_time": timePerPhase[phase] for phase in PHASE_NAME})
+        result.update({'slots_per_sec': numTimeSlot / timePerPhase["simulation"]})
+    return result
+    # end runConfiguration
+
+''' ________________________________________________________________________________ main _________________________________________________________________________________ '''
+def main():
+    args = parser.parse_args()
+    if not os.path.exists(args.directory): os.makedirs(args.directory)
+    problemInstancePerConfiguration = getProblemInstancePerConfiguration(args.num_network, args.num_device, max(args.num_time_slot))
+    for (numNetwork, numDevice), problemInstance in sorted(problemInstancePerConfiguration.items()):
+        if problemInstance == None: print("no problem instance with %d networks defined for %d devices; configurations left out" % (numNetwork, numDevice))
+    if all(problemInstance == None for problemInstance in problemInstancePerConfiguration.values()):
+        raise ValueError("no problem instance for any of the numbers of networks and devices given")
+
+    configurationList = [configuration for configuration in product(args.engine, args.algorithm_name, args.num_network, args.num_device, args.num_time_slot)
+                         if problemInstancePerConfiguration[configuration[2:4]] != None]
+    print("going to benchmark %d configurations..." % (len(configurationList)))
+    resultList = []
+    for configurationIndex, (engine, algorithmName, numNetwork, numDevice, numTimeSlot) in enumerate(configurationList, 1):
+        problemInstance = problemInstancePerConfiguration[(numNetwork, numDevice)]
+        outputDir = os.path.join(os.path.abspath(args.directory), engine, algorithmName, "k%d_n%d_t%d" % (numNetwork, numDevice, numTimeSlot)) + os.sep
+        measureList = [runConfiguration(engine, algorithmName, problemInstance, numDevice, numTimeSlot, outputDir, args.seed, args.timeout)
+                       for i in range(args.num_repeat_measure)]
+        completedList = [measure for measure in measureList if measure['status'] == "completed"]
+        result = min(completedList, key=lambda measure: measure['simulation_time']) if completedList != [] else measureList[-1]     # fastest run
+        result = dict({'engine': engine, 'algorithm': algorithmName, 'num_network': numNetwork, 'num_device': numDevice, 'num_time_slot': numTimeSlot,
+                       'problem_instance': problemInstance}, **result)
+        resultList.append(result)
+        if result['status'] == "completed":
+            print("[%d/%d] %s %s k=%d n=%d t=%d: %.1f slots/sec, %.1f MB, post-processing %.2f seconds" % (configurationIndex, len(configurationList), engine, algorithmName,
+                  numNetwork, numDevice, numTimeSlot, result['slots_per_sec'], result['peak_rss_mb'], result['post_processing_time']))
+        else: print("[%d/%d] %s %s k=%d n=%d t=%d: FAILED%s (see %swns.log)" % (configurationIndex, len(configurationList), engine, algorithmName, numNetwork, numDevice,
+                    numTimeSlot, " (timed out after %g seconds)" % (args.timeout) if result['timed_out'] else "", outputDir))
+
+    # results, with what is needed to tell benchmarks apart
+    try: commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(WNS_SCRIPT), stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError): commit = None
+    benchmark = {'date': time.strftime("%Y-%m-%d %H:%M:%S"), 'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.node(),
+                 'processor': platform.processor(), 'results': resultList}
+    with open(os.path.join(args.directory, RESULT_FILE), "w") as resultFile: json.dump(benchmark, resultFile, indent=1)
+
+    # speedup over an earlier benchmark, for the configurations completed in both
+    if args.baseline != None:
+        with open(args.baseline) as baselineFile: baseline = json.load(baselineFile)
+        configurationKey = lambda result: (result['engine'], result['algorithm'], result['num_network'], result['num_device'], result['num_time_slot'])
+        baselineResult = {configurationKey(result): result for result in baseline['results'] if result['status'] == "completed"}
+        comparison = [["engine", "algorithm", "num_network", "num_device", "num_time_slot", "slots_per_sec (baseline)", "slots_per_sec", "speedup", "peak_rss_mb (baseline)",
+                       "peak_rss_mb"]]
+        for result in resultList:
+            if result['status'] != "completed" or configurationKey(result) not in baselineResult: continue
+            before = baselineResult[configurationKey(result)]
+            comparison.append(list(configurationKey(result)) + [before['slots_per_sec'], result['slots_per_sec'], result['slots_per_sec'] / before['slots_per_sec'],
+                                                                before['peak_rss_mb'], result['peak_rss_mb']])
+            print("%s %s k=%d n=%d t=%d: %.2fx (%.1f -> %.1f slots/sec)" % tuple(comparison[-1][:5] + [comparison[-1][7], comparison[-1][5], comparison[-1][6]]))
+        saveToCSVfile(os.path.join(args.directory, "benchmark_comparison.csv"), comparison, "w")
+    print("----- %d configurations benchmarked; results saved to %s -----" % (len(resultList), os.path.join(args.directory, RESULT_FILE)))
+    # end main
+
+if __name__ == "__main__":
+    main()
+
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
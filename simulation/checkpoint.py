@@ -0,0 +1,84 @@
+'''
+@description:   Defines periodic checkpoints of a simulation run, from which an interrupted run can be resumed (see -checkpoint and -resume in wns.py); a checkpoint is a
+                pickle of all the state the rest of the run depends on: the algorithm objects, the devices and networks (with their association sets), the class counters
+                of devices and networks, the random number generators, the summary gathered so far, and how much of each output file was written
+@assumptions:   checkpoints are taken at the end of a time slot at which the per time slot details were just saved to file; the simpy processes of the devices cannot be
+                saved, they are started again from the next time slot
+'''
+
+''' ______________________________________________________________________ import external libraries ______________________________________________________________________ '''
+import os
+import pickle
+import random
+from math import ceil
+import numpy as np
+
+''' ______________________________________________________________________________ constants ______________________________________________________________________________ '''
+CHECKPOINT_FILE = "checkpoint.pkl"      # saved in the output directory of the run
+
+''' _____________________________________________________________________ Checkpoint class definition _____________________________________________________________________ '''
+class Checkpoint(object):
+    def __init__(self, directory, frequency, saveToFileFrequency, numTimeSlot, parameter):
+        self.filepath = directory + CHECKPOINT_FILE
+        self.frequency = ceil(frequency / saveToFileFrequency) * saveToFileFrequency if frequency > 0 else 0     # rounded up to a time slot at which files are saved
+        self.numTimeSlot = numTimeSlot
+        self.parameter = parameter              # parameters of the run; a run can only be resumed with the same parameters
+        self.getState = None                    # function returning the state to save (dictionary), set by the engine running the simulation
+        self.getOutputData = None               # function returning the list of output data objects (CSVdata or ColumnarData), set by the engine
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def isDue(self, timeSlot):
+        '''
+        description: determines whether a checkpoint must be taken at the end of a time slot
+        args:        self, the current time slot
+        returns:     True or False
+        '''
+        return self.frequency > 0 and timeSlot % self.frequency == 0 and timeSlot < self.numTimeSlot
+        # end isDue
+
+    ''' ################################################################################################################################################################### '''
+    def save(self, timeSlot):
+        '''
+        description: saves the state of the run at the end of a time slot; the checkpoint is first written to a temporary file, so that the previous checkpoint is kept
+                     if the run is killed while saving
+        args:        self, the current time slot
+        returns:     None
+        '''
+        outputData = self.getOutputData()
+        state = {'parameter': self.parameter, 'time_slot': timeSlot, 'state': self.getState(), 'output_data': outputData,
+                 'output_offset': [data.getFileOffset() for data in outputData], 'random_state': random.getstate(), 'numpy_random_state': np.random.get_state()}
+        with open(self.filepath + ".tmp", "wb") as checkpointFile: pickle.dump(state, checkpointFile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(self.filepath + ".tmp", self.filepath)
+        print("@t = ", timeSlot, " - checkpoint saved")
+        # end save
+
+    ''' ################################################################################################################################################################### '''
+    def load(self):
+        '''
+        description: restores the random number generators and the output files as they were when the last checkpoint was taken (rows saved to file afterwards are
+                     removed), and returns the state saved
+        args:        self
+        returns:     last time slot completed and state saved by the engine, or (0, None) if there is no checkpoint
+        '''
+        if not os.path.exists(self.filepath): return 0, None
+        with open(self.filepath, "rb") as checkpointFile: state = pickle.load(checkpointFile)
+        if state['parameter'] != self.parameter: raise ValueError("the checkpoint in %s was taken with different parameters: %s" % (self.filepath, state['parameter']))
+        for data, offset in zip(state['output_data'], state['output_offset']): data.truncateFile(offset)
+        random.setstate(state['random_state']); np.random.set_state(state['numpy_random_state'])
+        print("resuming from the checkpoint taken at t = ", state['time_slot'])
+        return state['time_slot'], state['state']
+        # end load
+
+    ''' ################################################################################################################################################################### '''
+    def remove(self):
+        '''
+        description: deletes the checkpoint once the run is completed
+        args:        self
+        returns:     None
+        '''
+        for filepath in [self.filepath, self.filepath + ".tmp"]:
+            if os.path.exists(filepath): os.remove(filepath)
+        # end remove
+# end class Checkpoint
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
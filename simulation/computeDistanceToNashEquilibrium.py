@@ -3,9 +3,11 @@ import csv
 import problem_instance
 from termcolor import colored
 import pickle
-from utility_method import computeNashEquilibriumState, saveToCSVfile
+from utility_method import computeNashEquilibriumState, saveToCSVfile, isColumnarData, loadColumnarRows, getDevicePerNetwork
 import global_setting
 from statistics import median
+from collections import OrderedDict
+import numpy as np
 
 numDevice = 20
 numTimeSlot = 86400
@@ -15,6 +17,7 @@ problemInstance = "mobility_setup3"
 algorithmName = "EXP4"
 rootDir = "/media/cirlab/SeagateDrive/PeriodicEXP3/" + problemInstance + "/" + algorithmName + "/"
 DISTANCE_TYPE = "PERCENTAGE"
+DISTANCE_CACHE_SIZE = 4096     # maximum number of (environment, assignment of devices to networks) states whose distance to Nash equilibrium is remembered
 
 def buildGraph(networkIDlist, devicePerNetwork, deviceListPerNetwork):
     '''
@@ -136,21 +139,77 @@ def chooseBestNashEquilibriumState(NElist, numDevicePerNetwork):
     return NElist[countNumDeviceToMove.index(minNumDeviceToMove)]
     # end selectNashEquilibriumState
 
-def computeDistanceToNashEquilibrium(problemInstance, numTimeSlot, networkData, numDevice):
-    '''
-    description: computes the distance to Nash equilibrium per time slot and returns it as a list
-    args:        name of the problem instance being considered, the total number of time slots, details about the network for each time slot
-    return:      list of distance to Nash equilibrium per time slot
-    '''
-    distanceToNE = []       # to store distance to Nash equilibrium per time steps for one run
-    networkDataRate = []; numNetwork = len(networkDataRate); networkIDlist = []; deviceListPerNetwork = []; NElist = []
+class NashEquilibriumDistance(object):
+    ''' computes the distance to Nash equilibrium one time slot at a time, so that it can be computed while the simulation runs; the time slots must be considered in
+        order, as details of the environment are only retrieved from the problem instance when it changes; the distance of the most recently seen states (environment and
+        network of each device) is remembered in a bounded LRU cache, as devices usually stay in the same state for many time slots once they settle '''
+    def __init__(self, problemInstance, numDevice, cacheSize=DISTANCE_CACHE_SIZE):
+        self.problemInstance = problemInstance
+        self.numDevice = numDevice
+        self.networkDataRate = []; self.numNetwork = len(self.networkDataRate); self.networkIDlist = []; self.deviceListPerNetwork = []; self.NElist = []
+        self.scenarioKey = None                                                         # identifies the environment the details above were retrieved for
+        self.distanceCache = OrderedDict(); self.cacheSize = cacheSize                 # state signature -> distance to Nash equilibrium, least recently used first
+        self.numCacheHit = 0; self.numCacheMiss = 0
+        # end __init__
 
-    print("in compute distance to Nash equilibrium")
-    # f = open('networkDataRate.pkl', 'rb')  # 'r' for reading; can be omitted
-    # dataRatePickle = pickle.load(f)  # load file content as mydict
-    # f.close()
+    def getScenarioKey(self, timeSlot):
+        '''
+        description: identifies the environment at a time slot, once its details have been retrieved from the problem instance
+        args:        self, the current time slot
+        return:      index of the key of the problem instance, data rates and Nash equilibrium state(s) (the last two may differ from one repetition to the next if noisy)
+        '''
+        keyIndex = timeSlot if self.problemInstance == "continuous" else problem_instance.getKeyIndex(self.problemInstance, timeSlot)
+        return keyIndex, tuple(self.networkDataRate), tuple(tuple(NEstate) for NEstate in self.NElist)
+        # end getScenarioKey
+
+    def getStateSignature(self, row):
+        '''
+        description: builds the key under which the distance to Nash equilibrium at a time slot is cached
+        args:        self, details about the network for the time slot (a row of network.csv)
+        return:      environment and network of each device
+        '''
+        return self.scenarioKey, tuple(row[2 + (3 * self.numNetwork):])
+        # end getStateSignature
+
+    def getCachedDistance(self, signature):
+        '''
+        description: looks up the distance to Nash equilibrium of a state seen before
+        args:        self, signature of the state
+        return:      the distance to Nash equilibrium, None if the state is not in the cache
+        '''
+        distance = self.distanceCache.get(signature)
+        if distance != None: self.distanceCache.move_to_end(signature); self.numCacheHit += 1
+        return distance
+        # end getCachedDistance
+
+    def saveDistance(self, signature, distance):
+        '''
+        description: saves the distance to Nash equilibrium of a state in the cache, dropping the least recently used state if the cache is full
+        args:        self, signature of the state, its distance to Nash equilibrium
+        return:      the distance to Nash equilibrium
+        '''
+        self.numCacheMiss += 1
+        if self.cacheSize > 0:
+            self.distanceCache[signature] = distance
+            if len(self.distanceCache) > self.cacheSize: self.distanceCache.popitem(last=False)
+        return distance
+        # end saveDistance
+
+    def printCacheStatistics(self):
+        numLookup = self.numCacheHit + self.numCacheMiss
+        print("distance to Nash equilibrium cache: %d hits, %d misses (hit rate %.1f%%), %d states cached" % (self.numCacheHit, self.numCacheMiss,
+              (100 * self.numCacheHit / numLookup) if numLookup > 0 else 0, len(self.distanceCache)))
+        # end printCacheStatistics
+
+    def computeDistance(self, row):
+        '''
+        description: computes the distance to Nash equilibrium at one time slot
+        args:        self, details about the network for the time slot (a row of network.csv)
+        return:      distance to Nash equilibrium
+        '''
+        problemInstance = self.problemInstance
+        networkDataRate, numNetwork, NElist, networkIDlist, deviceListPerNetwork = self.networkDataRate, self.numNetwork, self.NElist, self.networkIDlist, self.deviceListPerNetwork
 
-    for row in networkData: # each time slot
         # print("row", row)
         timeSlot = int(row[1])
 
@@ -166,10 +225,16 @@ def computeDistanceToNashEquilibrium(problemInstance, numTimeSlot, networkData,
             NElist = problem_instance.getNashEquilibriumState(problemInstance, timeSlot)
             networkIDlist = list(range(1, numNetwork + 1))
             deviceListPerNetwork = problem_instance.getDeviceListPerNetwork(problemInstance, timeSlot)
+            self.networkDataRate, self.numNetwork, self.NElist, self.networkIDlist, self.deviceListPerNetwork = networkDataRate, numNetwork, NElist, networkIDlist, deviceListPerNetwork
+            self.scenarioKey = NashEquilibriumDistance.getScenarioKey(self, timeSlot)
+
+        # the same state was seen before, e.g. devices stayed in the same network
+        signature = NashEquilibriumDistance.getStateSignature(self, row); distance = NashEquilibriumDistance.getCachedDistance(self, signature)
+        if distance != None: return distance
 
         numDevicePerNetwork = [row[2 + (2 * numNetwork) + i] for i in range(numNetwork)]                   # construct list with number of devices per network
         # print("numDevicePerNetwork:", numDevicePerNetwork)
-        devicePerNetwork = [row[2 + (3 * numNetwork) + i] for i in range(numNetwork)]       # construct list of sets of devices that selected each network
+        devicePerNetwork = getDevicePerNetwork(row[2 + (3 * numNetwork):], numNetwork)      # construct list of sets of devices that selected each network
         networkGraph = buildGraph(networkIDlist, devicePerNetwork, deviceListPerNetwork)    # build graph of networks and devices
         sortedNetworkIDList = sortNetworkList(networkGraph)                                 # sort list of network IDs in order of accessibility
 
@@ -222,22 +287,235 @@ def computeDistanceToNashEquilibrium(problemInstance, numTimeSlot, networkData,
                 tmpDistance = (gainAtNE - currentGain) * 100/gainAtNE if DISTANCE_TYPE == "PERCENTAGE" else gainAtNE - currentGain
                 if tmpDistance > distance: distance = tmpDistance
 
-        distanceToNE.append(distance);
         if any(x < 0 for x in numDeviceDiff): print("@", timeSlot, "--- numDeviceDiff:", numDeviceDiff, ", SOMETHING WENT WRONG!!!"); input()
+        return NashEquilibriumDistance.saveDistance(self, signature, distance)
+        # end computeDistance
+    # end class NashEquilibriumDistance
+
+class NetworkAdjacency(object):
+    ''' graph of networks used by NashEquilibriumDistanceArray in place of a networkx.DiGraph: an edge from network a to network b exists if some device on a has access to b;
+        edges are kept in a (network x network) boolean adjacency matrix, the devices along each edge in a set, and the order in which edges were added in an integer
+        matrix, so that neighbors are visited in the same order as networkx (insertion order) and the same shortest path is found when there are several '''
+    def __init__(self, numNetwork):
+        self.numNetwork = numNetwork
+        self.adjacency = np.zeros((numNetwork + 1, numNetwork + 1), dtype=bool)          # indexed by network ID; row/column 0 unused
+        self.edgeOrder = np.zeros((numNetwork + 1, numNetwork + 1), dtype=np.int64)
+        self.numEdgeAdded = 0
+        self.deviceList = {}                                                              # (from network ID, to network ID) -> set of devices that can move along the edge
+        # end __init__
+
+    def addEdge(self, fromNetworkID, toNetworkID):
+        self.adjacency[fromNetworkID, toNetworkID] = True; self.numEdgeAdded += 1; self.edgeOrder[fromNetworkID, toNetworkID] = self.numEdgeAdded
+        self.deviceList[(fromNetworkID, toNetworkID)] = set()
+
+    def removeEdge(self, fromNetworkID, toNetworkID):
+        self.adjacency[fromNetworkID, toNetworkID] = False; del self.deviceList[(fromNetworkID, toNetworkID)]
+
+    def hasEdge(self, fromNetworkID, toNetworkID):
+        return self.adjacency[fromNetworkID, toNetworkID]
+
+    def getSuccessor(self, networkID):
+        successor = np.flatnonzero(self.adjacency[networkID])
+        return successor[np.argsort(self.edgeOrder[networkID, successor])].tolist()
+
+    def getPredecessor(self, networkID):
+        predecessor = np.flatnonzero(self.adjacency[:, networkID])
+        return predecessor[np.argsort(self.edgeOrder[predecessor, networkID])].tolist()
+
+    def getSortedNetworkIDList(self):
+        ''' network IDs in ascending order of indegree (ties in order of network ID), as sortNetworkList '''
+        return (np.argsort(self.adjacency[1:, 1:].sum(axis=0), kind='stable') + 1).tolist()
+
+    def getShortestPath(self, source, target):
+        '''
+        description: finds a shortest path between two networks with a bidirectional breadth first search, expanding the smaller fringe first (as nx.shortest_path)
+        args:        self, ID of source network, ID of target network
+        return:      list of networks on the path (from source to target); empty list if there is no path
+        '''
+        pred = {source: None}; succ = {target: None}; forwardFringe = [source]; reverseFringe = [target]; meetingNetwork = None
+        while forwardFringe and reverseFringe and meetingNetwork == None:
+            if len(forwardFringe) <= len(reverseFringe):
+                thisLevel = forwardFringe; forwardFringe = []
+                for v in thisLevel:
+                    for w in NetworkAdjacency.getSuccessor(self, v):
+                        if w not in pred: forwardFringe.append(w); pred[w] = v
+                        if w in succ: meetingNetwork = w; break
+                    if meetingNetwork != None: break
+            else:
+                thisLevel = reverseFringe; reverseFringe = []
+                for v in thisLevel:
+                    for w in NetworkAdjacency.getPredecessor(self, v):
+                        if w not in succ: succ[w] = v; reverseFringe.append(w)
+                        if w in pred: meetingNetwork = w; break
+                    if meetingNetwork != None: break
+        if meetingNetwork == None: return []
+        path = []; w = meetingNetwork
+        while w != None: path.append(w); w = pred[w]
+        path.reverse(); w = succ[path[-1]]
+        while w != None: path.append(w); w = succ[w]
+        return path
+    # end class NetworkAdjacency
+
+class NashEquilibriumDistanceArray(NashEquilibriumDistance):
+    ''' computes the same distance to Nash equilibrium as NashEquilibriumDistance without building a networkx graph per time slot: network accessibility is a (network x
+        device) boolean matrix, the graph of networks a NetworkAdjacency, and no graph is built when the current state is a Nash equilibrium '''
+    def __init__(self, problemInstance, numDevice, cacheSize=DISTANCE_CACHE_SIZE):
+        NashEquilibriumDistance.__init__(self, problemInstance, numDevice, cacheSize)
+        self.accessible = np.zeros((1, 1), dtype=bool)      # accessible[network ID][device ID]
+        # end __init__
+
+    def computeDistance(self, row):
+        '''
+        description: computes the distance to Nash equilibrium at one time slot
+        args:        self, details about the network for the time slot (a row of network.csv)
+        return:      distance to Nash equilibrium
+        '''
+        timeSlot = int(row[1])
+        if self.problemInstance == "continuous" or problem_instance.changeInEnvironment(self.problemInstance, timeSlot):
+            self.networkDataRate = problem_instance.getNetworkDataRate(self.problemInstance, timeSlot); self.numNetwork = len(self.networkDataRate)
+            self.NElist = problem_instance.getNashEquilibriumState(self.problemInstance, timeSlot)
+            self.networkIDlist = list(range(1, self.numNetwork + 1))
+            self.deviceListPerNetwork = problem_instance.getDeviceListPerNetwork(self.problemInstance, timeSlot)
+            maxDeviceID = max([self.numDevice] + [deviceID for devices in self.deviceListPerNetwork for deviceID in devices])
+            self.accessible = np.zeros((self.numNetwork + 1, maxDeviceID + 1), dtype=bool)
+            for networkIndex, devices in enumerate(self.deviceListPerNetwork): self.accessible[networkIndex + 1, list(devices)] = True
+            self.scenarioKey = NashEquilibriumDistance.getScenarioKey(self, timeSlot)
+        networkDataRate, numNetwork, NElist = self.networkDataRate, self.numNetwork, self.NElist
+
+        signature = NashEquilibriumDistance.getStateSignature(self, row); distance = NashEquilibriumDistance.getCachedDistance(self, signature)
+        if distance != None: return distance
+
+        numDevicePerNetwork = [row[2 + (2 * numNetwork) + i] for i in range(numNetwork)]                   # construct list with number of devices per network
+        if numDevicePerNetwork in NElist: return NashEquilibriumDistance.saveDistance(self, signature, 0)                                                        # current state is one of the Nash equilibrium state(s)
+
+        devicePerNetwork = getDevicePerNetwork(row[2 + (3 * numNetwork):], numNetwork)                    # construct list of sets of devices that selected each network
+        networkGraph = NashEquilibriumDistanceArray.buildGraph(self, devicePerNetwork)
+        sortedNetworkIDList = networkGraph.getSortedNetworkIDList()
+
+        distance = 0; moveSet = {}
+        NE = chooseBestNashEquilibriumState(NElist, numDevicePerNetwork)    # select the NE state requiring the least number of device switches
+        numDeviceDiff = list(numDeviceAtNE - numDeviceAtPresent for numDeviceAtNE, numDeviceAtPresent in zip(NE, numDevicePerNetwork))
+        pathLength = 1
+        while any(x < 0 for x in numDeviceDiff):
+            if pathLength == numNetwork: pathLength = 1
+            for fromNetworkID in sortedNetworkIDList:
+                if numDeviceDiff[fromNetworkID - 1] < 0:
+                    for toNetworkID in sortedNetworkIDList:
+                        if numDeviceDiff[toNetworkID - 1] > 0:
+                            networkOnPath = networkGraph.getShortestPath(fromNetworkID, toNetworkID)
+                            if (len(networkOnPath) - 1) == pathLength:
+                                maxNumDeviceToMove = min(numDeviceDiff[toNetworkID - 1], abs(numDeviceDiff[fromNetworkID - 1]))
+                                numDeviceToMove, tmpMoveSet = NashEquilibriumDistanceArray.moveDevice(self, networkOnPath, maxNumDeviceToMove, networkGraph, timeSlot, numDevicePerNetwork)
+                                for device in tmpMoveSet:
+                                    if device in moveSet: moveSet[device]['network'] = tmpMoveSet[device]['network']
+                                    else: moveSet.update({device:tmpMoveSet[device]})
+                                numDeviceDiff[fromNetworkID - 1] += numDeviceToMove; numDeviceDiff[toNetworkID - 1] -= numDeviceToMove
+                                # no more devices to move from network fromNetworkID, compute how much higher gain the remaining devices in that network will get
+                                if numDeviceDiff[fromNetworkID - 1] == 0:
+                                    if NE[fromNetworkID - 1] != 0:
+                                        currentGain = networkDataRate[fromNetworkID - 1] / numDevicePerNetwork[fromNetworkID - 1]
+                                        gainAtNE = networkDataRate[fromNetworkID - 1] / NE[fromNetworkID - 1]
+                                        tmpDistance = ((gainAtNE - currentGain) * 100/gainAtNE) if DISTANCE_TYPE == "PERCENTAGE" else gainAtNE - currentGain
+                                        if tmpDistance > distance: distance = tmpDistance
+                                    break
+            pathLength += 1
+        # compute distance based on the set of moves of devices
+        for device in moveSet:
+            destinationNetwork = moveSet[device]['network']; currentGain = moveSet[device]['currentGain']
+            gainAtNE = networkDataRate[destinationNetwork - 1] / NE[destinationNetwork - 1]
+            tmpDistance = (gainAtNE - currentGain) * 100/gainAtNE if DISTANCE_TYPE == "PERCENTAGE" else gainAtNE - currentGain
+            if tmpDistance > distance: distance = tmpDistance
+        return NashEquilibriumDistance.saveDistance(self, signature, distance)
+        # end computeDistance
+
+    def isAccessible(self, networkID, deviceID):
+        return deviceID < self.accessible.shape[1] and self.accessible[networkID, deviceID]
+
+    def buildGraph(self, devicePerNetwork):
+        ''' same graph as buildGraph; devices are added to the edges in the same order, so that the sets of devices are iterated in the same order '''
+        networkGraph = NetworkAdjacency(self.numNetwork)
+        for fromNetworkID in range(1, self.numNetwork + 1):
+            for deviceID in devicePerNetwork[fromNetworkID - 1]:
+                for toNetworkID in self.networkIDlist:
+                    if fromNetworkID != toNetworkID and NashEquilibriumDistanceArray.isAccessible(self, toNetworkID, deviceID):
+                        if not networkGraph.hasEdge(fromNetworkID, toNetworkID): networkGraph.addEdge(fromNetworkID, toNetworkID)
+                        networkGraph.deviceList[(fromNetworkID, toNetworkID)].add(deviceID)
+        return networkGraph
+
+    def getDeviceToMove(self, fromNetworkID, deviceList, currentTimeSlot, numDevicePerNetwork):
+        ''' same as getDeviceToMove '''
+        deviceID = -1
+        for device in deviceList:
+            if deviceID == -1: deviceID = device
+            if not NashEquilibriumDistanceArray.isAccessible(self, fromNetworkID, device): return device, 0
+        if numDevicePerNetwork[fromNetworkID - 1] == 0: print(colored("time: " + str(currentTimeSlot) + ", deviceID: " + str(deviceID) + " from " + str(fromNetworkID), "red"))
+        dataRate = self.networkDataRate[fromNetworkID - 1]/numDevicePerNetwork[fromNetworkID - 1] if numDevicePerNetwork[fromNetworkID - 1] > 0 else 0
+        return deviceID, dataRate
+
+    def moveDevice(self, networkOnPath, maxNumDeviceToMove, networkGraph, currentTimeSlot, numDevicePerNetwork):
+        ''' same as moveDevice '''
+        moveSet = {}
+        numDeviceToMove = maxNumDeviceToMove
+        for fromNetwork, toNetwork in zip(networkOnPath[:-1], networkOnPath[1:]): numDeviceToMove = min(numDeviceToMove, len(networkGraph.deviceList[(fromNetwork, toNetwork)]))
+
+        deviceMovedList = []
+        for fromNetwork, toNetwork in zip(networkOnPath[:-1], networkOnPath[1:]):
+            for deviceID in deviceMovedList:
+                if NashEquilibriumDistanceArray.isAccessible(self, toNetwork, deviceID): networkGraph.deviceList[(fromNetwork, toNetwork)].add(deviceID)
+            for i in range(numDeviceToMove):
+                deviceID, currentGain = NashEquilibriumDistanceArray.getDeviceToMove(self, fromNetwork, networkGraph.deviceList[(fromNetwork, toNetwork)], currentTimeSlot, numDevicePerNetwork)
+                if deviceID not in moveSet: moveSet.update({deviceID: {'currentGain': currentGain, 'network': toNetwork}})
+                else: moveSet[deviceID].update({'network': toNetwork})
+                # remove the device from all edges leaving fromNetwork
+                for tmpToNetwork in range(1, self.numNetwork + 1):
+                    if networkGraph.hasEdge(fromNetwork, tmpToNetwork) and deviceID in networkGraph.deviceList[(fromNetwork, tmpToNetwork)]:
+                        networkGraph.deviceList[(fromNetwork, tmpToNetwork)].remove(deviceID)
+                        if networkGraph.deviceList[(fromNetwork, tmpToNetwork)] == set(): networkGraph.removeEdge(fromNetwork, tmpToNetwork)
+                deviceMovedList.append(deviceID)
+
+        # update the graph based on the movement of the device(s)
+        for device in moveSet:
+            fromNetwork = moveSet[device]['network']
+            for network in range(1, self.numNetwork + 1):
+                if network != fromNetwork and NashEquilibriumDistanceArray.isAccessible(self, network, device):
+                    if not networkGraph.hasEdge(fromNetwork, network): networkGraph.addEdge(fromNetwork, network)
+                    networkGraph.deviceList[(fromNetwork, network)].add(device)
+        return numDeviceToMove, moveSet
+    # end class NashEquilibriumDistanceArray
+
+def computeDistanceToNashEquilibrium(problemInstance, numTimeSlot, networkData, numDevice, engine="graph"):
+    '''
+    description: computes the distance to Nash equilibrium per time slot and returns it as a list
+    args:        name of the problem instance being considered, the total number of time slots, details about the network for each time slot, implementation used ("graph"
+                 for networkx graphs, "array" for NashEquilibriumDistanceArray)
+    return:      list of distance to Nash equilibrium per time slot
+    '''
+    print("in compute distance to Nash equilibrium")
+    nashEquilibriumDistance = NashEquilibriumDistanceArray(problemInstance, numDevice) if engine == "array" else NashEquilibriumDistance(problemInstance, numDevice)
+    distanceToNE = [nashEquilibriumDistance.computeDistance(row) for row in networkData]    # distance to Nash equilibrium per time steps for one run
+    nashEquilibriumDistance.printCacheStatistics()
     return distanceToNE
     # end computeDistanceToNashEquilibrium
 
 def extractDataFromFile(inputCSVfile):
-    networkData = []
+    '''
+    description: reads the network details saved to a csv file (network.csv); files saved with the set of devices of each network ("device list" columns) rather than the
+                 network of each device are converted to the latter
+    args:        path of the csv file
+    return:      list of rows, one per time slot
+    '''
+    networkData = []; headers = []
     with open(inputCSVfile) as csv_file:
         csv_reader = csv.reader(csv_file, delimiter=',')
         count = 0
         for row in csv_reader:
+            if count == 0: headers = row
             if count > 0:
                 for i in range(len(row)):
                     element = row[i]
                     if element == 'set()': row[i] = set()
                     elif '.' in element: row[i] = float(element)
+                    elif element.isalpha(): continue    # wireless technology
                     elif '{' in element:
                         userList = set()
                         row[i] = row[i][1:-1]; row[i] = row[i].split(','); row[i] = [int(x) for x in row[i]];
@@ -247,6 +525,15 @@ def extractDataFromFile(inputCSVfile):
                 networkData.append(row)
             count += 1
     csv_file.close()
+
+    deviceListIndex = [index for index, header in enumerate(headers) if header.startswith("device list")]
+    if deviceListIndex != []:
+        numDevice = max([max(row[index], default=0) for row in networkData for index in deviceListIndex], default=0)
+        for rowIndex, row in enumerate(networkData):
+            networkPerDevice = [0] * numDevice
+            for networkID, index in enumerate(deviceListIndex, 1):
+                for deviceID in row[index]: networkPerDevice[deviceID - 1] = networkID
+            networkData[rowIndex] = row[:deviceListIndex[0]] + networkPerDevice
     return networkData
     # end extractDataFromFile
 
@@ -264,8 +551,9 @@ def main():
     for runIndex in range(1, numRun+1):
         runDir = rootDir + "run" + str(runIndex) + "/"
         print("runDir:",runDir)
-        # load the network details from csv file
-        networkData = extractDataFromFile(runDir + "network.csv")
+        # load the network details from csv file (or from the columnar files if the run was saved in that format)
+        if isColumnarData(runDir + "network.csv"): networkData = loadColumnarRows(runDir + "network.csv")
+        else: networkData = extractDataFromFile(runDir + "network.csv")
         print("networkData:", networkData)
         # call the function to compute the distance to Nash equilibrium
         distancetoNE = computeDistanceToNashEquilibrium(problemInstance, numTimeSlot, networkData, numDevice)
@@ -0,0 +1,69 @@
+'''
+@description:   Defines a sampler of the delay incurred when switching network: Johnson's SU distribution for WiFi networks and Student's t-distribution for cellular
+                networks (identified as best fits to 500 delay values measured in real experiments; see delay_model/), capped to the min and max delay observed; delays
+                are drawn in large vectorized batches per wireless technology from a seeded generator and handed out one (or a few) at a time
+@assumptions:   the technology of a network is either WiFi or cellular (anything other than 'WiFi' is considered as cellular)
+'''
+
+''' ______________________________________________________________________ import external libraries ______________________________________________________________________ '''
+import numpy as np
+from scipy.stats import t, johnsonsu
+
+''' ______________________________________________________________________________ constants ______________________________________________________________________________ '''
+WIFI_DELAY = [3.0659475327, 14.6918344498]          # min and max delay observed for wifi in some real experiments; used as caps for the delay generated
+CELLULAR_DELAY = [4.2531193161, 14.3172883892]      # min and max delay observed for 3G in some real experiments; used as caps for the delay generated
+POOL_SIZE = 1024                                    # number of delays drawn at once for a technology
+
+''' ____________________________________________________________________ DelaySampler class definition ____________________________________________________________________ '''
+class DelaySampler(object):
+    def __init__(self, seed=None, poolSize=POOL_SIZE):
+        self.rng = np.random.default_rng(seed)      # own generator, so that the delays do not depend on the other random draws of the simulation
+        self.poolSize = poolSize
+        self.pool = {'WiFi': np.empty(0), 'cellular': np.empty(0)}     # delays drawn in advance per technology
+        self.poolIndex = {'WiFi': 0, 'cellular': 0}                     # index of the next delay to hand out from each pool
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def refillPool(self, technology):
+        '''
+        description: draws a new batch of capped delays for a technology
+        args:        self, 'WiFi' or 'cellular'
+        returns:     None
+        '''
+        if technology == 'WiFi':
+            delay = np.clip(johnsonsu.rvs(0.29822254217554717, 0.71688524931466857, loc=6.6093350624107909, scale=0.5595970482712973, size=self.poolSize,
+                                          random_state=self.rng), WIFI_DELAY[0], WIFI_DELAY[1])
+        else: delay = np.clip(t.rvs(0.43925241212097499, loc=4.4877772816533934, scale=0.024357324434644639, size=self.poolSize, random_state=self.rng), CELLULAR_DELAY[0], CELLULAR_DELAY[1])
+        self.pool[technology] = delay; self.poolIndex[technology] = 0
+        # end refillPool
+
+    ''' ################################################################################################################################################################### '''
+    def getDelay(self, technology):
+        '''
+        description: generates the delay of one switch to a network
+        args:        self, wireless technology of the network joined
+        returns:     a delay value (in seconds)
+        '''
+        technology = 'WiFi' if technology == 'WiFi' else 'cellular'
+        if self.poolIndex[technology] == len(self.pool[technology]): DelaySampler.refillPool(self, technology)
+        delay = self.pool[technology][self.poolIndex[technology]]; self.poolIndex[technology] += 1
+        return float(delay)
+        # end getDelay
+
+    ''' ################################################################################################################################################################### '''
+    def getDelayBatch(self, technology, size):
+        '''
+        description: generates the delays of several switches to networks of the same technology
+        args:        self, wireless technology of the networks joined, number of delays
+        returns:     array of delay values (in seconds)
+        '''
+        technology = 'WiFi' if technology == 'WiFi' else 'cellular'
+        delay = []
+        while size > 0:
+            if self.poolIndex[technology] == len(self.pool[technology]): DelaySampler.refillPool(self, technology)
+            numDelay = min(size, len(self.pool[technology]) - self.poolIndex[technology])
+            delay.append(self.pool[technology][self.poolIndex[technology]:self.poolIndex[technology] + numDelay]); self.poolIndex[technology] += numDelay; size -= numDelay
+        return np.concatenate(delay) if delay else np.empty(0)
+        # end getDelayBatch
+# end class DelaySampler
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
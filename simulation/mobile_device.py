@@ -3,9 +3,8 @@
 '''
 
 ''' ______________________________________________________________________ import external libraries ______________________________________________________________________ '''
-from scipy.stats import t, johnsonsu
-from copy import deepcopy
-from utility_method import saveToCSVfile, getListIndex, CSVdata
+from utility_method import saveToCSVfile, getListIndex, createOutputData, getStreamSeed, DELAY_STREAM
+from delay_sampler import DelaySampler
 import global_setting
 import problem_instance
 
@@ -49,6 +48,12 @@ networkList = global_setting.constants['network_list']
 SAVE_TO_FILE_FREQUENCY = global_setting.constants['save_to_file_frequency']   # 1 means every time slot, 10 means every 10 time slots...
 PROBLEM_INSTANCE = global_setting.constants['problem_instance']
 NUM_REPEAT = global_setting.constants['num_repeat']
+OUTPUT_FORMAT = global_setting.constants['output_format']     # csv, or npz for chunked columnar files
+STREAM_OUTPUT = global_setting.constants['stream_output']     # if True, rows are dropped from memory once saved to file
+RUN_SUMMARY = global_setting.constants['run_summary']         # gathers the summary statistics of the run when streaming; None otherwise
+SEED = global_setting.constants['seed']                       # base seed of the random number streams of the devices
+CHECKPOINT = global_setting.constants['checkpoint']           # takes periodic checkpoints of the run; None if disabled
+PROFILER = global_setting.constants['profiler']               # accumulates the time spent in each phase of a time slot; None if disabled
 
 ''' ____________________________________________________________________ MobileDevice class definition ____________________________________________________________________ '''
 class MobileDevice(object):
@@ -65,6 +70,8 @@ class MobileDevice(object):
         self.download = 0                                   # amount of data downloaded in Mbits (takes into account switching cost)
         self.maxGain = 0#max([NETWORK_BANDWIDTH[i - 1] for i in self.availableNetwork])
         self.delay = 0                                      # delay incurred while switching network in seconds
+        self.delaySampler = DelaySampler(getStreamSeed(SEED, RUN_NUM, self.deviceID, DELAY_STREAM))   # switching delays drawn in batches; seeded per (run, device)
+        self.currentNetworkAvailabilityStatus = [1] * len(self.availableNetwork)
 
         # attribute for log
         self.deviceCSVdata = None
@@ -72,21 +79,23 @@ class MobileDevice(object):
         # end __init__
 
     ''' ################################################################################################################################################################### '''
-    def performWirelessNetworkSelection(self, env, algorithm):
+    def performWirelessNetworkSelection(self, env, algorithm, startTimeSlot=1):
         '''
         description: repeatedly performs a wireless network selection, following the a particular bandit-style algorithm
-        args:        self, env
+        args:        self, env, algorithm being used (an object), first time slot (after 1 when resuming from a checkpoint)
         returns:     None
         '''
         global NUM_TIME_SLOT, ORIGINAL_OUTPUT_DIR, RUN_NUM, NUM_MOBILE_DEVICE, PROBLEM_INSTANCE, NUM_TIME_SLOT, NUM_REPEAT
         collaboration = True if ALGORITHM == "CoBandit" else False
 
-        # create csv files to store per time slot details
-        MobileDevice.createDeviceCSVfile(self, algorithm)
-        if self.deviceID == 1: MobileDevice.createNetworkCSVfile(self)
-        currentNetworkAvailabilityStatus = [1] * len(self.availableNetwork)
+        # create csv files to store per time slot details (restored with the device when resuming)
+        if startTimeSlot == 1:
+            MobileDevice.createDeviceCSVfile(self, algorithm)
+            if self.deviceID == 1: MobileDevice.createNetworkCSVfile(self)
+
+        for t in range(startTimeSlot, NUM_TIME_SLOT + 1):
+            if PROFILER != None: phaseStartTime = PROFILER.getTime()
 
-        for t in range(1, NUM_TIME_SLOT + 1):
             # update changes in network data rate
             changeInNetworkAvailability = False
 
@@ -104,41 +113,58 @@ class MobileDevice(object):
                         for i in range(len(networkList)): networkList[i].setDataRate(currentDataRate[i]); networkList[i].setWirelessTechnology(wirelessTechnology[i])
 
                 changeInNetworkAvailability, currentAvailableNetwork = problem_instance.changeInNetworkAvailability(PROBLEM_INSTANCE, t, self.deviceID)
-                currentNetworkAvailabilityStatus = [0] * len(self.availableNetwork)
-                for availableNetwork in currentAvailableNetwork: currentNetworkAvailabilityStatus[self.availableNetwork.index(availableNetwork)] = 1
+                self.currentNetworkAvailabilityStatus = [0] * len(self.availableNetwork)
+                for availableNetwork in currentAvailableNetwork: self.currentNetworkAvailabilityStatus[self.availableNetwork.index(availableNetwork)] = 1
                 if changeInNetworkAvailability: self.maxGain = max([network.getDataRate() for network in networkList if network.getID() in currentAvailableNetwork])
+            if PROFILER != None: PROFILER.record("environment update", phaseStartTime)
 
             yield env.timeout(1)
+            if PROFILER != None: phaseStartTime = PROFILER.getTime()
 
             # update probability distribution
-            if ALGORITHM == "SmartEXP3" or ALGORITHM == "EXP3": algorithm.updateProbabilityDistribution(t, changeInNetworkAvailability, currentNetworkAvailabilityStatus, self.availableNetwork.index(self.currentNetwork) if self.currentNetwork != -1 else -1, self.deviceID)
-            elif ALGORITHM == "ContextualSmartEXP3": algorithm.updateProbabilityDistribution(t, changeInNetworkAvailability, currentNetworkAvailabilityStatus, self.availableNetwork.index(self.currentNetwork) if self.currentNetwork != -1 else -1, NUM_TIME_SLOT, NUM_REPEAT, self.deviceID)
-            elif ALGORITHM == "PeriodicEXP4" or ALGORITHM == "SmartPeriodicEXP4": algorithm.updateProbabilityDistribution(t, changeInNetworkAvailability, currentNetworkAvailabilityStatus, self.availableNetwork.index(self.currentNetwork) if self.currentNetwork != -1 else -1, self.deviceID)
+            if ALGORITHM == "SmartEXP3" or ALGORITHM == "EXP3": algorithm.updateProbabilityDistribution(t, changeInNetworkAvailability, self.currentNetworkAvailabilityStatus, self.availableNetwork.index(self.currentNetwork) if self.currentNetwork != -1 else -1, self.deviceID)
+            elif ALGORITHM == "ContextualSmartEXP3": algorithm.updateProbabilityDistribution(t, changeInNetworkAvailability, self.currentNetworkAvailabilityStatus, self.availableNetwork.index(self.currentNetwork) if self.currentNetwork != -1 else -1, NUM_TIME_SLOT, NUM_REPEAT, self.deviceID)
+            elif ALGORITHM == "PeriodicEXP4" or ALGORITHM == "SmartPeriodicEXP4": algorithm.updateProbabilityDistribution(t, changeInNetworkAvailability, self.currentNetworkAvailabilityStatus, self.availableNetwork.index(self.currentNetwork) if self.currentNetwork != -1 else -1, self.deviceID)
             else: algorithm.updateProbabilityDistribution(t, self.deviceID)
+            if PROFILER != None: phaseStartTime = PROFILER.record("updateProbabilityDistribution", phaseStartTime)
 
             # select wireless network
             prevNetworkSelected = self.currentNetwork; self.currentNetwork = self.availableNetwork[algorithm.chooseAction(t, NUM_MOBILE_DEVICE, self.availableNetwork.index(self.currentNetwork) if self.currentNetwork != -1 else -1, self.deviceID)]
+            if PROFILER != None: phaseStartTime = PROFILER.record("chooseAction", phaseStartTime)
 
             # associate with wireless network
             MobileDevice.associateWithWirelessNetwork(self, prevNetworkSelected)
+            if PROFILER != None: PROFILER.record("associateWithWirelessNetwork", phaseStartTime)
 
             yield env.timeout(1)
+            if PROFILER != None: phaseStartTime = PROFILER.getTime()
 
             # observe gain
             MobileDevice.observeGain(self, t)
+            if PROFILER != None: phaseStartTime = PROFILER.record("observeGain", phaseStartTime)
 
             # collaborate
             # if collaboration == True: transmit = algorithm.transmit(); yield env.timeout(1); algorithm.listen(transmit)
             # else: yield env.timeout(1)
 
             # save details of the run
-            MobileDevice.saveDeviceDetail(self, t, algorithm, currentNetworkAvailabilityStatus)
-            if self.deviceID == 1: MobileDevice.saveNetworkDetail(self, t)
+            MobileDevice.saveDeviceDetail(self, t, algorithm, self.currentNetworkAvailabilityStatus)
+            if PROFILER != None: phaseStartTime = PROFILER.record("saveDeviceDetail", phaseStartTime)
+            if self.deviceID == 1:
+                MobileDevice.saveNetworkDetail(self, t)
+                if PROFILER != None: phaseStartTime = PROFILER.record("saveNetworkDetail", phaseStartTime)
             MobileDevice.writeCSVfile(self, t) # save details to csv file
+            if PROFILER != None: phaseStartTime = PROFILER.record("writeCSVfile", phaseStartTime)
 
             # update weight
             if ALGORITHM == "FullInformation": scaledGainPerNetwork = MobileDevice.computeGainPerNetwork(self, t); algorithm.updateWeight(scaledGainPerNetwork)
             else: algorithm.updateWeight(t, self.availableNetwork.index(self.currentNetwork), self.gain, self.maxGain, prevNetworkSelected, self.deviceID)
+            if PROFILER != None: phaseStartTime = PROFILER.record("updateWeight", phaseStartTime)
+
+            # devices run in order of ID within a time step, hence every device is done with the time slot once the last one is
+            if CHECKPOINT != None and self.deviceID == NUM_MOBILE_DEVICE and CHECKPOINT.isDue(t):
+                CHECKPOINT.save(t)
+                if PROFILER != None: PROFILER.record("checkpoint", phaseStartTime)
 
             yield env.timeout(1)
         # end performWirelessNetworkSelection
@@ -182,18 +208,12 @@ class MobileDevice(object):
     def computeDelay(self):
         '''
         description: generates a delay for switching between WiFi networks, which is modeled using Johnson’s SU distribution (identified as a best fit to 500 delay values),
-                     and delay for switching between WiFi and cellular networks, modeled using Student's t-distribution (identified as best fit to 500 delay values)
+                     and delay for switching between WiFi and cellular networks, modeled using Student's t-distribution (identified as best fit to 500 delay values);
+                     delays are drawn in batches by the DelaySampler of the device
         args:        self
         returns:     a delay value
         '''
-        wifiDelay = [3.0659475327, 14.6918344498]       # min and max delay observed for wifi in some real experiments; used as caps for the delay generated
-        cellularDelay = [4.2531193161, 14.3172883892]   # min and max delay observed for 3G in some real experiments; used as caps for the delay generated
-
-        if networkList[getListIndex(networkList, self.currentNetwork)].getWirelessTechnology() == 'WiFi':
-            delay = min(max(johnsonsu.rvs(0.29822254217554717, 0.71688524931466857, loc=6.6093350624107909, scale=0.5595970482712973), wifiDelay[0]), wifiDelay[1])
-        else:
-            delay = min(max(t.rvs(0.43925241212097499, loc=4.4877772816533934, scale=0.024357324434644639), cellularDelay[0]), cellularDelay[1])
-        return delay
+        return self.delaySampler.getDelay(networkList[getListIndex(networkList, self.currentNetwork)].getWirelessTechnology())
         # end computeDelay
 
     ''' ################################################################################################################################################################### '''
@@ -241,7 +261,7 @@ class MobileDevice(object):
         # create csv to save details of the device
         algorithmHeader = ["run", "timeslot", "deviceID"] + algorithm.getAttributeName() + ["current network", "gain (Mbps)", "delay (secs)", "download (Mbits)"]
         for i in range(1, len(self.availableNetwork) + 1): algorithmHeader.append("download %d (Mbits)" %(i))
-        self.deviceCSVdata = CSVdata(ORIGINAL_OUTPUT_DIR + "device%d.csv" %(self.deviceID), algorithmHeader)
+        self.deviceCSVdata = createOutputData(ORIGINAL_OUTPUT_DIR + "device%d.csv" %(self.deviceID), algorithmHeader, OUTPUT_FORMAT, SAVE_TO_FILE_FREQUENCY, STREAM_OUTPUT)
         # end createDeviceCSVfile
 
     ''' ################################################################################################################################################################### '''
@@ -258,8 +278,8 @@ class MobileDevice(object):
         for i in range(1, len(self.availableNetwork) + 1): networkHeader.append("data rate %d" % (i))
         for i in range(1, len(self.availableNetwork) + 1): networkHeader.append("technology %d" % (i))
         for i in range(1, len(self.availableNetwork) + 1): networkHeader.append("#devices %d" % (i))
-        for i in range(1, len(self.availableNetwork) + 1): networkHeader.append("device list %d" % (i))
-        self.networkCSVdata = CSVdata(ORIGINAL_OUTPUT_DIR + "network.csv", networkHeader)
+        for i in range(1, NUM_MOBILE_DEVICE + 1): networkHeader.append("network device %d" % (i))
+        self.networkCSVdata = createOutputData(ORIGINAL_OUTPUT_DIR + "network.csv", networkHeader, OUTPUT_FORMAT, SAVE_TO_FILE_FREQUENCY, STREAM_OUTPUT)
         # end createNetworkCSVfile
 
     ''' ################################################################################################################################################################### '''
@@ -282,23 +302,30 @@ class MobileDevice(object):
             else: algorithmData.append(0)   # the network is not currently available to the device
             # else: algorithmData.append((networkList[networkIndexInNetworkList].getDataRate()/(networkList[networkIndexInNetworkList].getNumAssociatedDevice()+1)) * TIME_SLOT_DURATION)
         self.deviceCSVdata.addRow(algorithmData)
+        if RUN_SUMMARY != None: RUN_SUMMARY.addDownload(t, self.deviceID, self.download)
         # end saveDeviceDetail
 
     ''' ################################################################################################################################################################### '''
     def saveNetworkDetail(self, t):
         '''
-        description: save run time details about devices associated to each network
+        description: save run time details about devices associated to each network; the devices associated to each network are saved as the network of each device
+                     (0 if not associated with any network), rather than as a set of devices per network
         args:        self, current time slot
         return:      None
         '''
         global ORIGINAL_OUTPUT_DIR, RUN_NUM, SAVE_TO_FILE_FREQUENCY, TIME_SLOT_DURATION, NUM_TIME_SLOT
 
+        networkPerDevice = [0] * NUM_MOBILE_DEVICE
+        for network in networkList:
+            for deviceID in network.getAssociatedDevice(): networkPerDevice[deviceID - 1] = network.getID()
+
         networkData = [RUN_NUM, t]
         for i in range(len(networkList)): networkData.append(networkList[i].getDataRate())
         for i in range(len(networkList)): networkData.append(networkList[i].getWirelessTechnology())
         for i in range(len(networkList)): networkData.append(networkList[i].getNumAssociatedDevice())
-        for i in range(len(networkList)): networkData.append(deepcopy(networkList[i].getAssociatedDevice()))
+        networkData += networkPerDevice
         self.networkCSVdata.addRow(networkData)
+        if RUN_SUMMARY != None: RUN_SUMMARY.addNetworkDetail(networkData)
         # end saveNetworkDetail
 
     ''' ################################################################################################################################################################### '''
@@ -15,6 +15,9 @@ class Network(object):
         self.dataRate = dataRate                        # date rate of network (in Mbps)
         self.wirelessTechnology = None                  # e.g. WiFi or 3G
         self.associatedDevice = set()                   # set of associated devices
+        self.problemInstance = None                     # problem instance and index of the key for which numRelevantAssociatedDevice was last computed
+        self.keyIndex = None
+        self.numRelevantAssociatedDevice = 0            # number of associated devices that actually have access to the network (for the above key)
         # end __init__
 
     ''' ################################################################################################################################################################### '''
@@ -24,6 +27,7 @@ class Network(object):
         arg:         self
         returns:     None
         '''
+        if deviceID not in self.associatedDevice and Network.isRelevant(self, deviceID): self.numRelevantAssociatedDevice += 1
         self.associatedDevice.add(deviceID)
         # end associateDevice
 
@@ -35,6 +39,7 @@ class Network(object):
         returns:     None
         '''
         self.associatedDevice.remove(deviceID)
+        if Network.isRelevant(self, deviceID): self.numRelevantAssociatedDevice -= 1
         # end disassociateDevice
 
     ''' ################################################################################################################################################################### '''
@@ -92,10 +97,10 @@ class Network(object):
         returns:     bit rate observed by a mobile device of the network (in Mbps)
         '''
         # return self.dataRate / len(self.associatedDevice) #self.numDevice
-        relevantAssociatedDevice = Network.getRelevantAssociatedDevice(self, problemInstance, currentTimeSlot)
-        if problem_instance.isNetworkAccessible(problemInstance, currentTimeSlot, self.networkID, deviceID):
+        numRelevantAssociatedDevice = Network.getNumRelevantAssociatedDevice(self, problemInstance, currentTimeSlot)
+        if problem_instance.isNetworkAccessibleAtKeyIndex(problemInstance, self.keyIndex, self.networkID, deviceID):
             # return self.dataRate / len(self.associatedDevice) # self.numDevice
-            return self.dataRate / len(relevantAssociatedDevice)
+            return self.dataRate / numRelevantAssociatedDevice
         return 0
 
     ''' ################################################################################################################################################################### '''
@@ -105,9 +110,9 @@ class Network(object):
         args:        self, delay (the delay incurred while diassociating from the previous network and associating with this one and resuming, e.g., download)
         returns:     total download of a device during one time slot (in Mbits), considering switching cost
         '''
-        relevantAssociatedDevice = Network.getRelevantAssociatedDevice(self, problemInstance, currentTimeSlot)
-        if problem_instance.isNetworkAccessible(problemInstance, currentTimeSlot, self.networkID, deviceID):
-            return (self.dataRate / len(relevantAssociatedDevice)) * (timeSlotDuration - delay)
+        numRelevantAssociatedDevice = Network.getNumRelevantAssociatedDevice(self, problemInstance, currentTimeSlot)
+        if problem_instance.isNetworkAccessibleAtKeyIndex(problemInstance, self.keyIndex, self.networkID, deviceID):
+            return (self.dataRate / numRelevantAssociatedDevice) * (timeSlotDuration - delay)
         return 0
         # return (self.dataRate / len(self.associatedDevice)) * (timeSlotDuration - delay)
 
@@ -142,4 +147,30 @@ class Network(object):
                 relevantAssociatedDevice.append(deviceID)
         return relevantAssociatedDevice
         # end getRelevantAssociatedDevice
+
+    ''' ################################################################################################################################################################### '''
+    def getNumRelevantAssociatedDevice(self, problemInstance, currentTimeSlot):
+        '''
+        description: returns the number of devices that chose the network and actually have access to it; the count is kept up to date as devices associate and
+                     disassociate, and is only recomputed from the set of associated devices when the state of the environment (key of the problem instance) changes
+        args:        self, the problem instance being considered, the current time slot
+        return:      number of devices that selected the network which actually have access to it
+        '''
+        keyIndex = problem_instance.getKeyIndex(problemInstance, currentTimeSlot)
+        if problemInstance != self.problemInstance or keyIndex != self.keyIndex:
+            self.problemInstance = problemInstance; self.keyIndex = keyIndex
+            self.numRelevantAssociatedDevice = len(Network.getRelevantAssociatedDevice(self, problemInstance, currentTimeSlot))
+        return self.numRelevantAssociatedDevice
+        # end getNumRelevantAssociatedDevice
+
+    ''' ################################################################################################################################################################### '''
+    def isRelevant(self, deviceID):
+        '''
+        description: determines whether a device has access to the network, for the key for which the count of relevant associated devices was last computed
+        args:        self, ID of a mobile device
+        return:      True or False depending on whether the device has access to the network; False if the count has not been computed yet
+        '''
+        if self.problemInstance == None: return False
+        return problem_instance.isNetworkAccessibleAtKeyIndex(self.problemInstance, self.keyIndex, self.networkID, deviceID)
+        # end isRelevant
 # end class Network
\ No newline at end of file
@@ -0,0 +1,80 @@
+'''
+@description:   Defines a profiler that accumulates the wall time and the number of calls of each phase of a time slot (environment update, probability update, action
+                selection, association, ...) over all devices, so that the phases that dominate the running time of a simulation run can be identified (see -profile in
+                wns.py); the engines only call it when profiling is enabled
+@assumptions:   all devices of a run use the same algorithm; the time of a phase is measured with time.perf_counter around the call(s) it is made of
+'''
+
+''' ______________________________________________________________________ import external libraries ______________________________________________________________________ '''
+import json
+from time import perf_counter
+
+''' ____________________________________________________________________ PhaseProfiler class definition ____________________________________________________________________ '''
+class PhaseProfiler(object):
+    def __init__(self, algorithmName):
+        self.algorithmName = algorithmName
+        self.statisticsPerPhase = {}        # total wall time (in seconds) and number of calls of each phase, in the order in which the phases are first recorded
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def getTime(self):
+        '''
+        description: gets the current time, at which a phase starts
+        args:        self
+        returns:     current value of the performance counter (in seconds)
+        '''
+        return perf_counter()
+        # end getTime
+
+    ''' ################################################################################################################################################################### '''
+    def record(self, phase, startTime):
+        '''
+        description: adds the time elapsed since the start of a phase to the time spent in that phase
+        args:        self, name of the phase, time at which the phase started (from getTime or from the previous call to record)
+        returns:     current time, which is also the start of the next phase when phases follow each other
+        '''
+        currentTime = perf_counter()
+        statistics = self.statisticsPerPhase.setdefault(phase, [0.0, 0])
+        statistics[0] += currentTime - startTime; statistics[1] += 1
+        return currentTime
+        # end record
+
+    ''' ################################################################################################################################################################### '''
+    def getBreakdown(self):
+        '''
+        description: computes the time spent in each phase, per call and as a share of the time spent in all phases
+        args:        self
+        returns:     list of dictionaries (one per phase) with the name of the phase, its total time, number of calls, time per call (in microseconds) and share (%)
+        '''
+        totalTime = sum(time for time, numCall in self.statisticsPerPhase.values())
+        return [{'phase': phase, 'time': time, 'calls': numCall, 'time_per_call_us': time * 1e6 / numCall, 'share': time * 100 / totalTime if totalTime > 0 else 0}
+                for phase, (time, numCall) in self.statisticsPerPhase.items()]
+        # end getBreakdown
+
+    ''' ################################################################################################################################################################### '''
+    def printBreakdown(self):
+        '''
+        description: prints the time spent in each phase as a table
+        args:        self
+        returns:     None
+        '''
+        breakdown = PhaseProfiler.getBreakdown(self)
+        print("----- time spent per phase (%s, all devices) -----" % (self.algorithmName))
+        print("%-30s %12s %12s %16s %8s" % ("phase", "time (secs)", "calls", "per call (us)", "share"))
+        for phase in breakdown: print("%-30s %12.3f %12d %16.2f %7.1f%%" % (phase['phase'], phase['time'], phase['calls'], phase['time_per_call_us'], phase['share']))
+        print("%-30s %12.3f" % ("total", sum(phase['time'] for phase in breakdown)))
+        # end printBreakdown
+
+    ''' ################################################################################################################################################################### '''
+    def saveToFile(self, filepath):
+        '''
+        description: saves the time spent in each phase to a json file
+        args:        self, path of the json file
+        returns:     None
+        '''
+        breakdown = PhaseProfiler.getBreakdown(self)
+        with open(filepath, "w") as profileFile:
+            json.dump({'algorithm': self.algorithmName, 'total_time': sum(phase['time'] for phase in breakdown), 'phases': breakdown}, profileFile, indent=1)
+        # end saveToFile
+# end class PhaseProfiler
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
@@ -0,0 +1,810 @@
+'''
+@description:   Defines a population engine that runs EXP3 or Smart EXP3 for all mobile devices at once; instead of one simpy process per device, the state of every
+                device (weights, probabilities, block counters) is kept in (devices x networks) numpy arrays and the whole population moves forward one time slot at a
+                time, with batched sampling and updates
+@assumptions:   same as wns.py; every device sees the same set of networks, hence action index i always refers to the network with ID i + 1
+'''
+
+''' ______________________________________________________________________ import external libraries ______________________________________________________________________ '''
+import numpy as np
+from sys import float_info
+from utility_method import createOutputData, sampleCategorical, RandomStreamGroup, getStreamSeed, DELAY_STREAM, normalizeLogWeight, adjustLogWeightToAvailability, \
+    computeProbabilityFromLogWeight
+from delay_sampler import DelaySampler
+import global_setting
+import problem_instance
+
+''' ______________________________________________________________________________ constants ______________________________________________________________________________ '''
+TIME_SLOT_DURATION = global_setting.constants['time_slot_duration']
+NUM_TIME_SLOT = global_setting.constants['num_time_slot']
+RUN_NUM = global_setting.constants['run_num']
+OUTPUT_DIR = global_setting.constants['output_dir']
+SAVE_TO_FILE_FREQUENCY = global_setting.constants['save_to_file_frequency']
+PROBLEM_INSTANCE = global_setting.constants['problem_instance']
+OUTPUT_FORMAT = global_setting.constants['output_format']
+STREAM_OUTPUT = global_setting.constants['stream_output']
+RUN_SUMMARY = global_setting.constants['run_summary']
+SEED = global_setting.constants['seed']
+LOG_WEIGHT = global_setting.constants['weight_representation'] == 'log'       # whether the weights are kept in log space
+CHECKPOINT = global_setting.constants['checkpoint']                             # takes periodic checkpoints of the run; None if disabled
+PROFILER = global_setting.constants['profiler']                                 # accumulates the time spent in each phase of a time slot; None if disabled
+MIN_WEIGHT = float_info.min * float_info.epsilon                    # replaces weights that underflow to zero when normalized, as in the per-device algorithms
+
+''' __________________________________________________________________ helpers shared by the populations __________________________________________________________________ '''
+def normalizeWeight(weight):
+    '''
+    description: divides the weights of each device by their maximum; positive weights that underflow are set to the smallest positive float instead of zero
+    args:        (devices x actions) array of weights
+    return:      (devices x actions) array of normalized weights
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'): scaledWeight = weight / weight.max(axis=1, keepdims=True)
+    return np.where(weight > 0, np.where(scaledWeight > 0, scaledWeight, MIN_WEIGHT), 0)
+    # end normalizeWeight
+
+def adjustWeightToAvailability(weight, actionAvailabilityStatus):
+    '''
+    description: sets the weight of actions no longer available to zero and the weight of newly available actions to the maximum weight, then normalizes the weights
+    args:        (devices x actions) array of weights, (devices x actions) array of availability status (1 if available, 0 otherwise)
+    return:      (devices x actions) array of adjusted weights
+    '''
+    weight = weight * actionAvailabilityStatus
+    maxWeight = weight.max(axis=1, keepdims=True); maxWeight = np.where(maxWeight > 0, maxWeight, 1)
+    weight = np.where(actionAvailabilityStatus == 1, np.where(weight > 0, weight, maxWeight), 0)
+    return normalizeWeight(weight)
+    # end adjustWeightToAvailability
+
+def computeProbability(weight, gamma, actionAvailabilityStatus):
+    '''
+    description: mixes the normalized weights of each device with the uniform distribution over its available actions; unavailable actions get probability zero
+    args:        (devices x actions) array of weights, gamma of each device, (devices x actions) array of availability status
+    return:      (devices x actions) array of probabilities
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probability = ((1 - gamma)[:, None] * (weight / weight.sum(axis=1, keepdims=True))) + (gamma / actionAvailabilityStatus.sum(axis=1))[:, None]
+    return np.where(weight != 0, probability, 0)
+    # end computeProbability
+
+def sampleFromMask(mask, uniform):
+    '''
+    description: chooses uniformly at random one of the entries set to True in each row of a boolean matrix
+    args:        (rows x actions) boolean array with at least one True per row, one uniform number in [0, 1) per row
+    return:      index of the entry chosen in each row
+    '''
+    return sampleCategorical(mask.astype(float), uniform)
+    # end sampleFromMask
+
+''' ___________________________________________________________________ PopulationEXP3 class definition ___________________________________________________________________ '''
+class PopulationEXP3:
+    ''' EXP3 (algorithm_EXP3.py) run by a population of devices; row d of each array holds the state of device d + 1 '''
+    def __init__(self, numDevice, numAction, seedList = None, logWeight = False):
+        ''' initializes all attributes '''
+        self.numDevice = numDevice
+        self.numAction = numAction
+        self.randomStream = RandomStreamGroup(seedList if seedList != None else [None] * numDevice)     # random numbers of each device, from its own stream
+        self.gamma = np.ones(numDevice)
+        self.weight = np.ones((numDevice, numAction))
+        self.isLogWeight = logWeight                                    # whether the weights are kept in log space (self.logWeight) instead of self.weight
+        self.logWeight = np.zeros((numDevice, numAction))
+        self.probability = np.zeros((numDevice, numAction))
+        self.actionAvailabilityStatus = np.ones((numDevice, numAction), dtype=int)
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def updateProbabilityDistribution(self, t, changeInActionAvailability, currentActionAvailabilityStatus, currentActionIndex):
+        '''
+        description: updates the probability distribution of every device over its available actions
+        args:        self, current time slot, whether there is a change in action availability for each device, (devices x actions) availability status, index of action
+                     currently chosen by each device
+        return:      None
+        '''
+        if changeInActionAvailability.any():
+            rows = changeInActionAvailability
+            if self.isLogWeight: self.logWeight[rows] = np.where(currentActionAvailabilityStatus[rows] == 1, 0., -np.inf) if t == 1 \
+                                 else adjustLogWeightToAvailability(self.logWeight[rows], currentActionAvailabilityStatus[rows])
+            elif t == 1: self.weight[rows] = currentActionAvailabilityStatus[rows]
+            else: self.weight[rows] = adjustWeightToAvailability(self.weight[rows], currentActionAvailabilityStatus[rows])
+            self.actionAvailabilityStatus[rows] = currentActionAvailabilityStatus[rows]
+        if self.isLogWeight: self.probability = computeProbabilityFromLogWeight(self.logWeight, self.gamma, self.actionAvailabilityStatus)
+        else: self.probability = computeProbability(self.weight, self.gamma, self.actionAvailabilityStatus)
+        # end updateProbabilityDistribution
+
+    ''' ################################################################################################################################################################### '''
+    def chooseAction(self, t, currentActionIndex):
+        '''
+        description: selects an action for every device at random from its probability distribution
+        args:        self, current time slot, index of action currently chosen by each device
+        return:      index of the action chosen by each device
+        '''
+        return self.randomStream.sampleIndex(self.probability)
+        # end chooseAction
+
+    ''' ################################################################################################################################################################### '''
+    def updateWeight(self, t, chosenActionIndex, gain, maxGain, previousActionIndex):
+        '''
+        description: updates the weight of the action selected by each device
+        args:        self, current time slot, index of action chosen by each device, gain observed by each device, maximum gain available to each device, index of action
+                     chosen by each device in the previous time slot
+        return:      None
+        '''
+        rows = np.arange(self.numDevice)
+        self.gamma[:] = (t + 1) ** (-1 / 10)
+        estimatedGain = (gain / maxGain) / self.probability[rows, chosenActionIndex]
+        if self.isLogWeight:
+            self.logWeight[rows, chosenActionIndex] += (self.gamma * estimatedGain) / self.actionAvailabilityStatus.sum(axis=1)
+            self.logWeight = normalizeLogWeight(self.logWeight); return
+        self.weight[rows, chosenActionIndex] *= np.exp((self.gamma * estimatedGain) / self.actionAvailabilityStatus.sum(axis=1))
+
+        # EXP3.updateWeight normalizes in place, so weights after the maximum are divided by the already normalized maximum (i.e. by 1)
+        maxWeightIndex = np.argmax(self.weight, axis=1); maxWeight = self.weight[rows, maxWeightIndex]
+        beforeMaxWeight = np.arange(self.numAction)[None, :] <= maxWeightIndex[:, None]
+        scaledWeight = np.where(beforeMaxWeight, self.weight / maxWeight[:, None], self.weight)
+        self.weight = np.where(self.weight > 0, np.where(scaledWeight > 0, scaledWeight, MIN_WEIGHT), 0)
+        # end updateWeight
+
+    ''' ################################################################################################################################################################### '''
+    def getAttributeName(self):
+        '''
+        decsription: returns the list of attributes logged per device, in the same order as EXP3.getAttributeName
+        args:        self
+        return:      list of attribute names (strings)
+        '''
+        return ["gamma"] + ["weight %d" % (i) for i in range(1, self.numAction + 1)] + ["probability %d" % (i) for i in range(1, self.numAction + 1)]
+        # end getAttributeName
+
+    ''' ################################################################################################################################################################### '''
+    def getAttributeValue(self, deviceIndex):
+        '''
+        description: returns the values of the attributes of one device, in the same order as EXP3.getAttributeValue
+        args:        self, index of the device (device ID - 1)
+        return:      list of attribute values
+        '''
+        return [self.gamma[deviceIndex].item()] + (np.exp(self.logWeight[deviceIndex]) if self.isLogWeight else self.weight[deviceIndex]).tolist() + self.probability[deviceIndex].tolist()
+        # end getAttributeValue
+    # end class PopulationEXP3
+
+''' ________________________________________________________________ PopulationSmartEXP3 class definition _________________________________________________________________ '''
+class PopulationSmartEXP3:
+    '''
+    Smart EXP3 (algorithm_SmartEXP3.py) run by a population of devices; per-device branches (exploration, switch back, hybrid) are applied with boolean masks. The gains of
+    the current and previous block are kept in ring buffers of the last maxTimeSlotConsideredPreviousBlock slots, and the gains of the preferred action as its first and
+    last rollingAverageWindowSize values, which is all that the switch back and reset decisions look at.
+    '''
+    def __init__(self, numDevice, numAction, beta = 0.1, maxTimeSlotConsideredPreviousBlock = 8, convergedProbability = 0.75, numConsecutiveSlotForReset = 4,
+                 rollingAverageWindowSize = 12, percentageDeclineForReset = 15, minBlockLengthForReset = 40, seedList = None, logWeight = False):
+        ''' initializes all attributes '''
+        self.numDevice = numDevice
+        self.numAction = numAction
+        self.randomStream = RandomStreamGroup(seedList if seedList != None else [None] * numDevice)     # random numbers of each device, from its own stream
+        self.beta = beta
+        self.gamma = np.ones(numDevice)
+        self.weight = np.ones((numDevice, numAction))
+        self.isLogWeight = logWeight                                    # whether the weights are kept in log space (self.logWeight) instead of self.weight
+        self.logWeight = np.zeros((numDevice, numAction))
+        self.probability = np.zeros((numDevice, numAction))
+
+        # for block concept
+        self.blockIndex = np.ones(numDevice, dtype=int)
+        self.blockLength = np.zeros(numDevice, dtype=int)
+        self.numBlockActionSelected = np.zeros((numDevice, numAction), dtype=int)
+        self.probabilityCurrentBlock = np.zeros(numDevice)
+
+        # for hybrid
+        self.maxProbabilityDifference = np.full(numDevice, 1 / (numAction - 1))
+        self.blockLengthPerAction = np.ones((numDevice, numAction), dtype=int)
+        self.blockLengthForHybrid = np.zeros(numDevice, dtype=int)
+        self.cumulativeGainPerAction = np.zeros((numDevice, numAction))
+        self.numTimeSlotActionSelected = np.zeros((numDevice, numAction), dtype=int)
+
+        # for switch back mechanism
+        self.actionToExplore = np.zeros((numDevice, numAction), dtype=bool)
+        self.switchBack = np.zeros(numDevice, dtype=bool)
+        self.actionSelectedPreviousBlock = np.full(numDevice, -1)
+        self.maxTimeSlotConsideredPreviousBlock = maxTimeSlotConsideredPreviousBlock
+        self.gainPerTimeSlotCurrentBlock = np.zeros((numDevice, maxTimeSlotConsideredPreviousBlock)); self.numTimeSlotCurrentBlock = np.zeros(numDevice, dtype=int)
+        self.gainPerTimeSlotPreviousBlock = np.zeros((numDevice, maxTimeSlotConsideredPreviousBlock)); self.numTimeSlotPreviousBlock = np.zeros(numDevice, dtype=int)
+
+        # for periodic reset
+        self.numConsecutiveSlotPreferredActionChosen = np.zeros(numDevice, dtype=int)
+        self.preferredActionIndex = np.full(numDevice, -1)
+        self.firstPreferredActionGain = np.zeros((numDevice, rollingAverageWindowSize))   # first gains observed from the preferred action
+        self.lastPreferredActionGain = np.zeros((numDevice, rollingAverageWindowSize))    # ring buffer of the last gains observed from the preferred action
+        self.numPreferredActionGain = np.zeros(numDevice, dtype=int)
+        self.convergedProbability = convergedProbability
+        self.numConsecutiveSlotForReset = numConsecutiveSlotForReset
+        self.rollingAverageWindowSize = rollingAverageWindowSize
+        self.percentageDeclineForReset = percentageDeclineForReset
+        self.minBlockLengthForReset = minBlockLengthForReset
+
+        # to handle changes in action availability
+        self.actionAvailabilityStatus = np.ones((numDevice, numAction), dtype=int)
+        self.actionSelectedPreviousBlockAvailability = np.ones(numDevice, dtype=bool)
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def updateProbabilityDistribution(self, t, changeInActionAvailability, currentActionAvailabilityStatus, currentActionIndex):
+        '''
+        description: updates the probability distribution of every device over its available actions
+        args:        self, current time slot, whether there is a change in action availability for each device, (devices x actions) availability status, index of action
+                     currently chosen by each device
+        return:      None
+        '''
+        resetDueToChangeInActionAvailability = np.zeros(self.numDevice, dtype=bool)
+        if changeInActionAvailability.any():
+            resetDueToChangeInActionAvailability = PopulationSmartEXP3.handleChangeInActionAvailability(self, t, changeInActionAvailability, currentActionAvailabilityStatus, currentActionIndex)
+            if t != 1:
+                rows = changeInActionAvailability
+                self.actionSelectedPreviousBlockAvailability[rows] = self.actionAvailabilityStatus[rows, self.actionSelectedPreviousBlock[rows]] == 1
+
+        # compute probability distribution
+        gamma = np.where(self.blockLength == 0, self.gamma, PopulationSmartEXP3.computeGamma(self, self.blockIndex + 1))
+        if self.isLogWeight: self.probability = computeProbabilityFromLogWeight(self.logWeight, gamma, self.actionAvailabilityStatus)
+        else: self.probability = computeProbability(self.weight, gamma, self.actionAvailabilityStatus)
+
+        # update the value of blockLengthForHybrid if the distribution is not close to uniform as from this time slot
+        rows = ~PopulationSmartEXP3.isProbabilityCloseToUniform(self) & (self.blockLengthForHybrid == 0)
+        self.blockLengthForHybrid[rows] = np.maximum(2, self.blockLengthPerAction[rows, np.argmax(self.probability[rows], axis=1)])
+
+        # need to reset the algorithm (by resetting the block length)?
+        if t != 1: PopulationSmartEXP3.mustReset(self, ~resetDueToChangeInActionAvailability)
+        # end updateProbabilityDistribution
+
+    ''' ################################################################################################################################################################### '''
+    def chooseAction(self, t, currentActionIndex):
+        '''
+        description: selects an action for every device; devices within a block keep their current action, the others explore, switch back or follow the hybrid policy
+        args:        self, current time slot, index of action currently chosen by each device
+        return:      index of the action chosen by each device
+        '''
+        chosenActionIndex = currentActionIndex.copy()
+        newBlock = self.blockLength == 0
+        if not newBlock.any(): return chosenActionIndex
+        uniform = self.randomStream.random(3)
+
+        numActionToExplore = self.actionToExplore.sum(axis=1)
+        exploration = newBlock & (numActionToExplore > 0)
+        switchBack = newBlock & ~exploration & self.switchBack
+        hybrid = newBlock & ~exploration & ~switchBack
+
+        ''' exploration '''
+        rows = np.flatnonzero(exploration)
+        self.actionSelectedPreviousBlock[rows] = currentActionIndex[rows]
+        chosenActionIndex[rows] = sampleFromMask(self.actionToExplore[rows], uniform[0, rows])
+        self.actionToExplore[rows, chosenActionIndex[rows]] = False
+
+        ''' switch back '''
+        chosenActionIndex[switchBack] = self.actionSelectedPreviousBlock[switchBack]
+        self.actionSelectedPreviousBlock[switchBack] = currentActionIndex[switchBack]
+
+        ''' hybrid '''
+        self.actionSelectedPreviousBlock[hybrid] = currentActionIndex[hybrid]
+        preferredActionIndex = np.argmax(self.probability, axis=1)
+        coinFlipped = hybrid & PopulationSmartEXP3.allAvailableActionExplored(self) & (PopulationSmartEXP3.isProbabilityCloseToUniform(self)
+                        | (self.blockLengthPerAction[np.arange(self.numDevice), preferredActionIndex] <= self.blockLengthForHybrid))
+        chooseGreedily = coinFlipped & (uniform[1] < 0.5)
+        chooseRandomly = hybrid & ~chooseGreedily
+        numMaxAverageGainAction, greedySameAction, greedyActionIndex = PopulationSmartEXP3.chooseActionGreedy(self, currentActionIndex, uniform[2])
+        chosenActionIndex[chooseGreedily] = greedyActionIndex[chooseGreedily]
+        chosenActionIndex[chooseRandomly] = sampleCategorical(self.probability[chooseRandomly], uniform[0, chooseRandomly])
+
+        # start a new block for devices that chose an action
+        rows = np.flatnonzero(newBlock); actionIndex = chosenActionIndex[rows]
+        self.blockLength[rows] = self.blockLengthPerAction[rows, actionIndex] = PopulationSmartEXP3.updateBlockLength(self, self.numBlockActionSelected[rows, actionIndex])
+        self.numBlockActionSelected[rows, actionIndex] += 1
+        self.numTimeSlotCurrentBlock[rows] = 0
+
+        # set the probability with which the chosen action for the current block was selected
+        probabilityCurrentBlock = self.probability[np.arange(self.numDevice), chosenActionIndex]
+        probabilityCurrentBlock = np.where(coinFlipped, probabilityCurrentBlock / 2, probabilityCurrentBlock)
+        probabilityCurrentBlock = np.where(chooseGreedily, np.where(greedySameAction, 1 / 2, (1 / 2) * (1 / numMaxAverageGainAction)), probabilityCurrentBlock)
+        probabilityCurrentBlock = np.where(switchBack, 1, probabilityCurrentBlock)
+        probabilityCurrentBlock = np.where(exploration, 1 / np.maximum(numActionToExplore, 1), probabilityCurrentBlock)
+        self.probabilityCurrentBlock[newBlock] = probabilityCurrentBlock[newBlock]
+        return chosenActionIndex
+        # end chooseAction
+
+    ''' ################################################################################################################################################################### '''
+    def chooseActionGreedy(self, currentActionIndex, uniform):
+        '''
+        description: selects, for every device, the (or one of the) action(s) with the highest average gain
+        args:        self, index of action chosen by each device in previous slot, one uniform number in [0, 1) per device to break ties
+        return:      number of actions with the same maximum average gain, whether the device keeps its current action, the index of the action chosen (per device)
+        '''
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averageGainPerAction = np.where(self.numTimeSlotActionSelected > 0, self.cumulativeGainPerAction / self.numTimeSlotActionSelected, 0)
+        isMaxAverageGainAction = averageGainPerAction == averageGainPerAction.max(axis=1, keepdims=True)
+        numMaxAverageGainAction = isMaxAverageGainAction.sum(axis=1)
+
+        greedySameAction = (numMaxAverageGainAction > 1) & isMaxAverageGainAction[np.arange(self.numDevice), currentActionIndex] & (currentActionIndex != -1)
+        greedyActionIndex = np.where(numMaxAverageGainAction == 1, np.argmax(isMaxAverageGainAction, axis=1), sampleFromMask(isMaxAverageGainAction, uniform))
+        greedyActionIndex = np.where(greedySameAction, currentActionIndex, greedyActionIndex)
+        return numMaxAverageGainAction, greedySameAction, greedyActionIndex
+        # end chooseActionGreedy
+
+    ''' ################################################################################################################################################################### '''
+    def updateWeight(self, t, chosenActionIndex, gain, maxGain, previousActionIndex):
+        '''
+        description: updates the weight of the action selected by each device
+        args:        self, current time slot, index of action chosen by each device, gain observed by each device, maximum gain available to each device, index of action
+                     chosen by each device in the previous time slot
+        return:      None
+        '''
+        rows = np.arange(self.numDevice)
+        gamma = PopulationSmartEXP3.computeGamma(self, self.blockIndex + 1)
+        scaledGain = gain / maxGain; estimatedGain = scaledGain / self.probabilityCurrentBlock
+        self.cumulativeGainPerAction[rows, chosenActionIndex] += scaledGain; self.numTimeSlotActionSelected[rows, chosenActionIndex] += 1
+        self.gainPerTimeSlotCurrentBlock[rows, self.numTimeSlotCurrentBlock % self.maxTimeSlotConsideredPreviousBlock] = scaledGain; self.numTimeSlotCurrentBlock += 1
+
+        # need to switch back?
+        PopulationSmartEXP3.mustSwitchBack(self, chosenActionIndex, scaledGain)
+
+        if self.isLogWeight:
+            self.logWeight[rows, chosenActionIndex] += (gamma * estimatedGain) / self.actionAvailabilityStatus.sum(axis=1)     # cannot overflow
+            self.logWeight = normalizeLogWeight(self.logWeight)
+        else:
+            with np.errstate(over='ignore'): weightUpdate = np.exp((gamma * estimatedGain) / self.actionAvailabilityStatus.sum(axis=1))
+            self.weight[rows, chosenActionIndex] = np.where(np.isinf(weightUpdate), 1, self.weight[rows, chosenActionIndex] * weightUpdate)  # in case of overflow, set to 1
+            self.weight = normalizeWeight(self.weight)
+
+        blockEnd = self.blockLength == 1
+        self.blockIndex[blockEnd] += 1; self.gamma[blockEnd] = PopulationSmartEXP3.computeGamma(self, self.blockIndex[blockEnd])
+        PopulationSmartEXP3.endCurrentBlock(self, blockEnd)
+        self.blockLength -= 1   # decrement block length
+
+        PopulationSmartEXP3.updatePreferredActionDetail(self, scaledGain, chosenActionIndex)
+        # end updateWeight
+
+    ''' ################################################################################################################################################################### '''
+    def computeGamma(self, blockIndex):
+        '''
+        description: computes the value of gamma based on the block index, without the need to know the horizon
+        args:        self, block index (scalar or array)
+        returns:     value of gamma
+        '''
+        return blockIndex ** (-1 / 10)
+        # end computeGamma
+
+    ''' ################################################################################################################################################################### '''
+    def updateBlockLength(self, numBlockActionSelected):
+        '''
+        description: computes the length of the block for which an action is chosen, given the number of blocks in which it was already chosen
+        args:        self, number of blocks in which the action was selected (array)
+        return:      block length (array)
+        '''
+        return np.ceil((1 + self.beta) ** numBlockActionSelected).astype(int)
+        # end updateBlockLength
+
+    ''' ################################################################################################################################################################### '''
+    def endCurrentBlock(self, rows):
+        '''
+        description: keeps the gains of the current block as those of the previous block, for the devices given
+        args:        self, boolean mask of devices
+        return:      None
+        '''
+        self.gainPerTimeSlotPreviousBlock[rows] = self.gainPerTimeSlotCurrentBlock[rows]
+        self.numTimeSlotPreviousBlock[rows] = self.numTimeSlotCurrentBlock[rows]
+        # end endCurrentBlock
+
+    ''' ################################################################################################################################################################### '''
+    def allAvailableActionExplored(self):
+        '''
+        description: checks, for every device, whether each available action was selected in at least one block
+        args:        self
+        return:      boolean array, one value per device
+        '''
+        return ~((self.numBlockActionSelected == 0) & (self.actionAvailabilityStatus == 1)).any(axis=1)
+        # end allAvailableActionExplored
+
+    ''' ################################################################################################################################################################### '''
+    def isProbabilityCloseToUniform(self):
+        '''
+        description: checks, for every device, if differences among the (non-zero) probability values are less than or equal to 1/(k-1)
+        args:        self
+        return:      boolean array, one value per device
+        '''
+        positive = self.probability > 0
+        maxProbability = np.where(positive, self.probability, -np.inf).max(axis=1); minProbability = np.where(positive, self.probability, np.inf).min(axis=1)
+        return ~((maxProbability - minProbability) > self.maxProbabilityDifference)
+        # end isProbabilityCloseToUniform
+
+    ''' ################################################################################################################################################################### '''
+    def isCurrentActionWorse(self, currentActionIndex, scaledGain):
+        '''
+        description: determines, for every device, if the current action chosen is worse than the one chosen in the previous block (considering the last gains of that block)
+        args:        self, index of action chosen by each device, scaled gain observed by each device
+        return:      boolean array, one value per device
+        '''
+        numGain = np.minimum(self.numTimeSlotPreviousBlock, self.maxTimeSlotConsideredPreviousBlock)
+        validGain = np.arange(self.maxTimeSlotConsideredPreviousBlock)[None, :] < numGain[:, None]
+        gainGreater = validGain & (self.gainPerTimeSlotPreviousBlock > scaledGain[:, None])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averageGain = np.where(validGain, self.gainPerTimeSlotPreviousBlock, 0).sum(axis=1) / numGain
+            percentageGainGreater = gainGreater.sum(axis=1) * 100 / numGain
+        lastGain = self.gainPerTimeSlotPreviousBlock[np.arange(self.numDevice), (self.numTimeSlotPreviousBlock - 1) % self.maxTimeSlotConsideredPreviousBlock]
+
+        return PopulationSmartEXP3.allAvailableActionExplored(self) & (currentActionIndex != self.actionSelectedPreviousBlock) & (numGain > 0) \
+               & ((averageGain > scaledGain) | (percentageGainGreater > 50) | (lastGain > scaledGain))
+        # end isCurrentActionWorse
+
+    ''' ################################################################################################################################################################### '''
+    def mustSwitchBack(self, currentActionIndex, scaledGain):
+        '''
+        description: determines, for every device, if there is a need to switch back, and sets switchBack accordingly
+        args:        self, index of action chosen by each device, scaled gain observed by each device
+        return:      None
+        '''
+        canSwitchBack = ~self.switchBack & self.actionSelectedPreviousBlockAvailability
+        rows = canSwitchBack & (self.blockLength == self.blockLengthPerAction[np.arange(self.numDevice), currentActionIndex]) \
+               & PopulationSmartEXP3.isCurrentActionWorse(self, currentActionIndex, scaledGain)
+        self.switchBack[rows] = True; self.blockLength[rows] = 1
+        self.switchBack[~canSwitchBack] = False
+        # end mustSwitchBack
+
+    ''' ################################################################################################################################################################### '''
+    def mustReset(self, candidate):
+        '''
+        description: determines, for every candidate device, whether there is a need to reset the algorithm (resetting the block length), and resets it
+        args:        self, boolean mask of devices that may be reset
+        return:      None
+        '''
+        preferredActionIndex = np.argmax(self.probability, axis=1)
+        converged = (self.probability.max(axis=1) >= self.convergedProbability) \
+                    & (self.blockLengthPerAction[np.arange(self.numDevice), preferredActionIndex] >= self.minBlockLengthForReset)
+        qualityDecline = (self.numConsecutiveSlotPreferredActionChosen > self.numConsecutiveSlotForReset) \
+                         & (self.numPreferredActionGain >= (self.rollingAverageWindowSize + 1)) & PopulationSmartEXP3.actionQualityDecline(self)
+        rows = candidate & (converged | qualityDecline)
+        if not rows.any(): return
+
+        inBlock = rows & (self.blockLength != 0)
+        self.blockIndex[inBlock] += 1; self.gamma[inBlock] = PopulationSmartEXP3.computeGamma(self, self.blockIndex[inBlock])
+        PopulationSmartEXP3.endCurrentBlock(self, rows)
+        PopulationSmartEXP3.resetActionBlockLength(self, rows)
+        self.blockLength[rows] = 0
+        # end mustReset
+
+    ''' ################################################################################################################################################################### '''
+    def actionQualityDecline(self):
+        '''
+        decsription: determines, for every device, whether there is a substantial decline in quality of the preferred action; the change in rolling average over the gains
+                     of the preferred action telescopes to the last rolling average minus the first one
+        args:        self
+        return:      boolean array, one value per device (only meaningful for devices with more than rollingAverageWindowSize gains)
+        '''
+        firstRollingAverage = self.firstPreferredActionGain.mean(axis=1); lastRollingAverage = self.lastPreferredActionGain.mean(axis=1)
+        changeInGain = lastRollingAverage - firstRollingAverage
+        return (changeInGain < 0) & (np.abs(changeInGain) >= (self.percentageDeclineForReset * firstRollingAverage) / 100)
+        # end actionQualityDecline
+
+    ''' ################################################################################################################################################################### '''
+    def resetActionBlockLength(self, rows):
+        '''
+        description: resets the block length and attributes used for greedy selection, for the devices given
+        args:        self, boolean mask of devices
+        return:      None
+        '''
+        self.blockLengthPerAction[rows] = 1
+        self.numBlockActionSelected[rows] = 0
+        self.cumulativeGainPerAction[rows] = 0
+        self.numTimeSlotActionSelected[rows] = 0
+        self.actionToExplore[rows] = self.actionAvailabilityStatus[rows] == 1
+
+        self.preferredActionIndex[rows] = -1
+        self.numConsecutiveSlotPreferredActionChosen[rows] = 0
+        self.numPreferredActionGain[rows] = 0
+        # end resetActionBlockLength
+
+    ''' ################################################################################################################################################################### '''
+    def appendPreferredActionGain(self, rows, gain):
+        '''
+        description: records a gain observed from the preferred action, for the devices given
+        args:        self, indices of devices, gain observed by each of these devices
+        return:      None
+        '''
+        numGain = self.numPreferredActionGain[rows]
+        first = numGain < self.rollingAverageWindowSize
+        self.firstPreferredActionGain[rows[first], numGain[first]] = gain[first]
+        self.lastPreferredActionGain[rows, numGain % self.rollingAverageWindowSize] = gain
+        self.numPreferredActionGain[rows] += 1
+        # end appendPreferredActionGain
+
+    ''' ################################################################################################################################################################### '''
+    def updatePreferredActionDetail(self, currentGain, currentActionIndex):
+        '''
+        description: updates details pertaining to the current preferred action (the one selected during the highest number of time slots) of every device
+        args:        self, gain observed by each device, index of action chosen by each device
+        return:      None
+        '''
+        highestCountTimeSlot = self.numTimeSlotActionSelected.max(axis=1)
+        currentPreferredActionIndex = np.argmax(self.numTimeSlotActionSelected, axis=1)
+        noPreferredAction = (self.numTimeSlotActionSelected == highestCountTimeSlot[:, None]).sum(axis=1) > 1
+        changeInPreference = ~noPreferredAction & (self.preferredActionIndex != currentPreferredActionIndex)
+        preferredActionChosen = ~noPreferredAction & ~changeInPreference & (currentActionIndex == self.preferredActionIndex)
+        preferredActionNotChosen = ~noPreferredAction & ~changeInPreference & ~preferredActionChosen
+
+        self.preferredActionIndex[noPreferredAction] = -1; self.numConsecutiveSlotPreferredActionChosen[noPreferredAction] = 0; self.numPreferredActionGain[noPreferredAction] = 0
+        self.preferredActionIndex[changeInPreference] = currentPreferredActionIndex[changeInPreference]
+        self.numConsecutiveSlotPreferredActionChosen[changeInPreference] = 1; self.numPreferredActionGain[changeInPreference] = 0
+        self.numConsecutiveSlotPreferredActionChosen[preferredActionChosen] += 1
+        self.numConsecutiveSlotPreferredActionChosen[preferredActionNotChosen] = 0
+        rows = np.flatnonzero(changeInPreference | preferredActionChosen)
+        PopulationSmartEXP3.appendPreferredActionGain(self, rows, currentGain[rows])
+        # end updatePreferredActionDetail
+
+    ''' ################################################################################################################################################################### '''
+    def handleChangeInActionAvailability(self, t, rows, currentActionAvailabilityStatus, currentActionIndex):
+        '''
+        description: handles changes in action availability for the devices given (see SmartEXP3.handleChangeInActionAvailability)
+        args:        self, current time slot, boolean mask of devices with a change in action availability, (devices x actions) availability status, index of action
+                     currently chosen by each device
+        return:      boolean array stating whether each device was reset
+        '''
+        deviceIndex = np.arange(self.numDevice)
+        highestProbability = self.probability.max(axis=1); actionWithHighestProbability = np.argmax(self.probability, axis=1)
+
+        if self.isLogWeight: self.logWeight[rows] = np.where(currentActionAvailabilityStatus[rows] == 1, 0., -np.inf) if t == 1 \
+                             else adjustLogWeightToAvailability(self.logWeight[rows], currentActionAvailabilityStatus[rows])
+        elif t == 1: self.weight[rows] = currentActionAvailabilityStatus[rows]
+        else: self.weight[rows] = adjustWeightToAvailability(self.weight[rows], currentActionAvailabilityStatus[rows])
+        self.numBlockActionSelected[rows] *= currentActionAvailabilityStatus[rows]
+        self.blockLengthPerAction[rows] *= currentActionAvailabilityStatus[rows]
+        self.cumulativeGainPerAction[rows] *= currentActionAvailabilityStatus[rows]
+        self.numTimeSlotActionSelected[rows] *= currentActionAvailabilityStatus[rows]
+        with np.errstate(divide='ignore'): self.maxProbabilityDifference[rows] = 1 / (currentActionAvailabilityStatus[rows].sum(axis=1) - 1)
+
+        convergedActionUnavailability = rows & (highestProbability >= self.convergedProbability) & (currentActionAvailabilityStatus[deviceIndex, actionWithHighestProbability] == 0)
+        newActionDiscovered = rows & ((currentActionAvailabilityStatus - self.actionAvailabilityStatus) == 1).any(axis=1)
+        currentActionUnavailability = rows & (currentActionAvailabilityStatus[deviceIndex, currentActionIndex] == 0)
+
+        self.actionAvailabilityStatus[rows] = currentActionAvailabilityStatus[rows]
+        self.actionToExplore[rows] = currentActionAvailabilityStatus[rows] == 1
+
+        resetDueToChangeInActionAvailability = np.zeros(self.numDevice, dtype=bool)
+        if t != 1:
+            resetDueToChangeInActionAvailability = convergedActionUnavailability | newActionDiscovered
+            newBlock = currentActionUnavailability & ~resetDueToChangeInActionAvailability
+            PopulationSmartEXP3.resetActionBlockLength(self, resetDueToChangeInActionAvailability)
+            self.blockIndex[resetDueToChangeInActionAvailability] = 1; self.blockLengthForHybrid[resetDueToChangeInActionAvailability] = 0
+            self.blockIndex[newBlock] += 1
+
+            newBlock |= resetDueToChangeInActionAvailability
+            self.blockLength[newBlock] = 0
+            self.gamma[newBlock] = PopulationSmartEXP3.computeGamma(self, self.blockIndex[newBlock])
+            PopulationSmartEXP3.endCurrentBlock(self, newBlock)
+        return resetDueToChangeInActionAvailability
+        # end handleChangeInActionAvailability
+
+    ''' ################################################################################################################################################################### '''
+    def getAttributeName(self):
+        '''
+        decsription: returns the list of attributes logged per device, in the same order as SmartEXP3.getAttributeName
+        args:        self
+        return:      list of attribute names (strings)
+        '''
+        return ["gamma", "blockIndex", "blockLength", "#blockActionSelected"] + ["weight %d" % (i) for i in range(1, self.numAction + 1)] \
+               + ["probability %d" % (i) for i in range(1, self.numAction + 1)]
+        # end getAttributeName
+
+    ''' ################################################################################################################################################################### '''
+    def getAttributeValue(self, deviceIndex):
+        '''
+        description: returns the values of the attributes of one device, in the same order as SmartEXP3.getAttributeValue
+        args:        self, index of the device (device ID - 1)
+        return:      list of attribute values
+        '''
+        return [self.gamma[deviceIndex].item(), self.blockIndex[deviceIndex].item(), self.blockLength[deviceIndex].item(), [self.numBlockActionSelected[deviceIndex].tolist()]] \
+               + (np.exp(self.logWeight[deviceIndex]) if self.isLogWeight else self.weight[deviceIndex]).tolist() + self.probability[deviceIndex].tolist()
+        # end getAttributeValue
+    # end class PopulationSmartEXP3
+
+''' __________________________________________________________________ PopulationEngine class definition __________________________________________________________________ '''
+class PopulationEngine(object):
+    ''' moves all mobile devices forward one time slot at a time; drop-in replacement for running MobileDevice.performWirelessNetworkSelection as one simpy process per device '''
+    def __init__(self, numMobileDevice, numNetwork, algorithmName):
+        ''' initializes all attributes '''
+        self.numMobileDevice = numMobileDevice
+        self.numNetwork = numNetwork
+        seedList = [getStreamSeed(SEED, RUN_NUM, deviceID) for deviceID in range(1, numMobileDevice + 1)]     # same streams as the devices of the process engine
+        if algorithmName == "EXP3": self.algorithm = PopulationEXP3(numMobileDevice, numNetwork, seedList, LOG_WEIGHT)
+        elif algorithmName == "SmartEXP3": self.algorithm = PopulationSmartEXP3(numMobileDevice, numNetwork, seedList=seedList, logWeight=LOG_WEIGHT)
+        else: raise ValueError("the population engine supports EXP3 and SmartEXP3 only, not %s" % (algorithmName))
+
+        self.dataRate = np.zeros(numNetwork)                            # data rate of each network (in Mbps)
+        self.dataRateList = [0] * numNetwork                            # same data rates, as defined in the problem instance (for log)
+        self.wirelessTechnology = [None] * numNetwork                   # e.g. WiFi or Cellular
+        self.currentNetwork = np.full(numMobileDevice, -1)              # ID of network to which each device is currently associated
+        self.gain = np.zeros(numMobileDevice)                           # bit rate observed by each device (ignores switching cost)
+        self.download = np.zeros(numMobileDevice)                       # amount of data downloaded by each device in Mbits (takes into account switching cost)
+        self.delay = np.zeros(numMobileDevice)                          # delay incurred by each device while switching network in seconds
+        self.delaySampler = DelaySampler(getStreamSeed(SEED, RUN_NUM, 0, DELAY_STREAM))  # switching delays of all devices drawn in batches from one seeded generator
+        self.maxGain = np.zeros(numMobileDevice)
+        self.currentNetworkAvailabilityStatus = np.ones((numMobileDevice, numNetwork), dtype=int)
+
+        # attribute for log
+        self.deviceCSVdata = []
+        self.networkCSVdata = None
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def run(self, startTimeSlot=1):
+        '''
+        description: repeatedly performs a wireless network selection for all devices, following the algorithm chosen
+        args:        self, first time slot (after 1 when resuming from a checkpoint, with the engine restored from it)
+        returns:     None
+        '''
+        if startTimeSlot == 1: PopulationEngine.createCSVfile(self)
+
+        for t in range(startTimeSlot, NUM_TIME_SLOT + 1):
+            if PROFILER != None: phaseStartTime = PROFILER.getTime()
+
+            # update changes in network data rate and network availability
+            changeInNetworkAvailability = np.zeros(self.numMobileDevice, dtype=bool)
+
+            if 'noisy' in PROBLEM_INSTANCE: PopulationEngine.updateNetworkDetail(self, t)
+
+            if problem_instance.changeInEnvironment(PROBLEM_INSTANCE, t):
+                print("@t = ", t, " - change in network data rate")
+                if 'noisy' not in PROBLEM_INSTANCE: PopulationEngine.updateNetworkDetail(self, t)
+                changeInNetworkAvailability = PopulationEngine.updateNetworkAvailability(self, t)
+            if PROFILER != None: phaseStartTime = PROFILER.record("environment update", phaseStartTime)
+
+            # update probability distribution and select wireless network
+            currentActionIndex = np.where(self.currentNetwork != -1, self.currentNetwork - 1, -1)
+            self.algorithm.updateProbabilityDistribution(t, changeInNetworkAvailability, self.currentNetworkAvailabilityStatus, currentActionIndex)
+            if PROFILER != None: phaseStartTime = PROFILER.record("updateProbabilityDistribution", phaseStartTime)
+            prevNetworkSelected = self.currentNetwork; self.currentNetwork = self.algorithm.chooseAction(t, currentActionIndex) + 1
+            if PROFILER != None: phaseStartTime = PROFILER.record("chooseAction", phaseStartTime)
+
+            # associate with wireless network and observe gain
+            PopulationEngine.associateWithWirelessNetwork(self, prevNetworkSelected)
+            if PROFILER != None: phaseStartTime = PROFILER.record("associateWithWirelessNetwork", phaseStartTime)
+            PopulationEngine.observeGain(self)
+            if PROFILER != None: phaseStartTime = PROFILER.record("observeGain", phaseStartTime)
+
+            # save details of the run
+            PopulationEngine.saveDeviceDetail(self, t)
+            if PROFILER != None: phaseStartTime = PROFILER.record("saveDeviceDetail", phaseStartTime)
+            PopulationEngine.saveNetworkDetail(self, t)
+            if PROFILER != None: phaseStartTime = PROFILER.record("saveNetworkDetail", phaseStartTime)
+            PopulationEngine.writeCSVfile(self, t)
+            if PROFILER != None: phaseStartTime = PROFILER.record("writeCSVfile", phaseStartTime)
+
+            # update weight
+            self.algorithm.updateWeight(t, self.currentNetwork - 1, self.gain, self.maxGain, currentActionIndex)
+            if PROFILER != None: phaseStartTime = PROFILER.record("updateWeight", phaseStartTime)
+
+            if CHECKPOINT != None and CHECKPOINT.isDue(t):
+                CHECKPOINT.save(t)
+                if PROFILER != None: PROFILER.record("checkpoint", phaseStartTime)
+        # end run
+
+    ''' ################################################################################################################################################################### '''
+    def updateNetworkDetail(self, t):
+        '''
+        description: retrieves the data rate and wireless technology of each network for the current time slot
+        args:        self, current time slot
+        returns:     None
+        '''
+        currentDataRate = problem_instance.getNetworkDataRate(PROBLEM_INSTANCE, t)
+        self.dataRate = np.array(currentDataRate, dtype=float); self.dataRateList = list(currentDataRate)
+        self.wirelessTechnology = problem_instance.getWirelessTechnology(PROBLEM_INSTANCE, t)
+        self.maxGain[:] = self.dataRate.max()
+        # end updateNetworkDetail
+
+    ''' ################################################################################################################################################################### '''
+    def updateNetworkAvailability(self, t):
+        '''
+        description: retrieves the networks available to each device in the current time slot
+        args:        self, current time slot
+        returns:     whether there is a change in network availability for each device
+        '''
+        changeInNetworkAvailability = np.zeros(self.numMobileDevice, dtype=bool)
+        self.currentNetworkAvailabilityStatus = np.zeros((self.numMobileDevice, self.numNetwork), dtype=int)
+        for deviceIndex in range(self.numMobileDevice):
+            changeInNetworkAvailability[deviceIndex], currentAvailableNetwork = problem_instance.changeInNetworkAvailability(PROBLEM_INSTANCE, t, deviceIndex + 1)
+            self.currentNetworkAvailabilityStatus[deviceIndex, [networkID - 1 for networkID in currentAvailableNetwork]] = 1
+        availableDataRate = np.where(self.currentNetworkAvailabilityStatus == 1, self.dataRate, -np.inf).max(axis=1)
+        self.maxGain = np.where(changeInNetworkAvailability, availableDataRate, self.maxGain)
+        return changeInNetworkAvailability
+        # end updateNetworkAvailability
+
+    ''' ################################################################################################################################################################### '''
+    def associateWithWirelessNetwork(self, prevNetworkSelected):
+        '''
+        description: computes the delay incurred by devices that switched network; the others incur no delay
+        args:        self, ID of network selected by each device in the previous time slot
+        returns:     None
+        '''
+        switched = prevNetworkSelected != self.currentNetwork
+        self.delay = np.zeros(self.numMobileDevice)
+        if switched.any(): self.delay[switched] = PopulationEngine.computeDelay(self, self.currentNetwork[switched])
+        # end associateWithWirelessNetwork
+
+    ''' ################################################################################################################################################################### '''
+    def computeDelay(self, networkID):
+        '''
+        description: generates a batch of switching delays, using Johnson's SU distribution for WiFi networks and Student's t-distribution for cellular networks
+                     (see MobileDevice.computeDelay), taken from the pools of delays drawn in advance by the DelaySampler of the engine
+        args:        self, ID of network joined by each device that switched
+        returns:     a delay value per device that switched
+        '''
+        isWiFi = np.array([self.wirelessTechnology[i - 1] == 'WiFi' for i in networkID], dtype=bool)
+        delay = np.zeros(len(networkID))
+        if isWiFi.any(): delay[isWiFi] = self.delaySampler.getDelayBatch('WiFi', isWiFi.sum())
+        if (~isWiFi).any(): delay[~isWiFi] = self.delaySampler.getDelayBatch('cellular', (~isWiFi).sum())
+        return delay
+        # end computeDelay
+
+    ''' ################################################################################################################################################################### '''
+    def observeGain(self):
+        '''
+        description: determines the bit rate observed by each device and the amount of data it downloads; the data rate of a network is shared equally among the devices
+                     that chose it and actually have access to it
+        args:        self
+        returns:     None
+        '''
+        deviceIndex = np.arange(self.numMobileDevice); networkIndex = self.currentNetwork - 1
+        accessible = self.currentNetworkAvailabilityStatus[deviceIndex, networkIndex] == 1
+        numRelevantAssociatedDevice = np.bincount(networkIndex[accessible], minlength=self.numNetwork)
+        self.gain = np.where(accessible, self.dataRate[networkIndex] / np.maximum(numRelevantAssociatedDevice[networkIndex], 1), 0)
+        self.download = self.gain * (TIME_SLOT_DURATION - self.delay)
+        # end observeGain
+
+    ''' ################################################################################################################################################################### '''
+    def createCSVfile(self):
+        '''
+        description: creates the CSV data to save per time slot details about each device and about the networks, with the same headers as MobileDevice
+        args:        self
+        return:      None
+        '''
+        deviceHeader = ["run", "timeslot", "deviceID"] + self.algorithm.getAttributeName() + ["current network", "gain (Mbps)", "delay (secs)", "download (Mbits)"] \
+                       + ["download %d (Mbits)" % (i) for i in range(1, self.numNetwork + 1)]
+        self.deviceCSVdata = [createOutputData(OUTPUT_DIR + "device%d.csv" % (deviceID), deviceHeader, OUTPUT_FORMAT, SAVE_TO_FILE_FREQUENCY, STREAM_OUTPUT) for deviceID in range(1, self.numMobileDevice + 1)]
+
+        networkHeader = ["run", "timeslot"] + ["data rate %d" % (i) for i in range(1, self.numNetwork + 1)] + ["technology %d" % (i) for i in range(1, self.numNetwork + 1)] \
+                        + ["#devices %d" % (i) for i in range(1, self.numNetwork + 1)] + ["network device %d" % (i) for i in range(1, self.numMobileDevice + 1)]
+        self.networkCSVdata = createOutputData(OUTPUT_DIR + "network.csv", networkHeader, OUTPUT_FORMAT, SAVE_TO_FILE_FREQUENCY, STREAM_OUTPUT)
+        # end createCSVfile
+
+    ''' ################################################################################################################################################################### '''
+    def saveDeviceDetail(self, t):
+        '''
+        description: save run time details about the algorithm run by each device, including the download from each network (had the device chosen it)
+        args:        self, current time slot
+        return:      None
+        '''
+        numAssociatedDevice = np.bincount(self.currentNetwork - 1, minlength=self.numNetwork)
+        isCurrentNetwork = np.arange(1, self.numNetwork + 1)[None, :] == self.currentNetwork[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            downloadPerNetwork = np.where(isCurrentNetwork, self.dataRate / numAssociatedDevice, np.where(self.currentNetworkAvailabilityStatus == 1,
+                                                                                                         self.dataRate / (numAssociatedDevice + 1), 0)) * TIME_SLOT_DURATION
+        for deviceIndex in range(self.numMobileDevice):
+            self.deviceCSVdata[deviceIndex].addRow([RUN_NUM, t, deviceIndex + 1] + self.algorithm.getAttributeValue(deviceIndex) + [self.currentNetwork[deviceIndex].item(),
+                                                   self.gain[deviceIndex].item(), self.delay[deviceIndex].item(), self.download[deviceIndex].item()] + downloadPerNetwork[deviceIndex].tolist())
+        if RUN_SUMMARY != None: RUN_SUMMARY.addDownloadPerDevice(t, self.download)
+        # end saveDeviceDetail
+
+    ''' ################################################################################################################################################################### '''
+    def saveNetworkDetail(self, t):
+        '''
+        description: save run time details about devices associated to each network, i.e. the number of devices in each network and the network of each device
+        args:        self, current time slot
+        return:      None
+        '''
+        numAssociatedDevice = np.bincount(self.currentNetwork, minlength=self.numNetwork + 1)[1:]
+        networkData = [RUN_NUM, t] + self.dataRateList + list(self.wirelessTechnology) + numAssociatedDevice.tolist() + self.currentNetwork.tolist()
+        self.networkCSVdata.addRow(networkData)
+        if RUN_SUMMARY != None: RUN_SUMMARY.addNetworkDetail(networkData)
+        # end saveNetworkDetail
+
+    ''' ################################################################################################################################################################### '''
+    def writeCSVfile(self, timeSlot):
+        '''
+        description: saves details to csv files
+        args:        self, the current times slot
+        return:      None
+        '''
+        if timeSlot % SAVE_TO_FILE_FREQUENCY == 0:
+            for deviceCSVdata in self.deviceCSVdata: deviceCSVdata.saveToFile(SAVE_TO_FILE_FREQUENCY)
+            self.networkCSVdata.saveToFile(SAVE_TO_FILE_FREQUENCY)
+        # end writeCSVfile
+    # end PopulationEngine class
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
@@ -6,11 +6,15 @@ import global_setting
 from copy import deepcopy
 from math import ceil
 from utility_method import computeNashEquilibriumState
+import os
 import pickle
+import numpy as np
 
 # this file is imported in wns.py before the values of the global parameters are set; their correct values are set in initialize()
 NUM_MOBILE_DEVICE = NUM_TIME_SLOT = NUM_REPEAT = 0; PROBLEM_INSTANCES = {}; PERIOD_OPTIONS = {}
 NETWORK_DATA_RATE = []
+NOISY_DATA_RATE = {}    # memory-mapped data rate series of the noisy problem instances, loaded on first use (see getNoisyDataRate)
+SCENARIO_TIMELINE = {}  # compiled ScenarioTimeline of each problem instance; built once in initialize()
 
 ''' __________________________________________________________ definition of problem instances and period options _________________________________________________________ '''
 def initialize():
@@ -20,7 +24,7 @@ def initialize():
     args:        none
     return:      None
     '''
-    global NUM_MOBILE_DEVICE, NUM_TIME_SLOT, NUM_REPEAT, PROBLEM_INSTANCES, PERIOD_OPTIONS, NETWORK_DATA_RATE, NOISY_DATA_RATE
+    global NUM_MOBILE_DEVICE, NUM_TIME_SLOT, NUM_REPEAT, PROBLEM_INSTANCES, PERIOD_OPTIONS, NETWORK_DATA_RATE, NOISY_DATA_RATE, SCENARIO_TIMELINE
 
     NUM_MOBILE_DEVICE = global_setting.constants['num_mobile_device']
     NUM_TIME_SLOT = global_setting.constants['num_time_slot']
@@ -252,18 +256,101 @@ def initialize():
         17: [4]
     } # end PERIOD_OPTIONS
 
-    with open('noisy_mobility_setup_home_office.pkl', 'rb') as f: noisy_mobility_setup_home_office = pickle.load(f)
-    with open('noisy_change_in_data_rates_no_mobility.pkl', 'rb') as f: noisy_change_in_data_rates_no_mobility = pickle.load(f)
-
-    NOISY_DATA_RATE = {
-        'noisy_mobility_setup_home_office': { 'data_rate': noisy_mobility_setup_home_office },
-        'noisy_change_in_data_rates_no_mobility': {'data_rate': noisy_change_in_data_rates_no_mobility }
-        # 'change_in_data_rates_no_mobility_drop':
-        #     { 'data_rate': change_in_data_rates_no_mobility_drop, 'NEstate_list': change_in_data_rates_no_mobility_drop_NE }
-    }
+    NOISY_DATA_RATE = {}    # data rate series of the noisy problem instances are only loaded when selected (see getNoisyDataRate)
 
+    # compile the timeline of each problem instance once; all lookups below go through it
+    SCENARIO_TIMELINE = {}
+    for problem_instance in PROBLEM_INSTANCES: SCENARIO_TIMELINE.update({problem_instance: ScenarioTimeline(problem_instance)})
     # end initialize
 
+''' _______________________________________________________________ compiled timeline of a problem instance _______________________________________________________________ '''
+class ScenarioTimeline(object):
+    '''
+    maps each time slot of a repetition to its key in the problem instance definition with a precomputed array, and stores the availability of networks as a
+    (key x network x device) boolean matrix, so that the lookups done for every device and network in every time slot take constant time
+    '''
+    def __init__(self, problem_instance):
+        global PROBLEM_INSTANCES, NUM_TIME_SLOT, NUM_REPEAT
+
+        self.keyList = sorted(PROBLEM_INSTANCES[problem_instance].keys())
+        self.numTimeSlotPerRepetition = NUM_TIME_SLOT // NUM_REPEAT
+
+        # time slots at which there is a change in the environment, till end of simulation run
+        self.timeOfChangeInEnvironment = []
+        for key in self.keyList: self.timeOfChangeInEnvironment += [int(mapKeyToTimeSlot(key)) + (repetition * self.numTimeSlotPerRepetition) for repetition in range(NUM_REPEAT)]
+        self.timeOfChangeInEnvironment = sorted(self.timeOfChangeInEnvironment)
+        self.timeOfChangeInEnvironmentSet = set(self.timeOfChangeInEnvironment)
+
+        # index of the key for each time slot in the first repetition (index 0 is unused as time slots start at 1)
+        self.keyIndexPerTimeSlot = np.zeros(self.numTimeSlotPerRepetition + 1, dtype=int)
+        for timeSlot in range(1, self.numTimeSlotPerRepetition + 1): self.keyIndexPerTimeSlot[timeSlot] = ScenarioTimeline.searchKeyIndex(self, timeSlot)
+
+        # availability[key index][network ID - 1][device ID] is True if the device has access to the network
+        deviceListPerKey = [PROBLEM_INSTANCES[problem_instance][key]['device_list'] for key in self.keyList]
+        maxDeviceID = max([NUM_MOBILE_DEVICE] + [deviceID for deviceList in deviceListPerKey for devices in deviceList for deviceID in devices])
+        self.availability = np.zeros((len(self.keyList), len(deviceListPerKey[0]), maxDeviceID + 1), dtype=bool)
+        for keyIndex, deviceList in enumerate(deviceListPerKey):
+            for networkIndex, devices in enumerate(deviceList): self.availability[keyIndex, networkIndex, list(devices)] = True
+
+        self.timeOfChangeInNetworkAvailability = {}     # per device; filled on first request
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def searchKeyIndex(self, equivalentTimeSlotInFirstRepetition):
+        '''
+        description: finds the index of the key that defines the state of the environment at a time slot of the first repetition, by scanning the times of change
+        args:        self, a time slot in the first repetition
+        return:      index of the key in the sorted list of keys
+        '''
+        if len(self.timeOfChangeInEnvironment) == 1: return 0
+        if equivalentTimeSlotInFirstRepetition >= self.timeOfChangeInEnvironment[-1]: return len(self.keyList) - 1
+        for index, time in enumerate(self.timeOfChangeInEnvironment):
+            if time == equivalentTimeSlotInFirstRepetition: return index
+            if time > equivalentTimeSlotInFirstRepetition: return index - 1
+        # end searchKeyIndex
+
+    ''' ################################################################################################################################################################### '''
+    def getKeyIndex(self, timeSlot):
+        '''
+        description: maps an actual time slot to the index of its key
+        args:        self, a time slot
+        return:      index of the key in the sorted list of keys
+        '''
+        return self.keyIndexPerTimeSlot[timeSlot % self.numTimeSlotPerRepetition or self.numTimeSlotPerRepetition]
+        # end getKeyIndex
+
+    ''' ################################################################################################################################################################### '''
+    def isNetworkAccessible(self, timeSlot, networkID, deviceID):
+        '''
+        description: determines whether a network is available to a device
+        args:        self, the current time slot, ID of a network, ID of a mobile device
+        return:      True or False depending on whether the network is available to the device
+        '''
+        return ScenarioTimeline.isNetworkAccessibleAtKeyIndex(self, ScenarioTimeline.getKeyIndex(self, timeSlot), networkID, deviceID)
+        # end isNetworkAccessible
+
+    ''' ################################################################################################################################################################### '''
+    def isNetworkAccessibleAtKeyIndex(self, keyIndex, networkID, deviceID):
+        '''
+        description: determines whether a network is available to a device in the state of the environment defined by a key
+        args:        self, index of the key, ID of a network, ID of a mobile device
+        return:      True or False depending on whether the network is available to the device
+        '''
+        return deviceID < self.availability.shape[2] and bool(self.availability[keyIndex, networkID - 1, deviceID])
+        # end isNetworkAccessibleAtKeyIndex
+
+    ''' ################################################################################################################################################################### '''
+    def getAvailableNetwork(self, timeSlot, deviceID):
+        '''
+        description: returns the list of networks available to a device
+        args:        self, the current time slot, ID of a mobile device
+        return:      list of networks available (their IDs)
+        '''
+        if deviceID >= self.availability.shape[2]: return []
+        return (np.flatnonzero(self.availability[ScenarioTimeline.getKeyIndex(self, timeSlot), :, deviceID]) + 1).tolist()
+        # end getAvailableNetwork
+    # end class ScenarioTimeline
+
 ''' ___________________________________________________________ functions to extract details of problem instance __________________________________________________________ '''
 def mapKeyToTimeSlot(key):
     '''
@@ -282,15 +369,9 @@ def getTimeOfChangeInEnvironment(problem_instance):
     args:        name of problem instance being considered
     return:      the time slots at which there are changes
     '''
-    global PROBLEM_INSTANCES, NUM_REPEAT, NUM_TIME_SLOT
-
-    timeOfChange = []
+    global SCENARIO_TIMELINE
 
-    # get the list of keys in ascending order for the problem instance considered
-    key_list = PROBLEM_INSTANCES[problem_instance].keys(); key_list = sorted(key_list)
-
-    for key in key_list: timeOfChange += [int(mapKeyToTimeSlot(key)) + (repetition * (NUM_TIME_SLOT//NUM_REPEAT)) for repetition in range(NUM_REPEAT)]
-    return sorted(timeOfChange)
+    return list(SCENARIO_TIMELINE[problem_instance].timeOfChangeInEnvironment)
     # end getTimesOfChange
 
 
@@ -300,23 +381,10 @@ def mapTimeSlotToKey(problem_instance, timeSlot):
     args:        a time slot
     return:      a key in a problem instance definition that defines the current state of the environment
     '''
-    global NUM_TIME_SLOT, NUM_REPEAT
+    global SCENARIO_TIMELINE
 
-    # get the list of keys in ascending order for the problem instance considered, and map them to a time slot in the first repetition
-    key_list = PROBLEM_INSTANCES[problem_instance].keys(); key_list = sorted(key_list)
-    timeOfChange = getTimeOfChangeInEnvironment(problem_instance)
-
-    # map the current time slot to a time slot in the first repetition - faster to search for the key
-    equivalentTimeSlotInFirstRepetition = NUM_TIME_SLOT//NUM_REPEAT if timeSlot%(NUM_TIME_SLOT//NUM_REPEAT) == 0 else timeSlot%(NUM_TIME_SLOT//NUM_REPEAT)
-    # print("timeOfChange:", timeOfChange, ", time:", timeSlot, ", equivalentTimeSlotInFirstRepetition:", equivalentTimeSlotInFirstRepetition)
-    # print("timeOfChange:", timeOfChange, ", t:", timeSlot, ", equivalentTimeSlotInFirstRepetition:", equivalentTimeSlotInFirstRepetition)
-
-    # print(key_list, timeOfChange, equivalentTimeSlotInFirstRepetition)
-    if len(timeOfChange) == 1: return key_list[0]
-    if equivalentTimeSlotInFirstRepetition >= timeOfChange[-1]: return key_list[-1]
-    for index, time in enumerate(timeOfChange):
-        if time == equivalentTimeSlotInFirstRepetition: return key_list[index]
-        if time > equivalentTimeSlotInFirstRepetition: return key_list[index - 1]
+    timeline = SCENARIO_TIMELINE[problem_instance]
+    return timeline.keyList[timeline.getKeyIndex(timeSlot)]
     # end mapTimeSlotToKey
 
 def changeInEnvironment(problem_instance, timeSlot):
@@ -325,9 +393,9 @@ def changeInEnvironment(problem_instance, timeSlot):
     args:        the name of the problem instance being considered, the current time slot
     return:      True or False depending on whether there is a change in the current time slot
     '''
-    global PROBLEM_INSTANCES
+    global SCENARIO_TIMELINE
 
-    return timeSlot in getTimeOfChangeInEnvironment(problem_instance)
+    return timeSlot in SCENARIO_TIMELINE[problem_instance].timeOfChangeInEnvironmentSet
     # end changeInEnvironment
 
 def changeInNetworkAvailability(problem_instance, timeSlot, deviceID):
@@ -356,10 +424,30 @@ def getNetworkDataRate(problem_instance, timeSlot):
 
     key = mapTimeSlotToKey(problem_instance, timeSlot)
     dataRate = PROBLEM_INSTANCES[problem_instance][key]['data_rate']
-    if '.pkl' in dataRate: dataRate = NOISY_DATA_RATE[problem_instance]['data_rate'][timeSlot - 1]
+    if '.pkl' in dataRate: dataRate = getNoisyDataRate(problem_instance, dataRate)[timeSlot - 1].tolist()
     return dataRate
     # end getNetworkDataRate
 
+def getNoisyDataRate(problem_instance, filename):
+    '''
+    description: gets the data rate series (time slot x network) of a noisy problem instance, loading it the first time it is needed; the series is converted once from
+                 the pickle file to a .npy file next to it (again if the pickle file is newer), which is memory-mapped so that only the rows of the time slots simulated
+                 are read from disk
+    args:        the name of the problem instance being considered, name of the pickle file storing its data rate series
+    return:      read-only array of data rates, one row per time slot
+    '''
+    global NOISY_DATA_RATE
+
+    if problem_instance not in NOISY_DATA_RATE:
+        arrayFilename = os.path.splitext(filename)[0] + '.npy'
+        if not os.path.exists(arrayFilename) or (os.path.exists(filename) and os.path.getmtime(filename) > os.path.getmtime(arrayFilename)):
+            with open(filename, 'rb') as f: dataRate = np.array(pickle.load(f))
+            with open(arrayFilename + '.tmp', 'wb') as f: np.save(f, dataRate)
+            os.replace(arrayFilename + '.tmp', arrayFilename)   # other runs started from the same directory never see a partial file
+        NOISY_DATA_RATE.update({problem_instance: {'data_rate': np.load(arrayFilename, mmap_mode='r')}})
+    return NOISY_DATA_RATE[problem_instance]['data_rate']
+    # end getNoisyDataRate
+
 def getWirelessTechnology(problem_instance, timeSlot):
     '''
     description: gets the wireless technology of each network available during the current time slot, based on the definition of the problem instance being considered
@@ -421,14 +509,10 @@ def getUnavailableNetwork(problem_instance, timeSlot, deviceID):
     args:        name of the problem instance being considered, the current time slot, ID of a mobile device
     return:      list of networks currently not available (their IDs)
     '''
-    global PROBLEM_INSTANCES
+    global SCENARIO_TIMELINE
 
-    unavailableNetworkList = []
-    key = mapTimeSlotToKey(problem_instance, timeSlot)
-    deviceList = PROBLEM_INSTANCES[problem_instance][key]['device_list']
-    for index, list in enumerate(deviceList):
-        if deviceID not in list: unavailableNetworkList.append(index + 1)
-    return unavailableNetworkList
+    availableNetworkList = SCENARIO_TIMELINE[problem_instance].getAvailableNetwork(timeSlot, deviceID)
+    return [networkID for networkID in range(1, SCENARIO_TIMELINE[problem_instance].availability.shape[1] + 1) if networkID not in availableNetworkList]
 
 def getAvailableNetwork(problem_instance, timeSlot, deviceID):
     '''
@@ -436,14 +520,9 @@ def getAvailableNetwork(problem_instance, timeSlot, deviceID):
     args:        name of the problem instance being considered, the current time slot, ID of a mobile device
     return:      list of networks currently not available (their IDs)
     '''
-    global PROBLEM_INSTANCES
+    global SCENARIO_TIMELINE
 
-    availableNetworkList = []
-    key = mapTimeSlotToKey(problem_instance, timeSlot)
-    deviceList = PROBLEM_INSTANCES[problem_instance][key]['device_list']
-    for index, list in enumerate(deviceList):
-        if deviceID in list: availableNetworkList.append(index + 1)
-    return availableNetworkList
+    return SCENARIO_TIMELINE[problem_instance].getAvailableNetwork(timeSlot, deviceID)
     # end getAvailableNetwork
 
 def isNetworkAccessible(problem_instance, timeSlot, networkID, deviceID):
@@ -452,23 +531,43 @@ def isNetworkAccessible(problem_instance, timeSlot, networkID, deviceID):
     args:        the name of the problem instance being considered, the current time slot, ID of a mobile device
     return:      True or False depending on whether the network is available to the device
     '''
-    global PROBLEM_INSTANCES
+    global SCENARIO_TIMELINE
 
-    key = mapTimeSlotToKey(problem_instance, timeSlot)
-    # print('timeSlot:', timeSlot, 'key', key)
-    deviceList = PROBLEM_INSTANCES[problem_instance][key]['device_list']
-    if deviceID in deviceList[networkID - 1]: return True
-    return False
+    return SCENARIO_TIMELINE[problem_instance].isNetworkAccessible(timeSlot, networkID, deviceID)
     # end isNetworkAccessible
 
+def getKeyIndex(problem_instance, timeSlot):
+    '''
+    description: maps an actual time slot to the index of its key in the sorted list of keys of the problem instance definition
+    args:        the name of the problem instance being considered, the current time slot
+    return:      index of the key that defines the current state of the environment
+    '''
+    global SCENARIO_TIMELINE
+
+    return SCENARIO_TIMELINE[problem_instance].getKeyIndex(timeSlot)
+    # end getKeyIndex
+
+def isNetworkAccessibleAtKeyIndex(problem_instance, keyIndex, networkID, deviceID):
+    '''
+    description: determines whether a network is available to a device in the state of the environment defined by a key
+    args:        the name of the problem instance being considered, index of the key, ID of a network, ID of a mobile device
+    return:      True or False depending on whether the network is available to the device
+    '''
+    global SCENARIO_TIMELINE
+
+    return SCENARIO_TIMELINE[problem_instance].isNetworkAccessibleAtKeyIndex(keyIndex, networkID, deviceID)
+    # end isNetworkAccessibleAtKeyIndex
+
 def getTimeOfChangeInNetworkAvailability(problem_instance, deviceID):
     '''
     description: identifies the time slots at which there is a change in the set of networks available to a particular device - considers repetition; till end of simulatiton run
     args:        the name of the problem instance being considered, the current time slot, ID of a mobile device
     return:      the time slots at which there are is a change in network availability
     '''
-    global NUM_TIME_SLOT, NUM_REPEAT
+    global NUM_TIME_SLOT, NUM_REPEAT, SCENARIO_TIMELINE
 
+    timeline = SCENARIO_TIMELINE[problem_instance]
+    if deviceID in timeline.timeOfChangeInNetworkAvailability: return list(timeline.timeOfChangeInNetworkAvailability[deviceID])
     timeOfChangeInNetworkAvailability = []
     previousAvailableNetwork = []
 
@@ -482,6 +581,7 @@ def getTimeOfChangeInNetworkAvailability(problem_instance, deviceID):
         previousAvailableNetwork = deepcopy(availableNetwork)
 
     # print("timeOfChangeInNetworkAvailability:", timeOfChangeInNetworkAvailability)
+    timeline.timeOfChangeInNetworkAvailability.update({deviceID: list(timeOfChangeInNetworkAvailability)})
     return timeOfChangeInNetworkAvailability
 
     # end getTimeOfChangeInNetworkAvailability
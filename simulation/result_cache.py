@@ -0,0 +1,127 @@
+'''
+@description:   Defines a content-addressed cache of the summary outputs of simulation runs (see -cache in wns.py and sweep.py); an entry is keyed by a hash of the
+                parameters of the run (global_setting.constants, which include the seed and the run index) and of the version of the simulation code, so that a run that was
+                already completed with the same parameters and code is not simulated again, and its summary files are copied to the output directory instead
+@assumptions:   runs are deterministic given their parameters (the random number streams are derived from the seed and the run index); the code version covers the python
+                files of the simulation, not the data files of the noisy problem instances; the per time slot details of devices and networks are not cached, hence a run
+                restored from the cache is marked as such (RESTORED_FILE), and cannot be analyzed by run_analysis.py or stability.py
+'''
+
+''' ______________________________________________________________________ import external libraries ______________________________________________________________________ '''
+import os
+import json
+import time
+import shutil
+import hashlib
+
+''' ______________________________________________________________________________ constants ______________________________________________________________________________ '''
+SUMMARY_FILE = ["distanceToNashEquilibrium.csv", "meanDistanceToNashEquilibriumPerRepetition.csv", "medianDistanceToNashEquilibriumPerRepetition.csv",
+                "cumulativeGainPerDevicePerRepetition.csv", "cumulativeGainPerDevice.csv", "cumulativeGainPerDevice_median_std.csv"]    # outputs of wns.py saved in an entry
+PARAMETER_FILE = "parameter.json"               # parameters of the run, saved in each entry for reference
+RESTORED_FILE = "restoredFromCache.json"        # saved in the output directory of a run restored from the cache, with the key of the entry
+NON_KEY_CONSTANT = ["output_dir", "network_list", "run_summary", "checkpoint", "profiler"]    # constants that do not change the results of a run
+NON_SIMULATION_SOURCE = ["sweep.py", "stability.py", "run_analysis.py", "benchmark.py", "phase_profiler.py"]     # python files that do not change the results of a run
+MAX_AGE = 30 * 24 * 3600                        # entries not used for that long (in seconds) are evicted
+MAX_SIZE = 1024                                 # maximum size of the cache (in MB); the least recently used entries are evicted first
+
+''' ____________________________________________________________________ ResultCache class definition _____________________________________________________________________ '''
+class ResultCache(object):
+    def __init__(self, directory, constants, maxAge=MAX_AGE, maxSize=MAX_SIZE):
+        self.directory = directory
+        self.parameter = {key: value for key, value in constants.items() if key not in NON_KEY_CONSTANT}
+        self.maxAge = maxAge
+        self.maxSize = maxSize * 1024 * 1024    # in bytes
+        self.key = hashlib.sha256((json.dumps(self.parameter, sort_keys=True) + getCodeVersion()).encode()).hexdigest()
+        self.entryDir = os.path.join(directory, self.key) + os.sep
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def load(self, outputDir):
+        '''
+        description: copies the summary files of the run to the output directory if the cache holds an entry for it, and marks the run as restored from the cache (it
+                     has no per time slot details); the entry is marked as used
+        args:        self, output directory of the run
+        returns:     True if the summary files were found in the cache, False otherwise
+        '''
+        if not all(os.path.exists(self.entryDir + filename) for filename in SUMMARY_FILE): return False
+        if not os.path.exists(outputDir): os.makedirs(outputDir)
+        for filename in SUMMARY_FILE: shutil.copyfile(self.entryDir + filename, os.path.join(outputDir, filename))
+        with open(os.path.join(outputDir, RESTORED_FILE), "w") as restoredFile: json.dump({'key': self.key, 'summary_file': SUMMARY_FILE}, restoredFile, indent=1)
+        os.utime(self.entryDir)     # age of an entry is counted from its last use
+        return True
+        # end load
+
+    ''' ################################################################################################################################################################### '''
+    def save(self, outputDir):
+        '''
+        description: saves the summary files of a completed run in the cache, then evicts stale entries; the entry is first written to a temporary directory, so that
+                     runs sharing the cache never see a partial entry
+        args:        self, output directory of the run
+        returns:     None
+        '''
+        tmpDir = self.entryDir[:-1] + ".tmp" + str(os.getpid()) + os.sep
+        if os.path.exists(tmpDir): shutil.rmtree(tmpDir)
+        os.makedirs(tmpDir)
+        for filename in SUMMARY_FILE: shutil.copyfile(os.path.join(outputDir, filename), tmpDir + filename)
+        with open(tmpDir + PARAMETER_FILE, "w") as parameterFile: json.dump(self.parameter, parameterFile, sort_keys=True, indent=1)
+        try: os.replace(tmpDir, self.entryDir)
+        except OSError: shutil.rmtree(tmpDir)      # entry saved in the meantime by another run with the same key
+        ResultCache.evict(self)
+        # end save
+
+    ''' ################################################################################################################################################################### '''
+    def evict(self):
+        '''
+        description: removes the entries not used for more than maxAge seconds, then the least recently used entries until the cache is no larger than maxSize
+        args:        self
+        returns:     None
+        '''
+        entryList = []      # (time of last use, size, path) of each entry
+        for entry in os.listdir(self.directory):
+            entryDir = os.path.join(self.directory, entry)
+            if not os.path.isdir(entryDir) or ".tmp" in entry: continue
+            try: entryList.append((os.path.getmtime(entryDir), sum(os.path.getsize(os.path.join(entryDir, filename)) for filename in os.listdir(entryDir)), entryDir))
+            except OSError: continue    # evicted in the meantime by another run
+        entryList = sorted(entryList)
+        currentTime = time.time(); totalSize = sum(size for _, size, _ in entryList)
+        for lastUseTime, size, entryDir in entryList:
+            if currentTime - lastUseTime <= self.maxAge and totalSize <= self.maxSize: break
+            shutil.rmtree(entryDir, ignore_errors=True); totalSize -= size
+        # end evict
+# end class ResultCache
+
+''' ____________________________________________________________________ runs restored from the cache _____________________________________________________________________ '''
+def isRestoredFromCache(outputDir):
+    '''
+    description: determines whether the summary files of a run were copied from the cache, in which case the run has no per time slot details (device and network files)
+    args:        output directory of the run
+    returns:     True or False
+    '''
+    return os.path.exists(os.path.join(outputDir, RESTORED_FILE))
+    # end isRestoredFromCache
+
+def clearRestoredMark(outputDir):
+    '''
+    description: removes the mark of a run restored from the cache, when the run is simulated again in the same output directory
+    args:        output directory of the run
+    returns:     None
+    '''
+    if isRestoredFromCache(outputDir): os.remove(os.path.join(outputDir, RESTORED_FILE))
+    # end clearRestoredMark
+
+''' ____________________________________________________________________________ code version _____________________________________________________________________________ '''
+def getCodeVersion():
+    '''
+    description: computes the version of the simulation code as a hash of the content of its python files, so that any change to the code invalidates the cache
+    args:        None
+    returns:     hash of the python files of the simulation (hexadecimal string)
+    '''
+    sourceDir = os.path.dirname(os.path.abspath(__file__))
+    codeHash = hashlib.sha256()
+    for filename in sorted(os.listdir(sourceDir)):
+        if not filename.endswith(".py") or filename in NON_SIMULATION_SOURCE: continue
+        codeHash.update(filename.encode())
+        with open(os.path.join(sourceDir, filename), "rb") as sourceFile: codeHash.update(sourceFile.read())
+    return codeHash.hexdigest()
+    # end getCodeVersion
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+'''
+@description:   Analyzes the outputs of simulation runs in a single pass: the network details (network.csv) and the details of each device (device<ID>.csv) are read from
+                disk once, and the distance to Nash equilibrium, the cumulative gain, the stability and the number of network switches of the run are computed from the same
+                data and saved together as one summary record per run (runAnalysis.csv in the directory of the run, and one row per run in the root directory)
+@assumptions:   the runs are saved in <root directory>/run<index>/ by wns.py (csv or columnar files); columns of the device files are found by their headers, so any algorithm
+                is supported as long as it saves the probability of each network
+'''
+
+''' ______________________________________________________________________ import external libraries ______________________________________________________________________ '''
+import os
+import csv
+import argparse
+from multiprocessing import Pool
+from statistics import median
+import numpy as np
+import pandas
+import global_setting
+import problem_instance
+from computeDistanceToNashEquilibrium import computeDistanceToNashEquilibrium, extractDataFromFile
+from utility_method import saveToCSVfile, isColumnarData, getColumnarChunkList, loadColumnarData, loadColumnarRows
+from result_cache import isRestoredFromCache, RESTORED_FILE
+
+''' ______________________________________________________________________________ constants ______________________________________________________________________________ '''
+RUN_ANALYSIS_FILE = "runAnalysis.csv"       # summary record of a run, saved in the directory of the run; one row per run in the root directory
+TIME_SLOT_HEADER = "timeslot"
+PROBABILITY_HEADER = "probability %d"
+CURRENT_NETWORK_HEADER = "current network"
+DOWNLOAD_HEADER = "download (Mbits)"
+
+''' _______________________________________________________________ read columns of the details of a device _______________________________________________________________ '''
+def getDeviceHeaders(deviceCSVfile):
+    '''
+    description: reads the headers of the details saved for a device, without reading the details themselves
+    args:        CSV file containing run details of a specific device
+    return:      list of headers
+    '''
+    if isColumnarData(deviceCSVfile):
+        with np.load(getColumnarChunkList(deviceCSVfile)[0]) as chunk: return chunk['headers'].tolist()
+    with open(deviceCSVfile, newline='') as myfile: return next(csv.reader(myfile))
+    # end getDeviceHeaders
+
+def loadDeviceColumns(deviceCSVfile, columnIndexList):
+    '''
+    description: reads columns of the details saved for a device in one go, from its csv file or from the columnar (.npz) files saved instead
+    args:        CSV file containing run details of a specific device, indices of the columns to read
+    return:      one array per column, with one entry per time slot
+    '''
+    if isColumnarData(deviceCSVfile): return loadColumnarData(deviceCSVfile, columnIndexList)[2]
+    # numbers are parsed as float() does, so that the results are the same whatever the format of the files
+    frame = pandas.read_csv(deviceCSVfile, header=None, skiprows=1, usecols=columnIndexList, float_precision='round_trip')
+    return [frame[index].to_numpy() for index in columnIndexList]
+    # end loadDeviceColumns
+
+def loadStabilityColumns(deviceCSVfile, numNetwork, numTimeSlot):
+    '''
+    description: reads the columns of the details of a device needed for its stability, network switches and cumulative gain; the columns are found by their headers, as
+                 their positions depend on the algorithm
+    args:        CSV file containing run details of a specific device, number of networks, number of time slots (later time slots are ignored)
+    return:      time slot, probability of each network (time slot x network), network selected and download, per time slot
+    '''
+    headers = getDeviceHeaders(deviceCSVfile)
+    columnIndexList = [headers.index(header) for header in [TIME_SLOT_HEADER] + [PROBABILITY_HEADER % (networkID) for networkID in range(1, numNetwork + 1)] +
+                       [CURRENT_NETWORK_HEADER, DOWNLOAD_HEADER]]
+    columnList = [column[:numTimeSlot] for column in loadDeviceColumns(deviceCSVfile, columnIndexList)]
+    return columnList[0], np.column_stack(columnList[1:1 + numNetwork]).astype(float), columnList[-2].astype(int), columnList[-1]
+    # end loadStabilityColumns
+
+''' __________________________________________________________________ check that a run can be analyzed ___________________________________________________________________ '''
+def checkRunDir(runDir):
+    '''
+    description: makes sure the per time slot details of a run were saved, which is not the case of a run restored from the result cache (only its summary files are)
+    args:        directory of the run
+    return:      None; raises an IOError if the run cannot be analyzed
+    '''
+    if isRestoredFromCache(runDir):
+        raise IOError("%s was restored from the result cache (see %s): only its summary files are available, not the per time slot details needed for the analysis; "
+                      "simulate the run again without -cache to analyze it" % (runDir, RESTORED_FILE))
+    # end checkRunDir
+
+''' _____________________________________________________________ stability and network switches of a device ______________________________________________________________ '''
+def computeStabilityStatus(timeSlot, probability, network, stableProbability, numTimeSlot, consecutiveStableSlot):
+    '''
+    description: determines when a device stabilized and to which network, and how many times it switched network; the device is stable from the time slot following the
+                 last one at which no network has a probability of at least stableProbability, and it stabilized when it last changed its preferred network (network of
+                 highest probability) since then
+    args:        time slot, probability of each network (time slot x network) and network selected, per time slot; minimum probability of a network for the algorithm to
+                 be considered stable, number of time slots, minimum number of consecutive time slots the device must be favoring a particular network at the end of the run
+                 for it to be considered stable at that network
+    return:      time slot at which the device made its decision to stick to a particular network, the network it selects with sufficiently high probability till the end of
+                 execution (both -1 if the device did not stabilize), the number of times the device switched network
+    '''
+    stabilizationTimeSlot = -1; preferredNetworkID = -1
+
+    maxProbability = probability.max(axis=1); preferredNetwork = probability.argmax(axis=1) + 1
+    unstableIndex = np.flatnonzero(maxProbability < stableProbability)
+    firstStableIndex = unstableIndex[-1] + 1 if len(unstableIndex) > 0 else 0
+    if firstStableIndex < len(maxProbability):
+        changeIndex = np.flatnonzero(preferredNetwork[firstStableIndex + 1:] != preferredNetwork[firstStableIndex:-1])
+        stabilizationIndex = firstStableIndex + (changeIndex[-1] + 1 if len(changeIndex) > 0 else 0)
+        stabilizationTimeSlot = int(timeSlot[stabilizationIndex]); preferredNetworkID = int(preferredNetwork[-1])
+
+    # if we don't see it stay in a state for at least 'consecutiveStableSlot' time slots, we cannot be sure if the algorithm has stabilized
+    if stabilizationTimeSlot > numTimeSlot - consecutiveStableSlot: stabilizationTimeSlot = -1; preferredNetworkID = -1
+
+    numNetworkSwitch = int(np.count_nonzero(network[1:] != network[:-1]))
+    return stabilizationTimeSlot, preferredNetworkID, numNetworkSwitch
+    # end computeStabilityStatus
+
+def getNumDeviceSwitchNetwork(stableState, NEstateList):
+    '''
+    description: computes and returns the number of devices that should switch network from the algorithm to transit from its stable state to a Nash equilibrium state
+                 (if there are multiple Nash equilibrium states, it considers the one requiring the minimum number of switches)
+    args:        the stable state of the algorithm, the list Nash equilibrium states for the setting considered
+    return:      number of devices who need to switch network
+    '''
+    if stableState in NEstateList: return 0
+    numDeviceSWitchNetworkPerNEState = []   # considers the number of moves to reach each NE state; will then take the minimum move
+    for NEstate in NEstateList:
+        numDeviceSwitch = [x - y for x, y in zip(stableState, NEstate)]
+        count = sum([x for x in numDeviceSwitch if x > 0])
+        numDeviceSWitchNetworkPerNEState.append(count)
+    return min(numDeviceSWitchNetworkPerNEState)
+    # end getNumDeviceSwitchNetwork
+
+def sumInOrder(values):
+    '''
+    description: sums an array from its first to its last element, as a loop adding one value per time slot does (numpy sums in pairs otherwise), so that the cumulative
+                 gain is the same as the one computed by wns.py
+    args:        array of values
+    return:      sum of the values
+    '''
+    return float(np.cumsum(values)[-1]) if len(values) > 0 else 0
+    # end sumInOrder
+
+''' ___________________________________________________________________________ analyze one run ___________________________________________________________________________ '''
+def analyzeRun(runDir, problemInstance, numDevice, numTimeSlot, numRepeat, stableProbability, consecutiveStableSlot, distanceEngine="array"):
+    '''
+    description: reads the network details and the details of each device of a run once, computes all the metrics of the run and saves them as its summary record
+    args:        directory of the run, name of the problem instance, number of devices, number of time slots, number of times the setting is repeated over the time horizon,
+                 minimum probability of a network for a device to be considered stable, minimum number of consecutive time slots a device must be favoring a network at
+                 the end of the run to be considered stable, implementation of the distance to Nash equilibrium ("graph" or "array")
+    return:      list of headers and summary record of the run (list of values)
+    '''
+    checkRunDir(runDir)
+    numTimeSlotPerRepetition = numTimeSlot // numRepeat
+
+    # distance to Nash equilibrium, from the network details
+    if isColumnarData(runDir + "network.csv"): networkData = loadColumnarRows(runDir + "network.csv")
+    else: networkData = extractDataFromFile(runDir + "network.csv")
+    numNetwork = (len(networkData[0]) - 2 - numDevice) // 3     # data rate, technology and number of devices per network, then the network of each device
+    distanceToNE = computeDistanceToNashEquilibrium(problemInstance, numTimeSlot, networkData[:numTimeSlot], numDevice, distanceEngine)
+    meanDistancePerRepetition = [sum(distanceToNE[repetition * numTimeSlotPerRepetition:(repetition + 1) * numTimeSlotPerRepetition]) / numTimeSlotPerRepetition for repetition in range(numRepeat)]
+    medianDistancePerRepetition = [median(distanceToNE[repetition * numTimeSlotPerRepetition:(repetition + 1) * numTimeSlotPerRepetition]) for repetition in range(numRepeat)]
+
+    # cumulative gain, stability and network switches, from the details of each device
+    cumulativeGainPerDevice = []; stabilizationTimeSlotPerDevice = []; preferredNetworkPerDevice = []; numNetworkSwitchPerDevice = []
+    for deviceID in range(1, numDevice + 1):
+        timeSlot, probability, network, download = loadStabilityColumns(runDir + "device" + str(deviceID) + ".csv", numNetwork, numTimeSlot)
+
+        cumulativeGainPerDevice.append(sumInOrder(download))
+        stabilizationTimeSlot, preferredNetwork, numNetworkSwitch = computeStabilityStatus(timeSlot, probability, network, stableProbability, numTimeSlot, consecutiveStableSlot)
+        stabilizationTimeSlotPerDevice.append(stabilizationTimeSlot); preferredNetworkPerDevice.append(preferredNetwork); numNetworkSwitchPerDevice.append(numNetworkSwitch)
+
+    # the run is stable if all devices are; its stable state is then the number of devices that favor each network
+    stableState = [-1] * numNetwork; stabilizationTimeSlot = -1
+    if -1 not in stabilizationTimeSlotPerDevice:
+        stabilizationTimeSlot = max(stabilizationTimeSlotPerDevice)
+        stableState = [preferredNetworkPerDevice.count(networkID) for networkID in range(1, numNetwork + 1)]
+    numDeviceSwitchNetworkForNE = getNumDeviceSwitchNetwork(stableState, problem_instance.getNashEquilibriumState(problemInstance, numTimeSlot))
+
+    headers = ["run", "median_cumulative_gain", "std_cumulative_gain"] + ["mean_distance_rep" + str(x) for x in range(1, numRepeat + 1)] + \
+              ["median_distance_rep" + str(x) for x in range(1, numRepeat + 1)] + ["stabilization_time_slot", "stable_state", "num_device_to_switch_for_NE",
+              "mean_network_switch", "median_network_switch", "cumulative_gain_per_device", "stabilization_time_slot_per_device", "network_switch_per_device"]
+    record = [networkData[0][0], median(cumulativeGainPerDevice), np.std(cumulativeGainPerDevice, ddof=1)] + meanDistancePerRepetition + medianDistancePerRepetition + \
+             [stabilizationTimeSlot, str(stableState), numDeviceSwitchNetworkForNE, sum(numNetworkSwitchPerDevice) / numDevice, median(numNetworkSwitchPerDevice),
+              str(cumulativeGainPerDevice), str(stabilizationTimeSlotPerDevice), str(numNetworkSwitchPerDevice)]
+    saveToCSVfile(runDir + RUN_ANALYSIS_FILE, [headers, record], "w")
+    return headers, record
+    # end analyzeRun
+
+''' ________________________________________________________________________________ main _________________________________________________________________________________ '''
+def main():
+    parser = argparse.ArgumentParser(description='Analyzes simulation runs in a single pass over their outputs and saves a summary record per run.')
+    parser.add_argument('-d', dest="root_dir", required=True, help='root directory where data of all runs are stored (in run1/, run2/, ...)')
+    parser.add_argument('-r', dest="num_run", required=True, type=int, help='number of simulation runs')
+    parser.add_argument('-n', dest="num_device", required=True, type=int, help='number of active devices in the service area')
+    parser.add_argument('-t', dest="num_time_slot", required=True, type=int, help='number of time slots in each simulation run')
+    parser.add_argument('-rep', dest="num_repeat", required=True, type=int, help='number of times the setting is repeated over the time horizon')
+    parser.add_argument('-p', dest="problem_instance", required=True, help='the problem instance (setting) simulated')
+    parser.add_argument('-sp', dest="stable_probability", required=True, type=float, help='probability at which the algorithm is considered stable')
+    parser.add_argument('-c', dest="consecutive_stable_slot", required=True, type=int, help='minimum number of consecutive slots the algorithm must stay in the same state till the end of the run to be considered stable')
+    parser.add_argument('-distance', dest='distance_engine', default='array', choices=['graph', 'array'], help='implementation of the distance to Nash equilibrium')
+    parser.add_argument('-j', dest='num_worker', default=os.cpu_count(), type=int, help='maximum number of runs analyzed at the same time')
+    args = parser.parse_args()
+
+    global_setting.constants.update({'num_mobile_device': args.num_device, 'num_time_slot': args.num_time_slot, 'num_repeat': args.num_repeat})
+    problem_instance.initialize()
+
+    # runs are analyzed in parallel, and their records gathered in order of run index
+    with Pool(processes=min(args.num_worker, args.num_run)) as pool:
+        resultPerRun = pool.starmap(analyzeRun, [(os.path.join(args.root_dir, "run" + str(runIndex)) + os.sep, args.problem_instance, args.num_device, args.num_time_slot,
+                                                  args.num_repeat, args.stable_probability, args.consecutive_stable_slot, args.distance_engine) for runIndex in range(1, args.num_run + 1)])
+    saveToCSVfile(os.path.join(args.root_dir, RUN_ANALYSIS_FILE), [resultPerRun[0][0]] + [record for headers, record in resultPerRun], "w")
+    print("----- %d runs analyzed; summary saved to %s -----" % (args.num_run, os.path.join(args.root_dir, RUN_ANALYSIS_FILE)))
+    # end main
+
+if __name__ == "__main__": main()
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
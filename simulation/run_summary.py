@@ -0,0 +1,55 @@
+'''
+@description:   Defines a class that gathers the summary statistics of a simulation run (download per device per repetition, distance to Nash equilibrium per time slot)
+                while the run progresses, so that the per time slot details of devices and networks do not have to be kept in memory until the end of the run
+'''
+
+''' ______________________________________________________________________ import external libraries ______________________________________________________________________ '''
+import numpy as np
+from computeDistanceToNashEquilibrium import NashEquilibriumDistance, NashEquilibriumDistanceArray
+
+''' _____________________________________________________________________ RunSummary class definition _____________________________________________________________________ '''
+class RunSummary(object):
+    def __init__(self, problemInstance, numMobileDevice, numTimeSlot, numRepeat, distanceEngine="graph"):
+        self.numTimeSlotPerRepetition = numTimeSlot // numRepeat
+        self.cumulativeDownloadPerRepetition = np.zeros((numRepeat, numMobileDevice))     # (repetitions x devices), in Mbits
+        self.cumulativeDownload = np.zeros(numMobileDevice)                                 # over the whole run, in Mbits
+        self.distanceToNE = []                                                              # distance to Nash equilibrium per time slot
+        if distanceEngine == "array": self.nashEquilibriumDistance = NashEquilibriumDistanceArray(problemInstance, numMobileDevice)
+        else: self.nashEquilibriumDistance = NashEquilibriumDistance(problemInstance, numMobileDevice)
+        # end __init__
+
+    ''' ################################################################################################################################################################### '''
+    def addDownload(self, timeSlot, deviceID, download):
+        '''
+        description: adds the download of a device during a time slot to its cumulative download for the current repetition
+        args:        self, the current time slot, ID of the mobile device, download of the device during the time slot (in Mbits)
+        return:      None
+        '''
+        self.cumulativeDownload[deviceID - 1] += download
+        repetitionIndex = (timeSlot - 1) // self.numTimeSlotPerRepetition
+        if repetitionIndex < self.cumulativeDownloadPerRepetition.shape[0]: self.cumulativeDownloadPerRepetition[repetitionIndex, deviceID - 1] += download
+        # end addDownload
+
+    ''' ################################################################################################################################################################### '''
+    def addDownloadPerDevice(self, timeSlot, downloadPerDevice):
+        '''
+        description: same as addDownload, for all devices at once (devices ordered by ID)
+        args:        self, the current time slot, array of the download of each device during the time slot (in Mbits)
+        return:      None
+        '''
+        self.cumulativeDownload += downloadPerDevice
+        repetitionIndex = (timeSlot - 1) // self.numTimeSlotPerRepetition
+        if repetitionIndex < self.cumulativeDownloadPerRepetition.shape[0]: self.cumulativeDownloadPerRepetition[repetitionIndex] += downloadPerDevice
+        # end addDownloadPerDevice
+
+    ''' ################################################################################################################################################################### '''
+    def addNetworkDetail(self, networkData):
+        '''
+        description: computes the distance to Nash equilibrium for a time slot; time slots must be added in order
+        args:        self, details about the network for the time slot (a row of network.csv)
+        return:      None
+        '''
+        self.distanceToNE.append(self.nashEquilibriumDistance.computeDistance(networkData))
+        # end addNetworkDetail
+# end class RunSummary
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
@@ -1,10 +1,12 @@
 '''
 @description: extracts details about stability and number of network switches
 '''
-import csv
+import os
 import argparse
+from multiprocessing import Pool
 from numpy import median
 from utility_method import saveToTxt, saveToCSV
+from run_analysis import loadStabilityColumns, computeStabilityStatus, getNumDeviceSwitchNetwork, sumInOrder, checkRunDir
 
 parser = argparse.ArgumentParser(description='Exctracts details regarding stability of the algorithm.')
 parser.add_argument('-d', dest="root_dir", required=True, help='root directory where data of all runs are stored')
@@ -15,6 +17,7 @@ parser.add_argument('-k', dest="num_network", required=True, help='number of wir
 parser.add_argument('-p', dest="stable_probability", required=True, help='probability at which the algorithm is considered stable')
 parser.add_argument('-c', dest="consecutive_stable_slot", required=True, help='minimum number of consecutive slots the algorithm must stay in the same state till the end of the run to be considered stable')
 parser.add_argument('-ne', dest='nash_equilibrium_state_list', required=True, help='list of Nash equilibrium states for the setting')
+parser.add_argument('-j', dest='num_worker', default=os.cpu_count(), type=int, help='maximum number of runs processed at the same time')
 
 args = parser.parse_args()
 rootDir = args.root_dir
@@ -24,6 +27,7 @@ numDevice = int(args.num_device)
 numNetwork = int(args.num_network)
 stableProbability = float(args.stable_probability)
 consecutiveStableSlot = int(args.consecutive_stable_slot)
+numWorker = args.num_worker
 NEstate = args.nash_equilibrium_state_list.split(";"); NEstateList = []
 for state in NEstate: state = state.split("_"); state = [int(x) for x in state]; NEstateList.append(state)
 
@@ -37,70 +41,26 @@ def extractStabilityStatus(deviceCSVfile, numNetwork, stableProbability, numTime
     return:      time slot at which the device made its decision to stick to a particular network, the network it selects with sufficiently high probability till the end of
                  execution, the number of times the device switched network, cumulative gain of each device
     '''
-    stabilizationTimeSlot = -1
-    preferredNetworkID = -1
-    prevNetwork = -1; numNetworkSwitch = 0; cumulativeGain = 0
-    # consecutiveStableSlot = 0  # must stay in that state for at least that number of slots at the end to be sure the algorithm stabilized...
-
-    with open(deviceCSVfile, newline='') as deviceCSVfile:
-        fileReader = csv.reader(deviceCSVfile)
-        count = 0
-        for row in fileReader:
-            if count != 0:
-                # stability
-                probability = row[2 + numNetwork:2 + 2*numNetwork]; probability = [float(x) for x in probability]
-                maxProbability = max(probability)
-                currentPrefferedNetworkID = probability.index(maxProbability) + 1
-                if maxProbability < stableProbability and stabilizationTimeSlot != -1:
-                    stabilizationTimeSlot = -1; preferredNetworkID = -1
-                elif maxProbability >= stableProbability and (stabilizationTimeSlot == -1 or preferredNetworkID != currentPrefferedNetworkID):
-                    stabilizationTimeSlot = int(row[1]); preferredNetworkID = currentPrefferedNetworkID
-
-                # network switch
-                currentNetwork = int(row[2 + 2 * numNetwork])
-                if prevNetwork != -1 and prevNetwork != currentNetwork: numNetworkSwitch += 1
-                prevNetwork = currentNetwork
-
-                # cumulative gain
-                gain = float(row[4 + 2 * numNetwork])
-                cumulativeGain += gain
-            count += 1
-    deviceCSVfile.close()
-
-    # if we don't see it stay in a state for at least 'consecutiveStableSlot' time slots, we cannot be sure if the algorithm has stabilized
-    if stabilizationTimeSlot > numTimeSlot - consecutiveStableSlot: stabilizationTimeSlot = -1; preferredNetworkID = -1
+    timeSlot, probability, network, gain = loadStabilityColumns(deviceCSVfile, numNetwork, numTimeSlot)     # same columns as run_analysis.py, found by their headers
+
+    stabilizationTimeSlot, preferredNetworkID, numNetworkSwitch = computeStabilityStatus(timeSlot, probability, network, stableProbability, numTimeSlot, consecutiveStableSlot)
+    cumulativeGain = sumInOrder(gain)
 
     return stabilizationTimeSlot, preferredNetworkID, numNetworkSwitch, cumulativeGain
     # end extractStabilityStatus
 
-''' __________________ determines number of devices that must switch network for the algorithm to transition from its stable state to Nash equilibrium  __________________ '''
-def getNumDeviceSwitchNetwork(stableState, NEstateList):
-    '''
-    description: computes and returns the number of devices that should switch network from the algorithm to transit from its stable state to a Nash equilibrium state
-                 (if there are multiple Nash equilibrium states, it considers the one requiring the minimum number of switches)
-    args:        the stable state of the algorithm, the list Nash equilibrium states for the setting considered
-    return:      number of devices who need to switch network
-    '''
-    if stableState in NEstateList: return 0
-    numDeviceSWitchNetworkPerNEState = []   # considers the number of moves to reach each NE state; will then take the minimum move
-    for NEstate in NEstateList:
-        numDeviceSwitch = [x - y for x, y in zip(stableState, NEstate)]
-        count = sum([x for x in numDeviceSwitch if x > 0])
-        numDeviceSWitchNetworkPerNEState.append(count)
-    return min(numDeviceSWitchNetworkPerNEState)
-    # end getNumDeviceSwitchNetwork
-
 ''' ______________________________________________________________________ check if a run is stable ______________________________________________________________________ '''
-def isStable(rootDir, numNetwork, stableProbability, numTimeSlot, consecutiveStableSlot, NEstateList):
+def isStable(rootDir, numDevice, numNetwork, stableProbability, numTimeSlot, consecutiveStableSlot, NEstateList):
     '''
     description: determines (1) whether the run stabilized, (2) if it stabilizes, to which state, (3) time slot at which the algorithm stabilized, (4) the number of devices
                  that should switch network for the algorithm to get from its stable state to Nash equilibrium (this value is zero if the stable state is Nash equilibrium)
                  and (5) number of network switches made by each device
-    args:        root directory where the files for each device are stored for a particular run, number of networks, minimum probability of a network for the algorithm to be
+    args:        root directory where the files for each device are stored for a particular run, number of devices, number of networks, minimum probability of a network for the algorithm to be
                  considered stable, number of time slots, minimum number of consecutive time slots the device must be favoring a particular network at the end of the run for
                  it to be considered stable at that network, list of Nash equilibrium states
     return:      the time slot at which the algorithm stabilized, its stable state and a list of the number of network switches of each device
     '''
+    checkRunDir(rootDir)
     stabilizationTimeSlotPerDevice = []; preferredNetworkPerDevice = []; stableState = [-1] * numNetwork; numNetworkSwitchPerDevice = []; cumulativeGainPerDevice = []
 
     for deviceID in range(1, numDevice + 1):
@@ -126,7 +86,7 @@ def isStable(rootDir, numNetwork, stableProbability, numTimeSlot, consecutiveSta
 
 ''' ____________________________________________________________________________ main program ____________________________________________________________________________ '''
 def main():
-    global rootDir, numRun, numTimeSlot, numDevice, numNetwork, stableProbability, consecutiveStableSlot, NEstateList
+    global rootDir, numRun, numTimeSlot, numDevice, numNetwork, stableProbability, consecutiveStableSlot, NEstateList, numWorker
 
     stabilizationTimeSlotPerRun = []
     stableStatePerRun = []
@@ -134,9 +94,11 @@ def main():
     cumulativeGainPerDevicePerRun = []
     numDeviceSwitchNetworkForNEPerRun = []
 
-    for runIndex in range(1, numRun + 1):
-        stabilizationTimeSlot, stableState, numNetworkSwitchPerDevice, cumulativeGainPerDevice, numDeviceSwitchNetworkForNE = \
-            isStable(rootDir + "run" + str(runIndex) + "/", numNetwork, stableProbability, numTimeSlot, consecutiveStableSlot, NEstateList)
+    # runs are processed in parallel, and their results gathered in order of run index
+    with Pool(processes=min(numWorker, numRun)) as pool:
+        resultPerRun = pool.starmap(isStable, [(rootDir + "run" + str(runIndex) + "/", numDevice, numNetwork, stableProbability, numTimeSlot, consecutiveStableSlot, NEstateList)
+                                               for runIndex in range(1, numRun + 1)])
+    for stabilizationTimeSlot, stableState, numNetworkSwitchPerDevice, cumulativeGainPerDevice, numDeviceSwitchNetworkForNE in resultPerRun:
         stabilizationTimeSlotPerRun.append(stabilizationTimeSlot); stableStatePerRun.append(stableState)
         numNetworkSwitchPerDevicePerRun += numNetworkSwitchPerDevice
         numDeviceSwitchNetworkForNEPerRun.append(numDeviceSwitchNetworkForNE)
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+'''
+@description:   Runs a grid of simulation runs (runs x algorithms x problem instances x parameters) of wns.py on a pool of worker processes, and collects the summary of
+                each run into one aggregate table.
+@assumptions:   each simulation run is an independent execution of wns.py in its own output directory; all runs get the same base seed, and wns.py derives the random
+                streams of each device from (seed, run index, device ID), so a run gives the same results whatever the rest of the grid, and runs of the same index share
+                their random streams across algorithms and parameters.
+'''
+
+import argparse
+import os
+import sys
+import csv
+import subprocess
+import time
+from itertools import product
+from multiprocessing import Pool
+from utility_method import getTimeTaken, saveToCSVfile
+
+''' ______________________________________________________________________________ constants ______________________________________________________________________________ '''
+# set from values passed as arguments when the program is executed
+parser = argparse.ArgumentParser(description='Runs a grid of wireless network selection simulations in parallel and aggregates their results.')
+parser.add_argument('-n', dest="num_device", required=True, help='number of active devices in the service area')
+parser.add_argument('-t', dest="num_time_slot", required=True, help='number of time slots in each simulation run')
+parser.add_argument('-runs', dest="num_run", required=True, type=int, help='number of runs per combination of algorithm, problem instance and parameters')
+parser.add_argument('-a', dest="algorithm_name", required=True, nargs='+', help='names of selection algorithms used by the devices')
+parser.add_argument('-p', dest="problem_instance", required=True, nargs='+', help='the problem instances (settings) considered')
+parser.add_argument('-dir', dest="directory", required=True, help='root directory in which the output of each run is saved')
+parser.add_argument('-st', dest="num_sub_time_slot", default=['1'], nargs='+', help='numbers of sub-time slots in one time slot')
+parser.add_argument('-l', dest="learning_rate", default=['0.1'], nargs='+', help='learning rates')
+parser.add_argument('-pt', dest="transmit_probability", default=['0.1'], nargs='+', help='probabilities with which to transmit')
+parser.add_argument('-pl', dest="listen_probability", default=['0.1'], nargs='+', help='probabilities with which to listen')
+parser.add_argument('-period', dest='period_option', default=['5'], nargs='+', help='periods considered - partition functions to be used')
+parser.add_argument('-d', dest="delay", default='0', help='maximum delayed feedback considered')
+parser.add_argument('-max', dest="max_time_unheard_acceptable", default='10', help='maximum time a network can be unheard of')
+parser.add_argument('-f', dest="save_to_file_frequency", default='100', help='frequency of saving to file')
+parser.add_argument('-sd', dest="time_slot_duration", default='15', help='duration of a time slot (in seconds)')
+parser.add_argument('-rep', dest="num_repeat", default='1', help='number of times the setting is repeated over the time horizon')
+parser.add_argument('-opt', dest="optimization", default='true', help='whether the optimized version of the chosen algorithm must be used')
+parser.add_argument('-roll', dest='rolling_average_window', default='10', help='rolling average window size for distance to Nash equilibrium')
+parser.add_argument('-engine', dest='engine', default='process', choices=['process', 'population'], help='simulation engine used by wns.py')
+parser.add_argument('-seed', dest='seed', default=0, type=int, help='base seed of the runs (the random streams of each run are derived from it and the run index)')
+parser.add_argument('-cache', dest='use_cache', default='false', help='whether runs already completed with the same parameters and code are skipped (result cache in the root directory); skipped runs only get their summary files, not the per time slot details needed by run_analysis.py and stability.py')
+parser.add_argument('-cache_max_age', dest='cache_max_age', default='30', help='entries of the result cache not used for that many days are evicted')
+parser.add_argument('-cache_max_size', dest='cache_max_size', default='1024', help='maximum size of the result cache (in MB)')
+parser.add_argument('-j', dest='num_worker', default=os.cpu_count(), type=int, help='maximum number of simulation runs executed at the same time')
+
+WNS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wns.py")
+AGGREGATE_FILE = "sweep_summary.csv"
+CACHE_DIR = "result_cache"                  # in the root directory, shared by all the runs of the grid (see result_cache.py)
+PARAMETER_NAME = ["run", "algorithm", "problem_instance", "learning_rate", "num_sub_time_slot", "p_t", "p_l", "period_option", "seed"]
+
+''' _______________________________________________________________________ build and run the grid ________________________________________________________________________ '''
+def buildTaskList(args):
+    '''
+    description: enumerates the simulation runs of the grid and assigns each of them an output directory
+    args:        the parsed command line arguments
+    return:      list of tasks, each a dictionary with the parameters of the run, its output directory and the command to execute
+    '''
+    taskList = []
+    grid = product(args.problem_instance, args.algorithm_name, args.learning_rate, args.num_sub_time_slot, args.transmit_probability, args.listen_probability,
+                   args.period_option, range(1, args.num_run + 1))
+    for problemInstance, algorithmName, learningRate, numSubTimeSlot, transmitProbability, listenProbability, periodOption, run in grid:
+        seed = args.seed      # not derived from the position of the run in the grid, which changes when the grid does
+        outputDir = os.path.join(os.path.abspath(args.directory), problemInstance, algorithmName, "l%s_st%s_pt%s_pl%s_period%s" % (learningRate, numSubTimeSlot, transmitProbability,
+                                 listenProbability, periodOption), "run" + str(run)) + os.sep
+        command = [sys.executable, WNS_SCRIPT, '-n', args.num_device, '-t', args.num_time_slot, '-r', str(run), '-a', algorithmName, '-dir', outputDir, '-st', numSubTimeSlot,
+                   '-d', args.delay, '-l', learningRate, '-pt', transmitProbability, '-pl', listenProbability, '-max', args.max_time_unheard_acceptable,
+                   '-f', args.save_to_file_frequency, '-sd', args.time_slot_duration, '-p', problemInstance, '-rep', args.num_repeat, '-opt', args.optimization,
+                   '-period', periodOption, '-roll', args.rolling_average_window, '-engine', args.engine, '-seed', str(seed)]
+        if args.use_cache.lower() == 'true': command += ['-cache', os.path.join(os.path.abspath(args.directory), CACHE_DIR), '-cache_max_age', args.cache_max_age,
+                                                         '-cache_max_size', args.cache_max_size]
+        taskList.append({'parameter': [run, algorithmName, problemInstance, learningRate, numSubTimeSlot, transmitProbability, listenProbability, periodOption, seed],
+                         'output_dir': outputDir, 'command': command})
+    return taskList
+    # end buildTaskList
+
+def runTask(task):
+    '''
+    description: executes one simulation run; the output of wns.py is saved to a log file in the output directory of the run
+    args:        the task to execute
+    return:      the task, the exit status of wns.py and the time taken (in seconds)
+    '''
+    if not os.path.exists(task['output_dir']): os.makedirs(task['output_dir'])
+    startTime = time.time()
+    with open(task['output_dir'] + "wns.log", "w") as logFile:
+        returnCode = subprocess.call(task['command'], stdout=logFile, stderr=subprocess.STDOUT, cwd=os.path.dirname(WNS_SCRIPT))
+    return task, returnCode, time.time() - startTime
+    # end runTask
+
+''' _____________________________________________________________________ collect results of the runs _____________________________________________________________________ '''
+def readCSVfile(inputCSVfile):
+    '''
+    description: reads a csv file saved with saveToCSVfile (non-numeric values are quoted)
+    args:        path of the csv file
+    return:      list of rows, with numeric values converted to float
+    '''
+    with open(inputCSVfile, newline='') as myfile: return [row for row in csv.reader(myfile, quoting=csv.QUOTE_NONNUMERIC)]
+    # end readCSVfile
+
+def getRunSummary(outputDir, numRepeat):
+    '''
+    description: extracts the summary of a completed simulation run from the csv files saved by wns.py
+    args:        output directory of the run, number of times the setting is repeated over the time horizon
+    return:      median and standard deviation of cumulative gain per device, followed by the mean and median distance to Nash equilibrium per repetition
+    '''
+    summary = [row[1] for row in readCSVfile(outputDir + "cumulativeGainPerDevice_median_std.csv")]
+    summary += [row[1] for row in readCSVfile(outputDir + "meanDistanceToNashEquilibriumPerRepetition.csv")[1:numRepeat + 1]]
+    summary += [row[1] for row in readCSVfile(outputDir + "medianDistanceToNashEquilibriumPerRepetition.csv")[1:numRepeat + 1]]
+    return summary
+    # end getRunSummary
+
+''' ________________________________________________________________________________ main _________________________________________________________________________________ '''
+def main():
+    args = parser.parse_args()
+    numRepeat = int(args.num_repeat)
+    if not os.path.exists(args.directory): os.makedirs(args.directory)
+
+    taskList = buildTaskList(args)
+    print("going to execute %d simulation runs using %d worker processes..." % (len(taskList), args.num_worker))
+
+    startTime = time.time(); summaryList = []; failedTaskList = []
+    with Pool(processes=args.num_worker) as pool:
+        for numCompleted, (task, returnCode, duration) in enumerate(pool.imap_unordered(runTask, taskList), 1):
+            if returnCode == 0: summaryList.append(task['parameter'] + getRunSummary(task['output_dir'], numRepeat))
+            else: failedTaskList.append(task)
+            print("[%d/%d] %s %s run %s %s in %.1f seconds" % (numCompleted, len(taskList), task['parameter'][2], task['parameter'][1], task['parameter'][0],
+                                                               "completed" if returnCode == 0 else "FAILED (see " + task['output_dir'] + "wns.log)", duration))
+
+    # one row per completed run, sorted by the order of the grid
+    headers = PARAMETER_NAME + ["median_cumulative_gain", "std_cumulative_gain"] + ["mean_distance_rep" + str(x) for x in range(1, numRepeat + 1)] + \
+              ["median_distance_rep" + str(x) for x in range(1, numRepeat + 1)]
+    taskOrder = {tuple(task['parameter']): taskIndex for taskIndex, task in enumerate(taskList)}
+    summaryList = sorted(summaryList, key=lambda summary: taskOrder[tuple(summary[:len(PARAMETER_NAME)])])
+    saveToCSVfile(os.path.join(args.directory, AGGREGATE_FILE), [headers] + summaryList, "w")
+
+    timeTaken, unit = getTimeTaken(startTime, time.time())
+    print("----- %d runs completed, %d failed, in %s %s; summary saved to %s -----" % (len(summaryList), len(failedTaskList), timeTaken, unit,
+                                                                                     os.path.join(args.directory, AGGREGATE_FILE)))
+    # end main
+
+if __name__ == "__main__":
+    main()
+
+''' _____________________________________________________________________________ end of file _____________________________________________________________________________ '''
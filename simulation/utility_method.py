@@ -3,24 +3,350 @@
 '''
 
 import csv
-from itertools import permutations, product
+import os
+from glob import glob, escape
+from itertools import permutations, product, combinations, accumulate
+from bisect import bisect_right
+from fractions import Fraction
+from math import ceil, floor
 import numpy as np
+from scipy.special import logsumexp
 
 ''' ___________________________________________________ class definition - save device and network details to CSV file ___________________________________________________ '''
 class CSVdata():
-    def __init__(self, filepath, headers):
+    def __init__(self, filepath, headers, stream=False):
         self.filepath = filepath
         self.headers = headers
         self.rows = []
+        self.stream = stream        # if True, rows are dropped once saved to file and only the rows not saved yet are kept in memory
+        self.numRowSaved = 0
 
     def addRow(self, row):
         self.rows.append(tuple(row))
 
     def saveToFile(self, numRows):
-        if len(self.rows) == numRows: saveToCSVfile(self.filepath, [self.headers] + self.rows, "w")
+        if self.stream:
+            saveToCSVfile(self.filepath, ([self.headers] if self.numRowSaved == 0 else []) + self.rows, "w" if self.numRowSaved == 0 else "a")
+            self.numRowSaved += len(self.rows); self.rows = []
+        elif len(self.rows) == numRows: saveToCSVfile(self.filepath, [self.headers] + self.rows, "w")
         else: saveToCSVfile(self.filepath, self.rows[len(self.rows) - numRows:], "a")
+
+    def getColumn(self, index):
+        return [row[index] for row in self.rows]
+
+    def getRows(self):
+        return self.rows
+
+    def getFileOffset(self):
+        ''' size of the file saved so far (see checkpoint.py) '''
+        return os.path.getsize(self.filepath) if os.path.exists(self.filepath) else 0
+
+    def truncateFile(self, offset):
+        ''' removes what was saved to file after getFileOffset returned offset (see checkpoint.py) '''
+        if os.path.exists(self.filepath):
+            with open(self.filepath, "r+") as csvFile: csvFile.truncate(offset)
 # end CSVdata class
 
+''' ____________________________________________ class definition - save device and network details to columnar (.npz) files _____________________________________________ '''
+class ColumnarData():
+    ''' same interface as CSVdata; each column is kept in a preallocated typed array of chunkSize rows and every chunk is saved to its own .npz file, e.g. device1.csv is
+        saved as device1.00000.npz, device1.00001.npz, ... (read back with loadColumnarData) '''
+    def __init__(self, filepath, headers, chunkSize):
+        self.filepath = filepath
+        self.headers = headers
+        self.chunkSize = chunkSize
+        self.columnType = None      # per column: 'int', 'float', 'str', 'list' (nested list of numbers of fixed shape) or 'set' (set of small non-negative integers, e.g. device IDs)
+        self.columns = None         # allocated when the first row is added, as the types of the columns are only known then
+        self.isInteger = None       # numbers are stored as float; columns that only ever held integers are saved as int
+        self.numRow = 0             # number of rows in the current chunk
+        self.numChunk = 0           # number of chunks saved so far
+        for chunkFile in getColumnarChunkList(filepath): os.remove(chunkFile)     # the data of a previous run is overwritten, as with CSVdata
+
+    def addRow(self, row):
+        if self.columns == None: ColumnarData.allocateColumn(self, row)
+        if self.numRow == self.chunkSize: ColumnarData.saveToFile(self, self.chunkSize)
+        for index, value in enumerate(row):
+            columnType = self.columnType[index]
+            if columnType == 'set':
+                if len(value) > 0 and max(value) >= self.columns[index].shape[1]:   # widen the membership matrix to fit larger IDs
+                    self.columns[index] = np.pad(self.columns[index], ((0, 0), (0, max(value) + 1 - self.columns[index].shape[1])), 'constant')
+                self.columns[index][self.numRow, list(value)] = True
+            elif columnType == 'str': self.columns[index][self.numRow] = "" if value == None else str(value)
+            else:
+                self.columns[index][self.numRow] = value
+                if self.isInteger[index] and not isinstance(value, (int, np.integer)) and not np.all(np.equal(np.mod(value, 1), 0)): self.isInteger[index] = False
+        self.numRow += 1
+
+    def allocateColumn(self, row):
+        self.columnType = []; self.columns = []; self.isInteger = []
+        for value in row:
+            if isinstance(value, set): columnType = 'set'; column = np.zeros((self.chunkSize, max(value, default=0) + 1), dtype=bool)
+            elif isinstance(value, (list, tuple, np.ndarray)): columnType = 'list'; column = np.zeros((self.chunkSize,) + np.shape(value), dtype=np.float64)
+            elif isinstance(value, (bool, int, float, np.number)): columnType = 'int' if isinstance(value, (int, np.integer)) else 'float'; column = np.zeros(self.chunkSize, dtype=np.float64)
+            else: columnType = 'str'; column = [""] * self.chunkSize
+            self.columnType.append(columnType); self.columns.append(column); self.isInteger.append(columnType != 'float')
+
+    def saveToFile(self, numRows):
+        ''' saves the rows of the current chunk (if any) to the next .npz file and starts a new chunk; numRows is only there to keep the interface of CSVdata '''
+        if self.numRow == 0: return
+        chunk = {'headers': np.array(self.headers, dtype=str), 'column_type': np.array(self.columnType, dtype=str)}
+        for index, column in enumerate(self.columns):
+            column = column[:self.numRow]
+            if self.columnType[index] == 'str': column = np.array(column, dtype=str)
+            elif self.columnType[index] in ('int', 'float', 'list') and self.isInteger[index]: column = column.astype(np.int64)
+            chunk.update({'column%d' % (index): column})
+        np.savez_compressed(getColumnarBasePath(self.filepath) + ".%05d.npz" % (self.numChunk), **chunk)
+        self.numChunk += 1; self.numRow = 0
+        for index, column in enumerate(self.columns):
+            if self.columnType[index] == 'set': column[:] = False
+
+    def getColumn(self, index):
+        ColumnarData.saveToFile(self, self.chunkSize)
+        return loadColumnarData(self.filepath, [index])[2][0]
+
+    def getRows(self):
+        ColumnarData.saveToFile(self, self.chunkSize)
+        return loadColumnarRows(self.filepath)
+
+    def getFileOffset(self):
+        ''' number of chunks saved so far (see checkpoint.py) '''
+        return self.numChunk
+
+    def truncateFile(self, offset):
+        ''' removes the chunks saved after getFileOffset returned offset (see checkpoint.py) '''
+        for chunkFile in getColumnarChunkList(self.filepath)[offset:]: os.remove(chunkFile)
+# end ColumnarData class
+
+''' _________________________________________________ create the object used to save device and network details to file __________________________________________________ '''
+def createOutputData(filepath, headers, outputFormat, chunkSize, stream=False):
+    if outputFormat == "npz": return ColumnarData(filepath, headers, chunkSize)     # never holds more than one chunk in memory
+    return CSVdata(filepath, headers, stream)
+
+''' ____________________________________________________________ read details saved by ColumnarData from file ____________________________________________________________ '''
+def getColumnarBasePath(filepath):
+    return filepath[:-len(".csv")] if filepath.endswith(".csv") else filepath
+
+def getColumnarChunkList(filepath):
+    return sorted(glob(escape(getColumnarBasePath(filepath)) + ".[0-9][0-9][0-9][0-9][0-9].npz"))
+
+def isColumnarData(filepath):
+    return len(getColumnarChunkList(filepath)) > 0
+
+def loadColumnarData(filepath, columnIndexList=None):
+    '''
+    description: reads the chunks saved by ColumnarData for a csv file path (e.g. device1.csv) and concatenates them, one array per column
+    args:        path of the csv file the data stands for, indices of the columns to read (all columns if None; the other columns are not decompressed)
+    return:      list of headers, list of column types, list of columns read (one entry per row; membership matrices for 'set' columns, one more dimension for 'list' columns)
+    '''
+    headers = columnType = None; chunkColumns = []
+    for chunkFile in getColumnarChunkList(filepath):
+        with np.load(chunkFile) as chunk:
+            if headers == None:
+                headers = chunk['headers'].tolist(); columnType = chunk['column_type'].tolist()
+                if columnIndexList == None: columnIndexList = list(range(len(headers)))
+            chunkColumns.append([chunk['column%d' % (index)] for index in columnIndexList])
+    if headers == None: raise IOError("no columnar data saved for " + filepath)
+    columns = []
+    for position, index in enumerate(columnIndexList):
+        columnChunkList = [chunk[position] for chunk in chunkColumns]
+        if columnType[index] == 'set':     # chunks may be of different widths
+            width = max(column.shape[1] for column in columnChunkList)
+            columnChunkList = [np.pad(column, ((0, 0), (0, width - column.shape[1])), 'constant') for column in columnChunkList]
+        columns.append(np.concatenate(columnChunkList))
+    return headers, columnType, columns
+
+def loadColumnarRows(filepath):
+    '''
+    description: reads the chunks saved by ColumnarData and rebuilds the rows, as they were passed to addRow (sets and lists included)
+    args:        path of the csv file the data stands for
+    return:      list of rows (tuples)
+    '''
+    headers, columnType, columns = loadColumnarData(filepath)
+    values = []
+    for index, column in enumerate(columns):
+        if columnType[index] == 'set': values.append([set(np.flatnonzero(member).tolist()) for member in column])
+        else: values.append(column.tolist())
+    return list(zip(*values))
+
+''' ___________________________________________________ network chosen by each device, as saved in the network details ___________________________________________________ '''
+def getNetworkPerDevice(networkData, numNetwork):
+    '''
+    description: extracts the network chosen by each device from the network details (rows of network.csv: run, time slot, then the data rate, wireless technology and
+                 number of devices of each network, then the network of each device)
+    args:        list of rows of the network details, number of networks
+    return:      (time slots x devices) array of network IDs; 0 if a device is not associated with any network
+    '''
+    return np.array([row[2 + (3 * numNetwork):] for row in networkData], dtype=np.int64).reshape(len(networkData), -1)
+
+def getDevicePerNetwork(networkPerDevice, numNetwork):
+    '''
+    description: builds the set of devices associated with each network from the network chosen by each device
+    args:        network of each device (devices ordered by ID; 0 if not associated with any network), number of networks
+    return:      list of sets of device IDs, one per network
+    '''
+    devicePerNetwork = [set() for i in range(numNetwork)]
+    for deviceIndex, networkID in enumerate(networkPerDevice):
+        if networkID > 0: devicePerNetwork[networkID - 1].add(deviceIndex + 1)
+    return devicePerNetwork
+
+''' ________________________________________________________________ random number streams of the devices ________________________________________________________________ '''
+RANDOM_BLOCK_SIZE = 1024        # number of uniform random numbers drawn at once from the generator of a device
+RANDOM_PROBABILITY_TOLERANCE = np.sqrt(np.finfo(float).eps)    # as np.random.choice
+ALGORITHM_STREAM = 0            # stream of the selection algorithm of a device
+DELAY_STREAM = 1                # stream of the switching delays of a device
+
+def getStreamSeed(seed, runNum, deviceID, streamIndex=ALGORITHM_STREAM):
+    '''
+    description: derives the seed of a random number stream of a device, so that every (run, device) pair gets its own independent streams
+    args:        base seed of the simulation (None is the same as 0), index of the run, ID of the device (0 for streams shared by all devices), purpose of the stream
+    return:      entropy for numpy.random.SeedSequence
+    '''
+    return [0 if seed is None else seed, runNum, deviceID, streamIndex]
+    # end getStreamSeed
+
+class RandomStream():
+    ''' random numbers of one device, from its own numpy Generator; uniform numbers are drawn in blocks of blockSize and handed out one at a time, and random.randint,
+        random.choice and np.random.choice are replaced by inverse transform sampling on those numbers '''
+    def __init__(self, seed=None, blockSize=RANDOM_BLOCK_SIZE):
+        self.rng = np.random.default_rng(seed)
+        self.blockSize = blockSize
+        self.block = np.empty(0)    # uniform numbers drawn in advance
+        self.index = 0              # index of the next number to hand out
+
+    def random(self):
+        ''' uniform number in [0, 1) '''
+        if self.index == len(self.block): self.block = self.rng.random(self.blockSize).tolist(); self.index = 0
+        self.index += 1
+        return self.block[self.index - 1]
+
+    def randint(self, low, high):
+        ''' integer in [low, high], both included (as random.randint) '''
+        return low + int(RandomStream.random(self) * (high - low + 1))
+
+    def choice(self, sequence, p=None):
+        ''' element of a sequence, chosen uniformly at random (as random.choice) or with probabilities p (as np.random.choice); elements with probability zero are never chosen '''
+        if p is None: return sequence[int(RandomStream.random(self) * len(sequence))]
+        return sequence[RandomStream.sampleIndex(self, getCumulativeProbability(p))]
+
+    def sampleIndex(self, cumulativeProbability):
+        '''
+        description: draws an index from a categorical distribution by inverse transform sampling, i.e. a binary search of a uniform number in the cumulative probabilities;
+                     indices with probability zero are never returned
+        args:        self, cumulative probabilities (see getCumulativeProbability), which can be computed once and reused as long as the probabilities do not change
+        return:      index drawn
+        '''
+        if abs(cumulativeProbability[-1] - 1) > RANDOM_PROBABILITY_TOLERANCE: raise ValueError("probabilities do not sum to 1")
+        index = bisect_right(cumulativeProbability, RandomStream.random(self) * cumulativeProbability[-1])
+        # guards against rounding at the upper end of the cdf
+        while index == len(cumulativeProbability) or cumulativeProbability[index] == (cumulativeProbability[index - 1] if index > 0 else 0): index -= 1
+        return index
+    # end class RandomStream
+
+class RandomStreamGroup():
+    ''' random streams of several devices moved forward together (e.g. by the population engine); each device keeps its own Generator, and the uniform numbers of all devices
+        are drawn in a (blockSize x devices) block '''
+    def __init__(self, seedList, blockSize=RANDOM_BLOCK_SIZE):
+        self.rngList = [np.random.default_rng(seed) for seed in seedList]
+        self.blockSize = blockSize
+        self.block = np.empty((0, len(seedList)))
+        self.index = 0
+
+    def random(self, size=None):
+        '''
+        description: draws uniform numbers in [0, 1) from the stream of every device
+        args:        self, number of numbers per device (None for one)
+        return:      array of one number per device if size is None, (size x devices) array otherwise
+        '''
+        numRow = 1 if size is None else size; rowList = []
+        while numRow > 0:
+            if self.index == len(self.block): self.block = np.stack([rng.random(self.blockSize) for rng in self.rngList], axis=1); self.index = 0
+            numRowFromBlock = min(numRow, len(self.block) - self.index)
+            rowList.append(self.block[self.index:self.index + numRowFromBlock]); self.index += numRowFromBlock; numRow -= numRowFromBlock
+        uniform = rowList[0] if len(rowList) == 1 else np.concatenate(rowList)
+        return uniform[0] if size is None else uniform
+
+    def sampleIndex(self, probability):
+        ''' draws one index per device from the (devices x actions) probabilities, with one uniform number from the stream of each device (see sampleCategorical) '''
+        return sampleCategorical(probability, RandomStreamGroup.random(self))
+    # end class RandomStreamGroup
+
+def getCumulativeProbability(probability):
+    ''' cumulative sum of a list of probabilities, as used by RandomStream.sampleIndex '''
+    return list(accumulate(probability))
+    # end getCumulativeProbability
+
+def sampleCategorical(probability, uniform):
+    '''
+    description: draws one index per row of a probability matrix by inverse transform sampling, for all rows at once; indices with probability zero are never returned
+    args:        (rows x actions) array of probabilities, one uniform number in [0, 1) per row
+    return:      index drawn in each row
+    '''
+    cumulativeProbability = np.cumsum(probability, axis=1)
+    actionIndex = (cumulativeProbability <= (uniform * cumulativeProbability[:, -1])[:, None]).sum(axis=1)
+    lastPossibleActionIndex = probability.shape[1] - 1 - np.argmax(probability[:, ::-1] > 0, axis=1)   # guards against rounding at the upper end of the cdf
+    return np.minimum(actionIndex, lastPossibleActionIndex)
+    # end sampleCategorical
+
+''' ______________________________________________________________ weights of the EXP3 family in log space _______________________________________________________________ '''
+def normalizeLogWeight(logWeight):
+    '''
+    description: shifts the log weights (of one device, or of each device in a row) so that the largest one is zero; the log weight of unavailable actions stays -inf
+    args:        array of log weights (last axis refers to actions)
+    return:      array of normalized log weights
+    '''
+    maxLogWeight = logWeight.max(axis=-1, keepdims=True)
+    return logWeight - np.where(np.isfinite(maxLogWeight), maxLogWeight, 0)
+    # end normalizeLogWeight
+
+def adjustLogWeightToAvailability(logWeight, actionAvailabilityStatus):
+    '''
+    description: log space counterpart of resetting weights on a change in action availability; actions no longer available get -inf and newly available actions get the
+                 largest log weight (zero if no action was available), then the log weights are normalized
+    args:        array of log weights, array of availability status (1 if available, 0 otherwise) of the same shape
+    return:      array of adjusted log weights
+    '''
+    logWeight = np.where(actionAvailabilityStatus == 1, logWeight, -np.inf)
+    maxLogWeight = logWeight.max(axis=-1, keepdims=True); maxLogWeight = np.where(np.isfinite(maxLogWeight), maxLogWeight, 0)
+    logWeight = np.where(actionAvailabilityStatus == 1, np.where(np.isfinite(logWeight), logWeight, maxLogWeight), -np.inf)
+    return normalizeLogWeight(logWeight)
+    # end adjustLogWeightToAvailability
+
+def computeProbabilityFromLogWeight(logWeight, gamma, actionAvailabilityStatus):
+    '''
+    description: mixes the distribution given by the log weights (computed with logsumexp, hence without overflow or underflow) with the uniform distribution over the
+                 available actions; unavailable actions get probability zero
+    args:        array of log weights, gamma (one value, or one per row), array of availability status of the same shape as the log weights
+    return:      array of probabilities
+    '''
+    gamma = np.asarray(gamma, dtype=float)[..., np.newaxis]
+    weightRatio = np.exp(logWeight - logsumexp(logWeight, axis=-1, keepdims=True))
+    probability = ((1 - gamma) * weightRatio) + (gamma / actionAvailabilityStatus.sum(axis=-1, keepdims=True))
+    return np.where(actionAvailabilityStatus == 1, probability, 0)
+    # end computeProbabilityFromLogWeight
+
+''' __________________________________________________________ map time slots to labels of partition functions ___________________________________________________________ '''
+LABEL_TABLE_CACHE = {}          # label of each time slot in a repetition, keyed by (first time slot of each label, number of time slots per repetition); shared by devices
+
+def getLabelTable(labelStartList, numTimeSlotPerRepetition):
+    '''
+    description: computes the label assigned to each time slot of a repetition by a partition function, i.e. the index (starting at 1) of the latest label that starts at
+                 or before the time slot (the first one if several labels start at the same time slot, and the last label from its start onwards); the table is computed
+                 once for every distinct partition and shared, read-only, by all devices that use it
+    args:        first time slot of each label (the labels of a partition function), number of time slots per repetition
+    return:      read-only array; entry t - 1 is the label of time slot t of the repetition
+    '''
+    key = (tuple(sorted(labelStartList)), numTimeSlotPerRepetition)
+    if key not in LABEL_TABLE_CACHE:
+        labelStart = np.array(key[0])
+        timeSlot = np.arange(1, numTimeSlotPerRepetition + 1)
+        latestLabelStart = labelStart[np.searchsorted(labelStart, timeSlot, side='right') - 1]
+        labelTable = (np.searchsorted(labelStart, latestLabelStart, side='left') + 1).astype(np.int32)
+        labelTable[timeSlot >= labelStart[-1]] = len(labelStart)
+        labelTable.setflags(write=False)
+        LABEL_TABLE_CACHE[key] = labelTable
+    return LABEL_TABLE_CACHE[key]
+    # end getLabelTable
+
 ''' ___________________________________________________________________ compute moving average of a list _________________________________________________________________ '''
 def computeMovingAverage(values, window):
     ''' source: https://gordoncluster.wordpress.com/2014/02/13/python-numpy-how-to-generate-moving-averages-efficiently-part-2/ '''
@@ -44,7 +370,142 @@ def isEpsilonEquilibrium(combination, numNetwork, bandwidthPerNetwork):
                 return False
     return True
 
-def computeNashEquilibriumState(numDevice, numNetwork, bandwidthPerNetwork):
+NASH_EQUILIBRIUM_CACHE = {}     # Nash equilibrium states already computed, keyed by (number of devices, data rates, devices that have access to each network)
+
+def computeNashEquilibriumState(numDevice, numNetwork, bandwidthPerNetwork, deviceListPerNetwork=None):
+    '''
+    description: computes the Nash equilibrium states, i.e. the number of devices per network such that no device can get a higher bit rate by moving to another network;
+                 without restriction on network availability, the states are found by water-filling (see computeNashEquilibriumStateWaterFilling); with per device
+                 availability, by better response dynamics and moves of one device between networks (see computeNashEquilibriumStateWithAvailability); results are
+                 memoized
+    args:        number of devices, number of networks, data rate of each network, list of devices that have access to each network (None if all devices have access to
+                 all networks; the devices considered are then those in the lists, not numDevice)
+    return:      list of Nash equilibrium states (lists of number of devices per network), in ascending (lexicographic) order
+    '''
+    bandwidthPerNetwork = list(bandwidthPerNetwork[:numNetwork])
+    if deviceListPerNetwork != None:
+        deviceListPerNetwork = [frozenset(devices) for devices in deviceListPerNetwork[:numNetwork]]
+        if all(devices == deviceListPerNetwork[0] for devices in deviceListPerNetwork): numDevice = len(deviceListPerNetwork[0]); deviceListPerNetwork = None
+    key = (numDevice, tuple(bandwidthPerNetwork), None if deviceListPerNetwork == None else tuple(tuple(sorted(devices)) for devices in deviceListPerNetwork))
+    if key not in NASH_EQUILIBRIUM_CACHE:
+        if deviceListPerNetwork == None: NEstateList = computeNashEquilibriumStateWaterFilling(numDevice, bandwidthPerNetwork)
+        else: NEstateList = computeNashEquilibriumStateWithAvailability(bandwidthPerNetwork, deviceListPerNetwork)
+        NASH_EQUILIBRIUM_CACHE.update({key: NEstateList})
+    return [list(NEstate) for NEstate in NASH_EQUILIBRIUM_CACHE[key]]
+
+def computeNashEquilibriumStateWaterFilling(numDevice, bandwidthPerNetwork):
+    '''
+    description: a state x is a Nash equilibrium iff max over all networks j of r_j/(x_j + 1) <= min over occupied networks i of r_i/x_i; for a threshold t between the two,
+                 each network must have r_j/t - 1 <= x_j <= r_j/t devices, i.e. one or two possible values; every Nash equilibrium is found from the threshold
+                 t = min r_i/x_i, which is one of r_i/k (k = 1, ..., numDevice), so only (#networks x numDevice) thresholds need to be considered; computations are
+                 exact (fractions)
+    args:        number of devices, data rate of each network
+    return:      list of Nash equilibrium states, in ascending (lexicographic) order, as with computeNashEquilibriumStateBruteForce
+    '''
+    numNetwork = len(bandwidthPerNetwork); rate = [Fraction(x) for x in bandwidthPerNetwork]
+    if numDevice == 0: return [[0] * numNetwork]
+    if all(x == 0 for x in rate): return computeNashEquilibriumStateBruteForce(numDevice, numNetwork, bandwidthPerNetwork)  # all states are equilibria
+
+    NEstateSet = set()
+    for threshold in set(x / numConnectedDevice for x in rate if x > 0 for numConnectedDevice in range(1, numDevice + 1)):
+        minNumDevice = [max(0, ceil(x / threshold) - 1) for x in rate]; maxNumDevice = [floor(x / threshold) for x in rate]
+        numDeviceLeft = numDevice - sum(minNumDevice)
+        flexibleNetwork = [i for i in range(numNetwork) if maxNumDevice[i] > minNumDevice[i]]       # can take one more device
+        if numDeviceLeft < 0 or numDeviceLeft > len(flexibleNetwork): continue
+        for networkIndexList in combinations(flexibleNetwork, numDeviceLeft):
+            NEstate = list(minNumDevice)
+            for i in networkIndexList: NEstate[i] += 1
+            NEstateSet.add(tuple(NEstate))
+    return [list(NEstate) for NEstate in sorted(NEstateSet)]
+
+def computeNashEquilibriumStateWithAvailability(bandwidthPerNetwork, deviceListPerNetwork):
+    '''
+    description: with per device availability, a state (number of devices per network) is a Nash equilibrium if the devices can be placed on networks they have access to
+                 such that none of them can get a higher bit rate on another network it has access to; devices with the same set of available networks are grouped and
+                 each state is checked by finding a placement of the groups (max flow); a first equilibrium is reached by better response dynamics (devices placed one by
+                 one on their best available network, then moved while some device can get a higher bit rate elsewhere, which ends after a number of moves polynomial in
+                 the number of devices and networks), and the others are found by moving one device between two networks from the equilibria already found, i.e.
+                 #networks^2 placement checks per equilibrium instead of an enumeration of all states; the equilibria of an instance are connected by such moves on all
+                 random instances checked against an exhaustive search, but this is not proven
+    args:        data rate of each network, list of devices that have access to each network
+    return:      list of Nash equilibrium states, in ascending (lexicographic) order
+    '''
+    numNetwork = len(bandwidthPerNetwork); rate = [Fraction(x) for x in bandwidthPerNetwork]
+    deviceList = sorted(set().union(*deviceListPerNetwork)); numDevice = len(deviceList)
+    availableNetworkPerGroup = {}     # set of available networks -> number of devices
+    for deviceID in deviceList:
+        availableNetwork = frozenset(i for i in range(numNetwork) if deviceID in deviceListPerNetwork[i])
+        availableNetworkPerGroup.update({availableNetwork: availableNetworkPerGroup.get(availableNetwork, 0) + 1})
+    maxNumDevice = [len(devices) for devices in deviceListPerNetwork]
+
+    def canPlaceDevice(state):
+        # allowed networks of each group: available and no available network gives a higher bit rate
+        groupList = [(numGroupDevice, [i for i in availableNetwork if state[i] > 0 and all(rate[i] / state[i] >= rate[j] / (state[j] + 1) for j in availableNetwork)])
+                     for availableNetwork, numGroupDevice in availableNetworkPerGroup.items()]
+        return computeMaxFlow(groupList, state) == numDevice
+
+    # better response dynamics on the groups: numDevicePerGroup[g][i] devices of group g are on network i
+    groupList = [sorted(availableNetwork) for availableNetwork in availableNetworkPerGroup]; state = [0] * numNetwork
+    numDevicePerGroup = [[0] * numNetwork for availableNetwork in groupList]
+    for g, availableNetwork in enumerate(groupList):
+        for numPlacedDevice in range(availableNetworkPerGroup[frozenset(availableNetwork)]):
+            i = max(availableNetwork, key=lambda j: rate[j] / (state[j] + 1)); numDevicePerGroup[g][i] += 1; state[i] += 1
+    moved = True
+    while moved:
+        moved = False
+        for g, availableNetwork in enumerate(groupList):
+            for i in availableNetwork:
+                if numDevicePerGroup[g][i] == 0: continue
+                j = max((j for j in availableNetwork if j != i), key=lambda j: rate[j] / (state[j] + 1), default=i)
+                if j != i and rate[j] / (state[j] + 1) > rate[i] / state[i]:
+                    numDevicePerGroup[g][i] -= 1; state[i] -= 1; numDevicePerGroup[g][j] += 1; state[j] += 1; moved = True
+
+    # other equilibria, reached by moving one device from network i to network j
+    NEstateSet = {tuple(state)}; visitedStateSet = {tuple(state)}; stateList = [tuple(state)]
+    while stateList:
+        state = stateList.pop()
+        for i in range(numNetwork):
+            for j in range(numNetwork):
+                if i == j or state[i] == 0 or state[j] == maxNumDevice[j]: continue
+                neighbour = list(state); neighbour[i] -= 1; neighbour[j] += 1; neighbour = tuple(neighbour)
+                if neighbour in visitedStateSet: continue
+                visitedStateSet.add(neighbour)
+                if canPlaceDevice(neighbour): NEstateSet.add(neighbour); stateList.append(neighbour)
+    return [list(NEstate) for NEstate in sorted(NEstateSet)]
+
+def computeMaxFlow(groupList, capacityPerNetwork):
+    '''
+    description: computes the maximum number of devices that can be placed, each group of devices on its allowed networks, without exceeding the capacity of the networks
+                 (augmenting paths on the bipartite graph of groups and networks)
+    args:        list of (number of devices, list of allowed networks) per group, capacity of each network
+    return:      maximum number of devices that can be placed
+    '''
+    numGroup = len(groupList); flow = [[0] * len(capacityPerNetwork) for i in range(numGroup)]; networkLoad = [0] * len(capacityPerNetwork); groupLoad = [0] * numGroup
+    totalFlow = 0
+    while True:
+        # breadth first search from groups with devices left to a network with capacity left; nodes are ('group', index) or ('network', index)
+        parent = {('group', g): None for g in range(numGroup) if groupLoad[g] < groupList[g][0]}; queue = list(parent.keys()); end = None
+        while queue and end == None:
+            nodeType, index = queue.pop(0)
+            if nodeType == 'group':
+                for i in groupList[index][1]:
+                    if ('network', i) not in parent:
+                        parent.update({('network', i): (nodeType, index)}); queue.append(('network', i))
+                        if networkLoad[i] < capacityPerNetwork[i]: end = ('network', i); break
+            else:
+                for g in range(numGroup):
+                    if flow[g][index] > 0 and ('group', g) not in parent: parent.update({('group', g): (nodeType, index)}); queue.append(('group', g))
+        if end == None: return totalFlow
+        # augment by one device along the path
+        node = end; networkLoad[end[1]] += 1
+        while parent[node] != None:
+            previousNode = parent[node]
+            if node[0] == 'network': flow[previousNode[1]][node[1]] += 1
+            else: flow[node[1]][previousNode[1]] -= 1
+            node = previousNode
+        groupLoad[node[1]] += 1; totalFlow += 1
+
+def computeNashEquilibriumStateBruteForce(numDevice, numNetwork, bandwidthPerNetwork):
     NashEquilibriumElist = []
     # epsilonEquilibriumList = []
 
@@ -156,4 +617,12 @@ def saveToCSVfile(outputCSVfile, data, fileOpenMode):
         try: out.writerow(row)
         except: print("error saving data:", data)
     myfile.close()
+
+def saveToCSV(outputCSVfile, headers, data):
+    ''' saves the headers (if any) and rows of data to a new csv file '''
+    saveToCSVfile(outputCSVfile, ([headers] if len(headers) > 0 else []) + data, "w")
+
+''' _______________________________________________________________________ save data to text file _______________________________________________________________________ '''
+def saveToTxt(outputTxtFile, data):
+    with open(outputTxtFile, "w") as myfile: myfile.write(data)
 ''' _____________________________________________________________________________ end of file ____________________________________________________________________________ '''
\ No newline at end of file
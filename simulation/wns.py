@@ -14,11 +14,17 @@ from network import Network
 import global_setting
 import argparse
 import os
+import sys
+import random
 from statistics import median, stdev
 import numpy as np
 from copy import deepcopy
-from utility_method import getTimeTaken, computeNashEquilibriumState, isNashEquilibrium, saveToCSVfile, computeMovingAverage
+from utility_method import getTimeTaken, computeNashEquilibriumState, isNashEquilibrium, saveToCSVfile, computeMovingAverage, getStreamSeed
 from computeDistanceToNashEquilibrium import computeDistanceToNashEquilibrium
+from run_summary import RunSummary
+from checkpoint import Checkpoint
+from result_cache import ResultCache, MAX_AGE, MAX_SIZE, clearRestoredMark
+from phase_profiler import PhaseProfiler
 import time
 from algorithm_EXP3 import EXP3
 from algorithm_FullInformation import FullInformation
@@ -51,13 +57,25 @@ parser.add_argument('-rep', dest="num_repeat", required=True, help='number of ti
 parser.add_argument('-opt', dest="optimization", required=True, type=boolstr, help='whether the optimized version of the chosen algorithm must be used')
 parser.add_argument('-period', dest='period_option', required=True, help='periods considered - partition functions to be used')
 parser.add_argument('-roll', dest='rolling_average_window', required=True, help='rolling average window size for distance to Nash equilibrium')
+parser.add_argument('-engine', dest='engine', default='process', choices=['process', 'population'], help='one simpy process per device (process) or all devices moved forward together as numpy arrays (population; EXP3 and SmartEXP3 only)')
+parser.add_argument('-format', dest='output_format', default='csv', choices=['csv', 'npz'], help='format of the per time slot details of devices and networks (csv, or chunked columnar .npz files)')
+parser.add_argument('-stream', dest='stream_output', default=False, type=boolstr, help='whether per time slot details are dropped from memory once saved to file, with the summary statistics gathered during the run')
+parser.add_argument('-distance', dest='distance_engine', default='array', choices=['graph', 'array'], help='implementation of the distance to Nash equilibrium (networkx graphs, or numpy adjacency matrices; same results)')
+parser.add_argument('-weight', dest='weight_representation', default='linear', choices=['linear', 'log'], help='representation of the weights of EXP3 and SmartEXP3 (normalized weights, or log weights with logsumexp; log is stable over long horizons)')
+parser.add_argument('-checkpoint', dest='checkpoint_frequency', default=0, type=int, help='number of time slots between checkpoints of the run (0 for no checkpoint); rounded up to a multiple of -f')
+parser.add_argument('-resume', '--resume', dest='resume', action='store_true', help='resume the run from the last checkpoint saved in the output directory (if any), with the same parameters')
+parser.add_argument('-profile', dest='profile', default=False, type=boolstr, help='whether the time spent in each phase of a time slot is measured (summed over all devices), printed at the end of the run and saved to profile.json')
+parser.add_argument('-seed', dest='seed', default=None, type=int, help='base seed of the random number generators; the stream of each device is derived from (seed, run index, device ID), or from (run index, device ID) if not given')
+parser.add_argument('-cache', dest='cache_dir', default=None, help='directory of the result cache; the run is skipped, and its summary files copied from the cache, if it was completed with the same parameters and code')
+parser.add_argument('-cache_max_age', dest='cache_max_age', default=MAX_AGE / (24 * 3600), type=float, help='entries of the result cache not used for that many days are evicted')
+parser.add_argument('-cache_max_size', dest='cache_max_size', default=MAX_SIZE, type=float, help='maximum size of the result cache (in MB); the least recently used entries are evicted first')
 
 args = parser.parse_args()
 NUM_MOBILE_DEVICE = int(args.num_device); global_setting.constants.update({'num_mobile_device':NUM_MOBILE_DEVICE})
 NUM_TIME_SLOT = int(args.num_time_slot); global_setting.constants.update({'num_time_slot':NUM_TIME_SLOT})
 global_setting.constants.update({'num_sub_time_slot':int(args.num_sub_time_slot)})  # per time slot
 global_setting.constants.update({'delay':int(args.delay)})
-global_setting.constants.update({'run_num':int(args.run_index)})
+RUN_NUM = int(args.run_index); global_setting.constants.update({'run_num':RUN_NUM})
 ALGORITHM_NAME = args.algorithm_name; global_setting.constants.update({'algorithm_name':ALGORITHM_NAME})
 DIR = args.directory; global_setting.constants.update({'output_dir':DIR})
 PROBLEM_INSTANCE = args.problem_instance; global_setting.constants.update({'problem_instance':PROBLEM_INSTANCE})
@@ -71,6 +89,21 @@ NUM_REPEAT = int(args.num_repeat); global_setting.constants.update({'num_repeat'
 OPTIMIZATION = args.optimization; global_setting.constants.update({'optimization':OPTIMIZATION})
 PERIOD_OPTION = int(args.period_option); global_setting.constants.update({'period_option':PERIOD_OPTION})
 ROLLING_AVERAGE_WINDOW = int(args.rolling_average_window); global_setting.constants.update({'rolling_average_window':ROLLING_AVERAGE_WINDOW})
+ENGINE = args.engine; global_setting.constants.update({'engine':ENGINE})
+OUTPUT_FORMAT = args.output_format; global_setting.constants.update({'output_format':OUTPUT_FORMAT})
+STREAM_OUTPUT = args.stream_output; global_setting.constants.update({'stream_output':STREAM_OUTPUT})
+DISTANCE_ENGINE = args.distance_engine; global_setting.constants.update({'distance_engine':DISTANCE_ENGINE})
+WEIGHT_REPRESENTATION = args.weight_representation; global_setting.constants.update({'weight_representation':WEIGHT_REPRESENTATION})
+SEED = args.seed; global_setting.constants.update({'seed':SEED})
+CHECKPOINT_FREQUENCY = args.checkpoint_frequency; RESUME = args.resume
+
+# skip the run if its summary files are in the result cache (keyed by the parameters above and the version of the code)
+resultCache = ResultCache(args.cache_dir, global_setting.constants, args.cache_max_age * 24 * 3600, args.cache_max_size) if args.cache_dir != None else None
+if resultCache != None and not RESUME and resultCache.load(DIR):
+    print("----- summary of the run copied from the result cache (entry %s); simulation skipped -----" % resultCache.key)
+    sys.exit(0)
+
+if SEED is not None: np.random.seed(SEED); random.seed(SEED)
 problem_instance.initialize()    # retrieve the global variables
 
 ''' ____________________________________________________________________ setup and start the simulation ___________________________________________________________________ '''
@@ -79,41 +112,84 @@ startTime = time.time()
 env = simpy.Environment()
 
 if not os.path.exists(DIR): os.makedirs(DIR)                                     # create output directory if it doesn't exist
+clearRestoredMark(DIR)                                                          # the run is simulated, hence its per time slot details are saved
 
 # get the number of networks and create the Network objects
 networkDataRate = problem_instance.getNetworkDataRate(PROBLEM_INSTANCE, 1)  # print(t, currentDataRate)
 NUM_NETWORK = len(networkDataRate)
 networkList = [Network(0) for i in range(NUM_NETWORK)]                       # create network objects and store in networkList
+runSummary = RunSummary(PROBLEM_INSTANCE, NUM_MOBILE_DEVICE, NUM_TIME_SLOT, NUM_REPEAT, DISTANCE_ENGINE) if STREAM_OUTPUT else None    # gathers the summary statistics during the run
+
+# take checkpoints of the run, and restore the state of the run from the last checkpoint when resuming
+checkpointParameter = {key: value for key, value in vars(args).items() if key not in ['checkpoint_frequency', 'resume', 'profile']}
+checkpoint = Checkpoint(DIR, CHECKPOINT_FREQUENCY, SAVE_TO_FILE_FREQUENCY, NUM_TIME_SLOT, checkpointParameter) if CHECKPOINT_FREQUENCY > 0 or RESUME else None
 global_setting.constants.update({'network_list':networkList})
+global_setting.constants.update({'run_summary':runSummary})
+global_setting.constants.update({'checkpoint':checkpoint})
+profiler = PhaseProfiler(ALGORITHM_NAME) if args.profile else None      # time spent in each phase of a time slot, from the first time slot simulated
+global_setting.constants.update({'profiler':profiler})
+lastTimeSlot, resumeState = checkpoint.load() if RESUME else (0, None)     # last time slot completed before the checkpoint
+if resumeState != None:     # restored into the objects already shared through global_setting
+    for network, savedNetwork in zip(networkList, resumeState['network_list']): network.__dict__.update(savedNetwork.__dict__)
+    Network.numNetwork = resumeState['num_network']
+    if runSummary != None: runSummary.__dict__.update(resumeState['run_summary'].__dict__)
 from mobile_device import MobileDevice
 
 print("going to start simulation...")
-# create mobile device objects and store in mobileDeviceList
-mobileDeviceList = [MobileDevice(networkList) for i in range(NUM_MOBILE_DEVICE)]
-
-# each mobile device object executes the appropriate algorithm
-for i in range(NUM_MOBILE_DEVICE):
-    if ALGORITHM_NAME == "EXP3":
-        algorithm = EXP3(NUM_NETWORK, i + 1)
-    elif ALGORITHM_NAME == "FullInformation":
-        algorithm = FullInformation(NUM_NETWORK, LEARNING_RATE, i + 1)
-    elif ALGORITHM_NAME == "SmartEXP3":
-        algorithm = SmartEXP3(NUM_NETWORK, seed=i + 1)
-    elif ALGORITHM_NAME == "CoBandit":
-        algorithm = CoBandit(NUM_NETWORK, LEARNING_RATE, MAX_TIME_UNHEARD_ACCEPTABLE, TRANSMIT_PROBABILITY, LISTEN_PROBABILITY, i + 1)
-    elif ALGORITHM_NAME == "PeriodicEXP4":
-        algorithm = PeriodicEXP4(NUM_NETWORK, NUM_TIME_SLOT, NUM_REPEAT, PROBLEM_INSTANCE, PERIOD_OPTION, mobileDeviceList[i].deviceID, OPTIMIZATION, i + 1)
-    elif ALGORITHM_NAME == "SmartPeriodicEXP4":
-        algorithm = SmartPeriodicEXP4(NUM_NETWORK, NUM_TIME_SLOT, NUM_REPEAT, PROBLEM_INSTANCE, PERIOD_OPTION, mobileDeviceList[i].deviceID, 0.1, OPTIMIZATION, 8, i + 1)
-    elif ALGORITHM_NAME == "ContextualSmartEXP3":
-        algorithm = ContextualSmartEXP3(NUM_NETWORK, seed=i + 1)
-    proc = env.process(mobileDeviceList[i].performWirelessNetworkSelection(env, algorithm))
-
-env.run(until=proc)  # SIM_TIME)
-
+simulationStartTime = time.time()
+if ENGINE == "population":
+    # all devices are moved forward together, one time slot at a time
+    from population_engine import PopulationEngine
+    engine = resumeState['engine'] if resumeState != None else PopulationEngine(NUM_MOBILE_DEVICE, NUM_NETWORK, ALGORITHM_NAME)
+    if checkpoint != None:
+        checkpoint.getState = lambda: {'engine': engine, 'network_list': networkList, 'num_network': Network.numNetwork, 'run_summary': runSummary}
+        checkpoint.getOutputData = lambda: engine.deviceCSVdata + [engine.networkCSVdata]
+    engine.run(lastTimeSlot + 1)
+    deviceCSVdataList = engine.deviceCSVdata; networkCSVdata = engine.networkCSVdata
+else:
+    if resumeState != None:
+        mobileDeviceList = resumeState['mobile_device_list']; algorithmList = resumeState['algorithm_list']
+        MobileDevice.numMobileDevice = resumeState['num_mobile_device']; MobileDevice.sharedObservation = resumeState['shared_observation']
+        MobileDevice.resetTimeSlotPerDevice = resumeState['reset_time_slot_per_device']
+    else:
+        # create mobile device objects and store in mobileDeviceList
+        mobileDeviceList = [MobileDevice(networkList) for i in range(NUM_MOBILE_DEVICE)]
+        algorithmList = []
+
+        # each mobile device object executes the appropriate algorithm
+        for i in range(NUM_MOBILE_DEVICE):
+            streamSeed = getStreamSeed(SEED, RUN_NUM, mobileDeviceList[i].deviceID)     # each device draws its random numbers from its own stream
+            if ALGORITHM_NAME == "EXP3":
+                algorithm = EXP3(NUM_NETWORK, streamSeed, WEIGHT_REPRESENTATION == "log")
+            elif ALGORITHM_NAME == "FullInformation":
+                algorithm = FullInformation(NUM_NETWORK, LEARNING_RATE, streamSeed)
+            elif ALGORITHM_NAME == "SmartEXP3":
+                algorithm = SmartEXP3(NUM_NETWORK, seed=streamSeed, logWeight=(WEIGHT_REPRESENTATION == "log"))
+            elif ALGORITHM_NAME == "CoBandit":
+                algorithm = CoBandit(NUM_NETWORK, LEARNING_RATE, MAX_TIME_UNHEARD_ACCEPTABLE, TRANSMIT_PROBABILITY, LISTEN_PROBABILITY, streamSeed)
+            elif ALGORITHM_NAME == "PeriodicEXP4":
+                algorithm = PeriodicEXP4(NUM_NETWORK, NUM_TIME_SLOT, NUM_REPEAT, PROBLEM_INSTANCE, PERIOD_OPTION, mobileDeviceList[i].deviceID, OPTIMIZATION, streamSeed)
+            elif ALGORITHM_NAME == "SmartPeriodicEXP4":
+                algorithm = SmartPeriodicEXP4(NUM_NETWORK, NUM_TIME_SLOT, NUM_REPEAT, PROBLEM_INSTANCE, PERIOD_OPTION, mobileDeviceList[i].deviceID, 0.1, OPTIMIZATION, 8, streamSeed)
+            elif ALGORITHM_NAME == "ContextualSmartEXP3":
+                algorithm = ContextualSmartEXP3(NUM_NETWORK, seed=streamSeed)
+            algorithmList.append(algorithm)
+    if checkpoint != None:
+        checkpoint.getState = lambda: {'mobile_device_list': mobileDeviceList, 'algorithm_list': algorithmList, 'network_list': networkList, 'num_network': Network.numNetwork,
+                                       'num_mobile_device': MobileDevice.numMobileDevice, 'shared_observation': MobileDevice.sharedObservation,
+                                       'reset_time_slot_per_device': MobileDevice.resetTimeSlotPerDevice, 'run_summary': runSummary}
+        checkpoint.getOutputData = lambda: [mobileDevice.deviceCSVdata for mobileDevice in mobileDeviceList] + [mobileDeviceList[0].networkCSVdata]
+    for i in range(NUM_MOBILE_DEVICE): proc = env.process(mobileDeviceList[i].performWirelessNetworkSelection(env, algorithmList[i], lastTimeSlot + 1))
+
+    env.run(until=proc)  # SIM_TIME)
+    deviceCSVdataList = [mobileDevice.deviceCSVdata for mobileDevice in mobileDeviceList]; networkCSVdata = mobileDeviceList[0].networkCSVdata
+
+simulationEndTime = time.time()
+if profiler != None: profiler.printBreakdown(); profiler.saveToFile(DIR + "profile.json")
 numTimeSlotPerRepetition = NUM_TIME_SLOT//NUM_REPEAT
 print("----- going to compute distance to Nash equilibrium -----")
-distanceToNE = computeDistanceToNashEquilibrium(PROBLEM_INSTANCE, NUM_TIME_SLOT, mobileDeviceList[0].networkCSVdata.rows, NUM_MOBILE_DEVICE)
+if STREAM_OUTPUT: distanceToNE = runSummary.distanceToNE; runSummary.nashEquilibriumDistance.printCacheStatistics()     # computed during the run
+else: distanceToNE = computeDistanceToNashEquilibrium(PROBLEM_INSTANCE, NUM_TIME_SLOT, networkCSVdata.getRows(), NUM_MOBILE_DEVICE, DISTANCE_ENGINE)
 saveToCSVfile(DIR + "distanceToNashEquilibrium.csv", [["timeslot", "distance"]] + [[timeIndex + 1, distanceToNE[timeIndex]] for timeIndex in range(len(distanceToNE))], "w")
 
 print("----- going to compute average distance to Nash equilibrium per repetition -----")
@@ -129,16 +205,20 @@ print("----- going to save cumulative gain per device -----")
 cumulativeDownloadPerDevice = []; cumulativeDownloadPerRepetitionPerDevice =[]
 for i in range(NUM_REPEAT + 1): cumulativeDownloadPerRepetitionPerDevice.append([])  # last element stores list of cumulative download per device over the run
 for i in range(NUM_MOBILE_DEVICE):  # for each device
-    if ALGORITHM_NAME == "SmartPeriodicEXP4": index =13 + NUM_NETWORK
-    elif ALGORITHM_NAME == "PeriodicEXP4": index = 7 + NUM_NETWORK
-    elif ALGORITHM_NAME == "EXP3": index = 7 + (2 *NUM_NETWORK)
-    elif ALGORITHM_NAME == "SmartEXP3": index = 10 + (2 * NUM_NETWORK)
-    downloadPerDevice = [mobileDeviceList[i].deviceCSVdata.rows[j][index] for j in range(NUM_TIME_SLOT)] # get column download per time slot from csv file
-    # compute cumulative download per repetition for the device
-    cumulativeDownloadPerRepetition = []
-    for repetition in range(1, NUM_REPEAT + 1): cumulativeDownloadPerRepetition.append(sum(downloadPerDevice[(repetition - 1) * numTimeSlotPerRepetition:repetition * numTimeSlotPerRepetition]))
+    if STREAM_OUTPUT:   # gathered during the run
+        cumulativeDownloadPerRepetition = runSummary.cumulativeDownloadPerRepetition[:, i].tolist(); cumulativeDownload = runSummary.cumulativeDownload[i].item()
+    else:
+        if ALGORITHM_NAME == "SmartPeriodicEXP4": index =13 + NUM_NETWORK
+        elif ALGORITHM_NAME == "PeriodicEXP4": index = 7 + NUM_NETWORK
+        elif ALGORITHM_NAME == "EXP3": index = 7 + (2 *NUM_NETWORK)
+        elif ALGORITHM_NAME == "SmartEXP3": index = 10 + (2 * NUM_NETWORK)
+        downloadPerDevice = deviceCSVdataList[i].getColumn(index)[:NUM_TIME_SLOT]   # get column download per time slot from csv file
+        # compute cumulative download per repetition for the device
+        cumulativeDownloadPerRepetition = []
+        for repetition in range(1, NUM_REPEAT + 1): cumulativeDownloadPerRepetition.append(sum(downloadPerDevice[(repetition - 1) * numTimeSlotPerRepetition:repetition * numTimeSlotPerRepetition]))
+        cumulativeDownload = sum(downloadPerDevice)
     for repetition in range(NUM_REPEAT): cumulativeDownloadPerRepetitionPerDevice[repetition].append(cumulativeDownloadPerRepetition[repetition])
-    cumulativeDownload = sum(downloadPerDevice); cumulativeDownloadPerDevice.append(cumulativeDownload)
+    cumulativeDownloadPerDevice.append(cumulativeDownload)
     cumulativeDownloadPerRepetitionPerDevice[-1].append(cumulativeDownload) # last element stores list of cumulative download per device over the whole run
 # compute and store the min, max, median, mean, stdev cumulative download for each repetition, and the aggregate per device for the whole run
 saveToCSVfile(DIR + "cumulativeGainPerDevicePerRepetition.csv", [["repetition"] + ["device " + str(x) for x in range(1, NUM_MOBILE_DEVICE + 1)] + ["min", "max", "median", "mean", "std"]], "w")
@@ -156,8 +236,14 @@ medianCumulativeDownload = median(cumulativeDownloadPerDevice); standardDeviatio
 saveToCSVfile(DIR + "cumulativeGainPerDevice.csv", [[x] for x in cumulativeDownloadPerDevice], "w")
 saveToCSVfile(DIR + "cumulativeGainPerDevice_median_std.csv", [['median', medianCumulativeDownload], ['std', standardDeviationCumulativeDownload]], "w")
 
+if checkpoint != None: checkpoint.remove()     # the run is completed
+if resultCache != None: resultCache.save(DIR)
+
 endTime = time.time()
 timeTaken, unit = getTimeTaken(startTime, endTime)
+# time spent in each phase of the run (read by benchmark.py)
+saveToCSVfile(DIR + "timeTaken.csv", [["phase", "time (secs)"], ["setup", simulationStartTime - startTime], ["simulation", simulationEndTime - simulationStartTime],
+                                      ["post-processing", endTime - simulationEndTime]], "w")
 
 print("----- simulation completed in %s %s -----" % (timeTaken, unit))
 
@@ -16,7 +16,10 @@ from math import ceil, exp
 from termcolor import colored
 import numpy as np
 import pandas
-from scipy.stats import t, johnsonsu
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "simulation"))
+from delay_sampler import DelaySampler
 from statistics import median
 from math import sqrt
 import matplotlib.pyplot as plt
@@ -25,6 +28,7 @@ import matplotlib.pyplot as plt
 actualSlotDuration = 15     # in seconds
 rootDir = "/Users/anuja/Desktop/WNS_EXPERIMENT_WILD_BACKUP/networkTrace_yih/"
 z = 2.576   # 99% confidence
+delaySampler = DelaySampler()   # switching delays drawn in batches
 
 DEBUG = 0
 
@@ -396,16 +400,9 @@ def simulateDelay(currentNetwork):
     '''
     @description: generates a delay based on the appropriate distribution
     '''
-    wifiDelay = [3.0659475327, 14.6918344498]       # min and max delay observed for wifi
-    cellularDelay = [4.2531193161, 14.3172883892]   # min and max delay observed for 3G
-
-    if currentNetwork == 1: # wifi
-        # johnson su in python (fitter.Fitter.fit()) and t location-scale in matlab (allfitdist)
-        # in python, error is higher for t compared to johnson su
-        delay = min(max(johnsonsu.rvs(0.29822254217554717, 0.71688524931466857, loc=6.6093350624107909, scale=0.5595970482712973), wifiDelay[0]), wifiDelay[1])
-    else:
-        # t in python (fitter.Fitter.fit()) and t location-scale in matlab (allfitdist)
-        delay = min(max(t.rvs(0.43925241212097499, loc=4.4877772816533934, scale=0.024357324434644639), cellularDelay[0]), cellularDelay[1])
+    # johnson su for wifi and t for cellular, in python (fitter.Fitter.fit()) and t location-scale in matlab (allfitdist); in python, error is higher for t compared to
+    # johnson su for wifi; capped to the min and max delay observed (see delay_sampler.py)
+    delay = delaySampler.getDelay('WiFi' if currentNetwork == 1 else 'cellular')
     if DEBUG >= 1: print(colored("Delay for " + str(availableNetworkName[currentNetwork - 1]) + ": " + str(delay), "cyan"))
     # input()
     return delay